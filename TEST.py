@@ -1,23 +1,27 @@
 from websocket_server import WebsocketServer
+from broadcast import Broadcaster
 import json
 import time
-from solver import load_trie, find_words
+from solver_daemon import load_trie, find_words
 import threading
 
 # -----------------------------
 # CONFIGURATION
 # -----------------------------
-TRIE_PATH = "./trie.pkl"
+TRIE_PATH = "./trie.lex"
+trie = load_trie(TRIE_PATH)  # solver daemon client, or a local load if it isn't running
 
 # -----------------------------
 # WebSocket handlers
 # -----------------------------
 server = WebsocketServer(host="0.0.0.0", port=8766)
 clients = []
+broadcaster = Broadcaster()
 
 def new_client(client, server):
     print(f"New client connected: {client['id']}")
     clients.append(client)
+    broadcaster.add(client)
     print("✅ Connected to RPi.")
 
     # Get board input
@@ -30,7 +34,6 @@ def new_client(client, server):
         print(" ".join(row))
 
     # Run solver
-    trie = load_trie(TRIE_PATH)
     results = find_words(grid, trie)
 
     print(f"🧠 Found {len(results)} words. Sending to RPi...")
@@ -44,10 +47,10 @@ def new_client(client, server):
 def client_left(client, server):
     print(f"Client disconnected: {client['id']}")
     clients.remove(client)
+    broadcaster.remove(client)
 
 def send_message(message):
-    for client in clients:
-        server.send_message(client, json.dumps(message))
+    broadcaster.publish(json.dumps(message))
 
 def message_received(client, server, message):
     print(f"Received message from client")
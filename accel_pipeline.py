@@ -0,0 +1,208 @@
+"""
+Long-lived inference pipeline around ``memryx.AsyncAccl``.
+
+``AsyncAccl`` pulls frames from an input callback and pushes results to an
+output callback on its own threads. ``InferencePipeline`` wires both
+callbacks once, feeds them from a bounded queue of preallocated float32
+input buffers, and hands back a ``Future`` per frame, so several boards can
+be in flight without reconnecting the accelerator for each one.
+
+``FakeAccl`` mimics the ``AsyncAccl`` callback API (with configurable
+latency and pipelining) so the pipeline can be tested and benchmarked on a
+machine without the MemryX card.
+
+Usage:
+    pipeline = InferencePipeline(AsyncAccl(DFP_PATH))
+    letters = pipeline.submit(img).result()   # img: uint8 640x640x3 RGB
+    pipeline.close()
+
+    python accel_pipeline.py     # benchmark against FakeAccl
+    python -m pytest test_accel_pipeline.py
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+INPUT_SHAPE = (1, 3, 640, 640)
+MAX_IN_FLIGHT = 4
+
+
+def class_ids_to_letters(class_ids, num_rows: int, num_cols: int) -> List[List[str]]:
+    grid = np.asarray(class_ids).reshape((num_rows, num_cols))
+    return [[chr(ord("A") + int(cid)) for cid in row] for row in grid]
+
+
+class InferencePipeline:
+    """Feed boards to an ``AsyncAccl``-style accelerator and collect letter grids."""
+
+    def __init__(self, accl, num_rows: int = 4, num_cols: int = 4,
+                 max_in_flight: int = MAX_IN_FLIGHT, input_shape: Tuple[int, ...] = INPUT_SHAPE):
+        self.accl = accl
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self._buffers = [np.empty(input_shape, dtype=np.float32) for _ in range(max_in_flight)]
+        self._free = queue.Queue()
+        for index in range(max_in_flight):
+            self._free.put(index)
+        self._inputs: "queue.Queue[Optional[Tuple[int, Future, int, int]]]" = queue.Queue(max_in_flight)
+        self._in_flight = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        accl.connect_input(self._next_input)
+        accl.connect_output(self._on_output)
+
+    def submit(self, img: np.ndarray, num_rows: Optional[int] = None,
+               num_cols: Optional[int] = None) -> Future:
+        """
+        Queue a uint8 HxWx3 board image. Blocks while ``max_in_flight`` frames
+        are already queued. Returns a Future of the letter grid.
+        """
+        if self._closed:
+            raise RuntimeError("InferencePipeline is closed")
+        _, channels, height, width = self._buffers[0].shape
+        if np.shape(img) != (height, width, channels):
+            raise ValueError(f"Expected a {height}x{width}x{channels} image, got shape {np.shape(img)}")
+        index = self._free.get()
+        try:
+            # Normalize straight into the preallocated NCHW buffer.
+            np.multiply(img.transpose(2, 0, 1), 1 / 255.0, out=self._buffers[index][0], casting="unsafe")
+        except Exception:
+            self._free.put(index)  # a bad frame must not use up a buffer for good
+            raise
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self._inputs.put((index, future, num_rows or self.num_rows, num_cols or self.num_cols))
+        return future
+
+    def _next_input(self):
+        item = self._inputs.get()
+        if item is None:
+            return None  # ends the accelerator's input stream
+        with self._lock:
+            self._in_flight.append(item)
+        return (self._buffers[item[0]],)
+
+    def _on_output(self, *logits):
+        with self._lock:
+            index, future, num_rows, num_cols = self._in_flight.popleft()
+        self._free.put(index)
+        try:
+            future.set_result(class_ids_to_letters(logits[0], num_rows, num_cols))
+        except Exception as e:
+            future.set_exception(e)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._inputs.put(None)
+        self.accl.wait()
+
+
+class FakeAccl:
+    """
+    Stand-in for ``memryx.AsyncAccl``: pulls frames from the input callback
+    on one thread, "runs" them with ``latency`` seconds per frame and up to
+    ``depth`` frames overlapped, and delivers outputs in order.
+
+    ``model`` maps an NCHW float32 frame to 16 class ids; by default each
+    cell's mean red intensity picks the letter, so tests can paint boards.
+    """
+
+    def __init__(self, model: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                 latency: float = 0.01, depth: int = 2, num_rows: int = 4, num_cols: int = 4):
+        self.model = model or (lambda frame: self.cell_means(frame, num_rows, num_cols))
+        self.latency = latency
+        self.depth = depth
+        self._input_fn = None
+        self._output_fn = None
+        self._threads: List[threading.Thread] = []
+        self._results: "queue.Queue" = queue.Queue(depth)
+
+    @staticmethod
+    def cell_means(frame: np.ndarray, num_rows: int, num_cols: int) -> np.ndarray:
+        red = frame[0, 0]
+        h, w = red.shape[0] // num_rows, red.shape[1] // num_cols
+        cells = red[:h * num_rows, :w * num_cols].reshape(num_rows, h, num_cols, w).mean(axis=(1, 3))
+        return np.minimum((cells * 26).astype(np.int64), 25).reshape(-1)
+
+    def connect_input(self, fn):
+        self._input_fn = fn
+        self._start()
+
+    def connect_output(self, fn):
+        self._output_fn = fn
+        self._start()
+
+    def _start(self):
+        if self._input_fn is None or self._output_fn is None or self._threads:
+            return
+        self._threads = [
+            threading.Thread(target=self._feed, daemon=True),
+            threading.Thread(target=self._drain, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _feed(self):
+        while True:
+            frames = self._input_fn()
+            if frames is None:
+                self._results.put(None)
+                return
+            ready_at = time.perf_counter() + self.latency
+            self._results.put((ready_at, self.model(frames[0])))
+
+    def _drain(self):
+        while True:
+            item = self._results.get()
+            if item is None:
+                return
+            ready_at, class_ids = item
+            delay = ready_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._output_fn(class_ids)
+
+    def wait(self):
+        for thread in self._threads:
+            thread.join()
+
+    def stop(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+def paint_board(letters: List[List[str]], size: int = 640) -> np.ndarray:
+    """Render a letter grid as an image ``FakeAccl`` reads back (for tests)."""
+    num_rows, num_cols = len(letters), len(letters[0])
+    img = np.zeros((size, size, 3), dtype=np.uint8)
+    h, w = size // num_rows, size // num_cols
+    for r, row in enumerate(letters):
+        for c, ch in enumerate(row):
+            img[r * h:(r + 1) * h, c * w:(c + 1) * w, 0] = int((ord(ch.upper()) - ord("A") + 0.5) / 26 * 255)
+    return img
+
+
+if __name__ == "__main__":
+    board = [list("THIS"), list("WATS"), list("OAHG"), list("FGDT")]
+    img = paint_board(board)
+    frames = 40
+
+    for in_flight in (1, MAX_IN_FLIGHT):
+        pipeline = InferencePipeline(FakeAccl(latency=0.02, depth=in_flight), max_in_flight=in_flight)
+        start = time.perf_counter()
+        futures = [pipeline.submit(img) for _ in range(frames)]
+        results = [f.result() for f in futures]
+        elapsed = time.perf_counter() - start
+        pipeline.close()
+        assert all(r == board for r in results)
+        print(f"in flight {in_flight}: {frames / elapsed:6.1f} frames/s, {elapsed / frames * 1000:6.2f} ms/frame")
@@ -0,0 +1,112 @@
+"""
+Process-pool batch solving.
+
+The DFS is pure Python, so threads are serialized by the GIL. ``BatchSolver``
+keeps a persistent pool of worker processes that each load the lexicon once
+(a ``.lex`` file is memory-mapped, so every worker shares the same page-cache
+pages) and splits work per board for large batches or per start cell when
+there are fewer boards than workers.
+
+Usage:
+    with BatchSolver("./trie.lex") as pool:
+        results = pool.solve_many(boards)
+
+    python batch_solver.py boards.txt     # one 16-letter board per line
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from board_corpus import load_corpus
+from solver import Position, WordResult, find_words, load_trie, rank_words, search_bitmask
+
+TRIE_PATH = "./trie.lex"
+
+_worker_trie = None
+
+
+def _init_worker(trie_path: str):
+    global _worker_trie
+    _worker_trie = load_trie(trie_path)
+
+
+def _solve_board(board: List[List[str]]) -> List[WordResult]:
+    return find_words(board, _worker_trie)
+
+
+def _search_cells(args) -> Dict[str, List[Position]]:
+    board, start_cells = args
+    return search_bitmask(board, _worker_trie, start_cells)
+
+
+class BatchSolver:
+    """A persistent pool of solver processes with the trie preloaded."""
+
+    def __init__(self, trie_path: str = TRIE_PATH, processes: Optional[int] = None):
+        self.trie_path = trie_path
+        self.processes = processes or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=_init_worker,
+            initargs=(trie_path,),
+        )
+
+    def solve(self, board: List[List[str]]) -> List[WordResult]:
+        """Solve one board by spreading its start cells over the workers."""
+        num_cells = len(board) * len(board[0])
+        chunks = [(board, range(i, num_cells, self.processes)) for i in range(min(self.processes, num_cells))]
+        paths: Dict[str, List[Position]] = {}
+        for part in self._executor.map(_search_cells, chunks):
+            for word, path in part.items():
+                paths.setdefault(word, path)
+        return rank_words(paths)
+
+    def solve_many(self, boards: List[List[List[str]]]) -> List[List[WordResult]]:
+        """Solve a batch of boards, returning results in the same order."""
+        boards = list(boards)
+        if len(boards) < self.processes:
+            return [self.solve(board) for board in boards]
+        chunksize = max(1, len(boards) // (self.processes * 4))
+        return list(self._executor.map(_solve_board, boards, chunksize=chunksize))
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_pool: Optional[BatchSolver] = None
+
+
+def solve_many(boards: List[List[List[str]]], trie_path: str = TRIE_PATH) -> List[List[WordResult]]:
+    """
+    Solve ``boards`` on a module-level pool that stays alive between calls.
+    The pool's workers hold one trie, so a call with a different
+    ``trie_path`` replaces the pool.
+    """
+    global _default_pool
+    if _default_pool is not None and _default_pool.trie_path != trie_path:
+        _default_pool.close()
+        _default_pool = None
+    if _default_pool is None:
+        _default_pool = BatchSolver(trie_path)
+    return _default_pool.solve_many(boards)
+
+
+if __name__ == "__main__":
+    boards = load_corpus(sys.argv[1])
+
+    with BatchSolver() as pool:
+        pool.solve_many(boards[:pool.processes])  # warm up workers
+        start = time.perf_counter()
+        results = pool.solve_many(boards)
+        end = time.perf_counter()
+
+    print(f"Solved {len(boards)} boards on {pool.processes} processes in {end - start:.4f} seconds "
+          f"({len(boards) / (end - start):.1f} boards/s)")
@@ -0,0 +1,55 @@
+"""
+How solve time and memory grow with board size.
+
+Solves seeded random boards from 4x4 up to 6x6 with the current lexicon and
+reports mean/max solve time, words found and peak Python allocations
+(tracemalloc) per shape.
+
+Usage:
+    python bench_board_sizes.py [--trie ./trie.lex] [--boards 50] [--engine bitmask]
+"""
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+
+from board_corpus import random_board
+from solver import ENGINES, load_trie
+
+SHAPES = [(4, 4), (4, 5), (5, 5), (5, 6), (6, 6)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark solver scaling with board size")
+    parser.add_argument("--trie", default="./trie.lex")
+    parser.add_argument("--boards", type=int, default=50, help="boards per shape")
+    parser.add_argument("--engine", default="bitmask", choices=sorted(ENGINES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    trie = load_trie(args.trie)
+    search = ENGINES[args.engine]
+
+    print(f"{'shape':>6} {'mean ms':>9} {'max ms':>9} {'words':>7} {'peak KB':>9}")
+    for rows, cols in SHAPES:
+        rng = random.Random(args.seed)
+        boards = [random_board(rows, cols, rng) for _ in range(args.boards)]
+        times, counts, peaks = [], [], []
+        for board in boards:
+            start = time.perf_counter()
+            paths = search(board, trie)
+            times.append(time.perf_counter() - start)
+            counts.append(len(paths))
+
+            tracemalloc.start()
+            search(board, trie)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        print(f"{rows}x{cols:<4} {statistics.mean(times) * 1000:9.2f} {max(times) * 1000:9.2f} "
+              f"{statistics.mean(counts):7.0f} {max(peaks) / 1024:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
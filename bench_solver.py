@@ -0,0 +1,139 @@
+"""
+Solver benchmark and profiler.
+
+Solves a reproducible corpus of boards (seeded random boards or a saved
+corpus file) and reports lexicon load time, p50/p95/p99 solve latency, words
+and trie nodes visited per second, and peak memory. Results can be written
+as JSON to compare runs, and the search can be profiled with cProfile.
+
+Usage:
+    python bench_solver.py --boards 500 --json results.json
+    python bench_solver.py --corpus boards.txt --engine threads --trie trie.pkl
+    python bench_solver.py --profile solver.prof
+"""
+import argparse
+import cProfile
+import json
+import platform
+import pstats
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+from board_corpus import generate_corpus, load_corpus, save_corpus
+from solver import ENGINES, load_trie, search_bitmask
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(boards, trie, engine: str):
+    search = ENGINES[engine]
+    latencies, words, nodes = [], 0, 0
+    for board in boards:
+        stats = {}
+        start = time.perf_counter()
+        if search is search_bitmask:
+            paths = search(board, trie, stats=stats)
+        else:
+            paths = search(board, trie)
+        latencies.append(time.perf_counter() - start)
+        words += len(paths)
+        nodes += stats.get("nodes", 0)
+    return latencies, words, nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Word Hunt solver")
+    parser.add_argument("--trie", default="./trie.lex")
+    parser.add_argument("--engine", default="bitmask", choices=sorted(ENGINES))
+    parser.add_argument("--boards", type=int, default=200, help="number of random boards")
+    parser.add_argument("--rows", type=int, default=4)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", help="read boards from this file instead of generating them")
+    parser.add_argument("--save-corpus", help="write the boards used to this file")
+    parser.add_argument("--json", help="write results as JSON to this file")
+    parser.add_argument("--profile", help="write cProfile stats of the search to this file")
+    args = parser.parse_args()
+
+    if args.corpus:
+        boards = load_corpus(args.corpus, args.rows, args.cols)
+    else:
+        boards = generate_corpus(args.boards, args.rows, args.cols, args.seed)
+    if args.save_corpus:
+        save_corpus(boards, args.save_corpus)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    trie = load_trie(args.trie)
+    load_seconds = time.perf_counter() - start
+    load_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    run(boards[:10], trie, args.engine)  # warm up
+    latencies, words, nodes = run(boards, trie, args.engine)
+    total = sum(latencies)
+
+    tracemalloc.start()
+    run(boards[:min(len(boards), 50)], trie, args.engine)
+    solve_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # ru_maxrss is KB on Linux and bytes on macOS.
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    maxrss_bytes = maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    results = {
+        "engine": args.engine,
+        "trie": args.trie,
+        "boards": len(boards),
+        "shape": [args.rows, args.cols],
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "load_trie_seconds": load_seconds,
+        "load_trie_peak_bytes": load_peak,
+        "solve_p50_ms": percentile(latencies, 50) * 1000,
+        "solve_p95_ms": percentile(latencies, 95) * 1000,
+        "solve_p99_ms": percentile(latencies, 99) * 1000,
+        "solve_mean_ms": statistics.mean(latencies) * 1000,
+        "words_per_second": words / total if total else 0.0,
+        "nodes_per_second": nodes / total if total else 0.0,
+        "solve_peak_bytes": solve_peak,
+        "max_rss_bytes": maxrss_bytes,
+    }
+
+    print(f"Engine {args.engine} on {len(boards)} {args.rows}x{args.cols} boards ({args.trie})")
+    print(f"  load_trie     {load_seconds * 1000:9.1f} ms  (peak {load_peak / 1e6:.1f} MB)")
+    print(f"  solve p50     {results['solve_p50_ms']:9.3f} ms")
+    print(f"  solve p95     {results['solve_p95_ms']:9.3f} ms")
+    print(f"  solve p99     {results['solve_p99_ms']:9.3f} ms")
+    print(f"  words/s       {results['words_per_second']:9.0f}")
+    if nodes:
+        print(f"  nodes/s       {results['nodes_per_second']:9.0f}")
+    print(f"  solve peak    {solve_peak / 1e3:9.1f} KB")
+    print(f"  max RSS       {maxrss_bytes / 1e6:9.1f} MB")
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        run(boards, trie, args.engine)
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+        print(f"Profile written to {args.profile} (view with snakeviz or flameprof)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Reproducible board corpora for benchmarks and regression runs.
+
+Boards are drawn from a seeded RNG with letters weighted by English letter
+frequency (a stand-in for the tile distribution GamePigeon uses), and are
+stored one board per line, row by row (``thiswatsoahgfgdt`` for 4x4).
+"""
+import random
+from typing import List
+
+Board = List[List[str]]
+
+# Approximate English letter frequencies (percent), used to draw tiles.
+LETTER_WEIGHTS = {
+    "e": 12.7, "t": 9.1, "a": 8.2, "o": 7.5, "i": 7.0, "n": 6.7, "s": 6.3,
+    "h": 6.1, "r": 6.0, "d": 4.3, "l": 4.0, "c": 2.8, "u": 2.8, "m": 2.4,
+    "w": 2.4, "f": 2.2, "g": 2.0, "y": 2.0, "p": 1.9, "b": 1.5, "v": 1.0,
+    "k": 0.8, "j": 0.2, "x": 0.2, "q": 0.1, "z": 0.1,
+}
+
+
+def random_board(rows: int, cols: int, rng: random.Random) -> Board:
+    letters = rng.choices(list(LETTER_WEIGHTS), weights=list(LETTER_WEIGHTS.values()), k=rows * cols)
+    return [letters[r * cols:(r + 1) * cols] for r in range(rows)]
+
+
+def generate_corpus(count: int, rows: int = 4, cols: int = 4, seed: int = 0) -> List[Board]:
+    rng = random.Random(seed)
+    return [random_board(rows, cols, rng) for _ in range(count)]
+
+
+def parse_board(line: str, rows: int = 4, cols: int = 4) -> Board:
+    letters = line.strip().lower()
+    return [list(letters[r * cols:(r + 1) * cols]) for r in range(rows)]
+
+
+def load_corpus(filepath: str, rows: int = 4, cols: int = 4) -> List[Board]:
+    with open(filepath) as f:
+        return [parse_board(line, rows, cols) for line in f if line.strip()]
+
+
+def save_corpus(boards: List[Board], filepath: str):
+    with open(filepath, "w") as f:
+        for board in boards:
+            f.write("".join(ch for row in board for ch in row) + "\n")
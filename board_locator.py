@@ -0,0 +1,285 @@
+"""
+Find the Word Hunt board on screen once and capture only that region.
+
+The board used to come from a full-desktop ``mss`` grab, converted
+BGRA->BGR as a whole and cropped at hardcoded offsets that broke whenever
+the LonelyScreen window moved or changed size. ``find_board`` locates
+the 4x4 grid by its tiles instead. It keeps edge contours that are
+filled, equally sized squares and takes the largest cluster of them that
+forms a grid_size x grid_size lattice. The region returned is centered on
+that lattice, one tile pitch per cell, so the OCR's even cell split lines
+up with the tiles.
+
+``BoardLocator`` caches the region, in memory and in ``ROI_CACHE``, along
+with the tile and gap colours seen when it was found. Every capture grabs
+and converts just that region. It is checked by sampling a few dozen
+pixels, one inside each tile corner and some in the gaps between tiles.
+The screen is searched again only when that check fails. Only one monitor
+is searched: the one showing the LonelyScreen window, or the primary one.
+mss's monitor 0 would be every screen of the virtual desktop at once.
+
+Usage:
+    locator = BoardLocator()
+    img = locator.capture()          # BGR board, or None when no board is on screen
+    python board_locator.py          # locate, time region vs full-screen capture, save board.png
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+ROI_CACHE = "board_roi.json"
+WINDOW_TITLE = "LonelyScreen"
+MIN_TILE_PX = 24  # smallest tile side (in screen pixels) worth considering
+SQUARE_TOL = 0.15  # allowed width/height mismatch of a tile's bounding box
+SIZE_TOL = 0.15  # allowed size difference between tiles of one board
+FILL = 0.8  # contour area / bounding box area for a tile (rounded corners included)
+CORNER = 0.3  # tile samples sit this fraction of a cell pitch up and left of the cell center
+COLOR_TOL = 40  # max per-channel difference for a sample to match the cached colour
+MIN_TILE_MATCH = 0.9  # fraction of tile samples that must match
+MIN_GAP_MATCH = 0.75  # fraction of gap samples that must match
+
+Region = Dict[str, int]  # mss monitor dict: left, top, width, height
+Tile = Tuple[float, float, float]  # center x, center y, side
+
+
+def find_tiles(img: np.ndarray, min_side: int = MIN_TILE_PX) -> List[Tile]:
+    """Filled, roughly square contours (tile candidates), de-duplicated by center."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    edges = cv2.dilate(cv2.Canny(gray, 50, 150), None)
+    contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    tiles: List[Tile] = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w < min_side or h < min_side or abs(w - h) > SQUARE_TOL * max(w, h):
+            continue
+        if cv2.contourArea(contour) < FILL * w * h:
+            continue
+        cx, cy, side = x + w / 2, y + h / 2, (w + h) / 2
+        # The inner and outer outline of one dilated edge both show up; keep one.
+        if any(abs(cx - tx) < side / 4 and abs(cy - ty) < side / 4 and abs(side - ts) < SIZE_TOL * side * 2
+               for tx, ty, ts in tiles):
+            continue
+        tiles.append((cx, cy, side))
+    return tiles
+
+
+def _clusters(values: Sequence[float], gap: float) -> List[float]:
+    """Means of runs of sorted values that are closer than ``gap``."""
+    groups: List[List[float]] = []
+    for value in sorted(values):
+        if groups and value - groups[-1][-1] < gap:
+            groups[-1].append(value)
+        else:
+            groups.append([value])
+    return [sum(group) / len(group) for group in groups]
+
+
+def _component(tiles: List[Tile], seed: int) -> List[Tile]:
+    """Tiles reachable from ``seed`` through same-sized neighbours at most ~1.6 sides away."""
+    side = tiles[seed][2]
+    members = [i for i, t in enumerate(tiles) if abs(t[2] - side) <= SIZE_TOL * side]
+    seen, stack = {seed}, [seed]
+    while stack:
+        a = tiles[stack.pop()]
+        for i in members:
+            b = tiles[i]
+            if i not in seen and abs(a[0] - b[0]) < 1.6 * side and abs(a[1] - b[1]) < 1.6 * side:
+                seen.add(i)
+                stack.append(i)
+    return [tiles[i] for i in seen]
+
+
+def find_board(img: np.ndarray, grid_size: int = 4) -> Optional[Tuple[int, int, int, int]]:
+    """
+    (x, y, width, height) of the board in ``img``: grid_size x grid_size
+    cells of one tile pitch, centered on the tile lattice. None if no
+    lattice of that size is visible.
+    """
+    tiles = find_tiles(img)
+    best = None
+    tried = set()
+    for seed in range(len(tiles)):
+        if seed in tried:
+            continue
+        group = _component(tiles, seed)
+        tried.update(i for i, t in enumerate(tiles) if t in group)
+        side = float(np.median([t[2] for t in group]))
+        cols = _clusters([t[0] for t in group], side / 2)
+        rows = _clusters([t[1] for t in group], side / 2)
+        # Allow a couple of tiles to be missed (e.g. a highlighted one).
+        if len(cols) != grid_size or len(rows) != grid_size or len(group) < grid_size * grid_size - 2:
+            continue
+        if best is None or len(group) > best[0]:
+            best = (len(group), cols, rows)
+    if best is None:
+        return None
+    _, cols, rows = best
+    pitch_x = (cols[-1] - cols[0]) / (grid_size - 1)
+    pitch_y = (rows[-1] - rows[0]) / (grid_size - 1)
+    x, y = cols[0] - pitch_x / 2, rows[0] - pitch_y / 2
+    return int(round(x)), int(round(y)), int(round(pitch_x * grid_size)), int(round(pitch_y * grid_size))
+
+
+def sample_points(width: int, height: int, grid_size: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pixel (x, y) positions inside each tile, near its top-left corner and
+    clear of the letter, and on the gap midlines between neighbouring tiles.
+    """
+    px, py = width / grid_size, height / grid_size
+    tile, gap = [], []
+    for r in range(grid_size):
+        for c in range(grid_size):
+            cx, cy = (c + 0.5) * px, (r + 0.5) * py
+            tile.append((cx - CORNER * px, cy - CORNER * py))
+            if c:
+                gap.append((c * px, cy))
+            if r:
+                gap.append((cx, r * py))
+    clip = lambda pts: np.clip(np.round(pts).astype(np.int64), 0, [width - 1, height - 1])
+    return clip(np.array(tile)), clip(np.array(gap))
+
+
+def window_center(title: str = WINDOW_TITLE) -> Optional[Tuple[float, float]]:
+    """Screen position of the center of the first window titled ``title``, or None."""
+    try:
+        import pygetwindow as gw
+        windows = gw.getWindowsWithTitle(title)
+    except (ImportError, NotImplementedError):  # pygetwindow only supports Windows and macOS
+        return None
+    if not windows:
+        return None
+    window = windows[0]
+    return window.left + window.width / 2, window.top + window.height / 2
+
+
+def pick_monitor(monitors: List[Region], point: Optional[Tuple[float, float]]) -> Region:
+    """The mss monitor containing ``point``, else the primary one (monitors[1])."""
+    screens = monitors[1:] or monitors
+    if point is not None:
+        x, y = point
+        for monitor in screens:
+            if monitor["left"] <= x < monitor["left"] + monitor["width"] and \
+                    monitor["top"] <= y < monitor["top"] + monitor["height"]:
+                return monitor
+    return screens[0]
+
+
+def _matches(img: np.ndarray, points: np.ndarray, color: Sequence[float]) -> float:
+    samples = img[points[:, 1], points[:, 0]].astype(np.int16)
+    return float((np.abs(samples - np.asarray(color, dtype=np.int16)).max(axis=1) <= COLOR_TOL).mean())
+
+
+class BoardLocator:
+    """Cached board region on screen, captured with region-only ``mss`` grabs."""
+
+    def __init__(self, grid_size: int = 4, monitor: Optional[int] = None, cache_path: Optional[str] = ROI_CACHE):
+        self.grid_size = grid_size
+        self.monitor = monitor
+        self.cache_path = cache_path
+        self.region: Optional[Region] = None
+        self.tile_color: Optional[List[float]] = None
+        self.gap_color: Optional[List[float]] = None
+        self.locates = 0
+        self._local = threading.local()  # mss handles are per thread on Windows
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if cached.get("grid_size") == grid_size:
+                self.region = cached["region"]
+                self.tile_color, self.gap_color = cached["tile_color"], cached["gap_color"]
+
+    def _sct(self):
+        import mss
+
+        if getattr(self._local, "sct", None) is None:
+            self._local.sct = mss.mss()
+        return self._local.sct
+
+    def screen(self) -> Region:
+        """
+        The monitor to search: mss index ``monitor`` if one was given,
+        otherwise the one showing the LonelyScreen window, or the primary.
+        """
+        monitors = self._sct().monitors
+        if self.monitor is not None:
+            return monitors[self.monitor]
+        return pick_monitor(monitors, window_center())
+
+    def grab(self, region: Optional[Region] = None) -> np.ndarray:
+        """BGR pixels of ``region`` (default: the monitor from ``screen``)."""
+        shot = self._sct().grab(region or self.screen())
+        return cv2.cvtColor(np.asarray(shot), cv2.COLOR_BGRA2BGR)
+
+    def locate(self) -> Optional[Region]:
+        """Search the monitor from ``screen`` for the board and cache where it is."""
+        self.locates += 1
+        monitor = self.screen()
+        found = find_board(self.grab(monitor), self.grid_size)
+        if found is None:
+            print("⚠️ Board not found on screen.")
+            return None
+        x, y, width, height = found
+        self.region = {"left": monitor["left"] + x, "top": monitor["top"] + y, "width": width, "height": height}
+        self.learn(self.grab(self.region))
+        print(f">> Board at {self.region}")
+        if self.cache_path:
+            with open(self.cache_path, "w") as f:
+                json.dump({"grid_size": self.grid_size, "region": self.region,
+                           "tile_color": self.tile_color, "gap_color": self.gap_color}, f)
+        return self.region
+
+    def learn(self, board: np.ndarray):
+        """Remember the tile and gap colours of a freshly located board."""
+        tile, gap = sample_points(board.shape[1], board.shape[0], self.grid_size)
+        self.tile_color = np.median(board[tile[:, 1], tile[:, 0]], axis=0).tolist()
+        self.gap_color = np.median(board[gap[:, 1], gap[:, 0]], axis=0).tolist()
+
+    def is_board(self, board: np.ndarray) -> bool:
+        """Cheap check that ``board`` still shows the tile lattice found by ``locate``."""
+        if self.tile_color is None:
+            return False
+        tile, gap = sample_points(board.shape[1], board.shape[0], self.grid_size)
+        if _matches(board, tile, self.tile_color) < MIN_TILE_MATCH:
+            return False
+        contrast = np.abs(np.subtract(self.tile_color, self.gap_color)).max()
+        return contrast <= COLOR_TOL or _matches(board, gap, self.gap_color) >= MIN_GAP_MATCH
+
+    def capture(self, relocate: bool = True) -> Optional[np.ndarray]:
+        """
+        BGR image of the board region. If the cached region doesn't show the
+        board any more, search the screen again (unless ``relocate`` is
+        False); None if there is no board to be found.
+        """
+        if self.region is not None:
+            board = self.grab(self.region)
+            if self.is_board(board):
+                return board
+        if not relocate or self.locate() is None:
+            return None
+        board = self.grab(self.region)
+        return board if self.is_board(board) else None
+
+
+if __name__ == "__main__":
+    locator = BoardLocator(cache_path=None)
+    if locator.locate() is None:
+        raise SystemExit(1)
+    repeats = 20
+    start = time.perf_counter()
+    for _ in range(repeats):
+        locator.grab()
+    full = (time.perf_counter() - start) / repeats
+    start = time.perf_counter()
+    for _ in range(repeats):
+        board = locator.capture(relocate=False)
+    region = (time.perf_counter() - start) / repeats
+    print(f"full screen grab + convert {full * 1000:7.2f} ms")
+    print(f"board region + check       {region * 1000:7.2f} ms ({locator.region['width']}x{locator.region['height']})")
+    if board is not None:
+        cv2.imwrite("board.png", board)
+        print("Saved board.png")
@@ -0,0 +1,141 @@
+"""
+Watch the board region and report the moment a fresh, settled board appears.
+
+A round used to start with a ``~`` key press, then a fixed 1 s sleep after
+the start tap, then another 0.2-0.5 s of window activation sleeps before
+one screenshot. ``BoardWatcher`` instead grabs the cached board region (see
+``board_locator``) ``fps`` times a second. A frame counts as a new board
+when all of these hold:
+
+- the locator's tile check passes, so overlays, menus and banners are ignored,
+- it has barely changed over the last ``stable_frames`` frames, so tiles
+  still animating in are ignored,
+- at least half of its cells differ from the last board returned, so the
+  board that was just played doesn't fire again.
+
+Both checks are frame differences of the same cheap signature: an 8x8
+area-averaged grayscale thumbnail of every cell, made with one resize.
+
+If the board isn't visible where it was, the screen is searched again at
+most once every ``RELOCATE_SECONDS``.
+
+Usage:
+    watcher = BoardWatcher(BoardLocator())
+    img = watcher.wait_for_new_board(timeout=10)   # BGR board or None
+    python board_watch.py                          # print every new board as it appears
+"""
+import time
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from board_locator import BoardLocator
+
+WATCH_FPS = 15
+STABLE_FRAMES = 3  # consecutive still frames before a board counts as settled
+STILL_DIFF = 2.0  # mean gray-level change between frames that still counts as still
+CELL_THUMB = 8  # each cell is compared as a CELL_THUMB x CELL_THUMB area-averaged thumbnail
+PIXEL_CHANGE = 40  # gray-level change of a thumbnail pixel that isn't noise or compression
+CELL_CHANGE = 0.05  # fraction of a cell's thumbnail pixels that must change for a different letter
+NEW_BOARD_CELLS = 0.5  # fraction of cells that must change for a new board
+RELOCATE_SECONDS = 1.0
+
+
+def cell_thumbnails(img: np.ndarray, grid_size: int = 4, size: int = CELL_THUMB) -> np.ndarray:
+    """(grid_size * grid_size, size * size) float32 gray thumbnails, one per cell, from one resize."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    small = cv2.resize(gray, (grid_size * size, grid_size * size), interpolation=cv2.INTER_AREA)
+    cells = small.reshape(grid_size, size, grid_size, size).swapaxes(1, 2)
+    return cells.reshape(grid_size * grid_size, size * size).astype(np.float32)
+
+
+def changed_cells(a: np.ndarray, b: np.ndarray) -> float:
+    """Fraction of cells where more than ``CELL_CHANGE`` of the thumbnail pixels changed noticeably."""
+    return float(((np.abs(a - b) > PIXEL_CHANGE).mean(axis=1) >= CELL_CHANGE).mean())
+
+
+class BoardWatcher:
+    """Poll the board region and return each new board once it has settled."""
+
+    def __init__(self, locator: BoardLocator, fps: float = WATCH_FPS, stable_frames: int = STABLE_FRAMES,
+                 still_diff: float = STILL_DIFF, new_board_cells: float = NEW_BOARD_CELLS,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.locator = locator
+        self.interval = 1.0 / fps
+        self.stable_frames = stable_frames
+        self.still_diff = still_diff
+        self.new_board_cells = new_board_cells
+        self.clock = clock
+        self.sleep = sleep
+        self.last_board: Optional[np.ndarray] = None  # cell thumbnails of the last board returned
+        self.frames = 0
+        self._last_locate = -RELOCATE_SECONDS
+
+    def _grab(self) -> Optional[np.ndarray]:
+        now = self.clock()
+        relocate = now - self._last_locate >= RELOCATE_SECONDS
+        img = self.locator.capture(relocate=False)
+        if img is None and relocate:
+            self._last_locate = now
+            img = self.locator.capture(relocate=True)
+        return img
+
+    def forget(self):
+        """Let the board currently on screen count as new again."""
+        self.last_board = None
+
+    def wait_for_new_board(self, timeout: Optional[float] = None,
+                           should_stop: Callable[[], bool] = lambda: False) -> Optional[np.ndarray]:
+        """
+        Block until a fresh board has been still for ``stable_frames``
+        frames and return it. Returns None on timeout or when ``should_stop``
+        returns True.
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        previous: Optional[np.ndarray] = None
+        still = 0
+        next_frame = self.clock()
+        while not should_stop():
+            now = self.clock()
+            if deadline is not None and now >= deadline:
+                return None
+            if next_frame > now:
+                self.sleep(next_frame - now)
+            next_frame = max(next_frame + self.interval, self.clock())
+
+            img = self._grab()
+            self.frames += 1
+            if img is None:  # no board, or something is drawn over it
+                previous, still = None, 0
+                continue
+            thumb = cell_thumbnails(img, self.locator.grid_size)
+            if previous is not None and np.abs(thumb - previous).mean() <= self.still_diff:
+                still += 1
+            else:
+                still = 0
+            previous = thumb
+            if still + 1 < self.stable_frames:
+                continue
+
+            if self.last_board is not None and changed_cells(thumb, self.last_board) < self.new_board_cells:
+                continue  # the board we already returned
+            self.last_board = thumb
+            return img
+        return None
+
+
+if __name__ == "__main__":
+    watcher = BoardWatcher(BoardLocator())
+    print(f"Watching for boards at {WATCH_FPS} fps (Ctrl-C to stop)...")
+    count = 0
+    try:
+        while True:
+            start = time.perf_counter()
+            img = watcher.wait_for_new_board()
+            count += 1
+            cv2.imwrite(f"board_{count}.png", img)
+            print(f"✅ New board {count} after {time.perf_counter() - start:.2f}s "
+                  f"({watcher.frames} frames grabbed), saved board_{count}.png")
+    except KeyboardInterrupt:
+        pass
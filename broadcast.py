@@ -0,0 +1,341 @@
+"""
+Serialize-once, non-blocking websocket fan-out.
+
+``send_message`` in full_loop/sockettest/TEST used to ``json.dumps`` the
+payload again for every client and send to each one synchronously, so one
+slow browser tab stalled everyone. Here a payload is encoded into a single
+websocket frame once, and every client gets a bounded outbound queue drained
+by its own writer. When a queue is full the oldest message is dropped;
+messages published with a ``key`` replace any queued message with the same
+key (coalescing, e.g. progress updates). Clients that take nothing off
+their queue for ``evict_after`` seconds while messages wait, keyed or not,
+or whose socket errors are disconnected without affecting the others.
+Writer threads send under the handler's own send lock, so their frames
+never interleave with the control frames ``websocket_server`` writes.
+
+``Broadcaster`` plugs into ``websocket_server.WebsocketServer`` (threads);
+``AsyncBroadcaster`` does the same for ``websockets`` connections on an
+asyncio loop.
+
+Usage:
+    broadcaster = Broadcaster()
+    server.set_fn_new_client(lambda client, server: broadcaster.add(client))
+    server.set_fn_client_left(lambda client, server: broadcaster.remove(client))
+    broadcaster.publish({"board": ..., "words": ...})
+
+    python broadcast.py --clients 300 --messages 50 --slow 5   # load test
+"""
+import asyncio
+import json
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+
+MAX_QUEUE = 32
+EVICT_AFTER = 5.0  # seconds a client may stay backed up before it is dropped
+
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+
+
+def encode_payload(message: Any) -> Union[str, bytes]:
+    """JSON-encode ``message`` unless it is already text or bytes."""
+    if isinstance(message, (str, bytes, bytearray)):
+        return message
+    return json.dumps(message)
+
+
+def websocket_frame(payload: Union[str, bytes], opcode: Optional[int] = None) -> bytes:
+    """Build one unmasked server-to-client websocket frame."""
+    if isinstance(payload, str):
+        payload = payload.encode()
+        opcode = opcode or OPCODE_TEXT
+    opcode = opcode or OPCODE_BINARY
+    header = bytearray([0x80 | opcode])
+    if len(payload) <= 125:
+        header.append(len(payload))
+    elif len(payload) <= 0xFFFF:
+        header.append(126)
+        header += struct.pack(">H", len(payload))
+    else:
+        header.append(127)
+        header += struct.pack(">Q", len(payload))
+    return bytes(header) + bytes(payload)
+
+
+class OutboundQueue:
+    """Bounded per-client queue with drop-oldest and coalesce-by-key."""
+
+    def __init__(self, maxsize: int = MAX_QUEUE):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._seq = 0
+        self.dropped = 0
+        self.stalled_since: Optional[float] = None  # since when messages have waited without a pop
+
+    def push(self, item, key: Optional[Hashable] = None):
+        if self.stalled_since is None:
+            self.stalled_since = time.monotonic()
+        if key is not None and key in self._items:
+            del self._items[key]
+            self.dropped += 1
+        elif len(self._items) >= self.maxsize:
+            self._items.popitem(last=False)
+            self.dropped += 1
+        if key is None:
+            self._seq += 1
+            key = ("seq", self._seq)
+        self._items[key] = item
+
+    def pop(self):
+        _, item = self._items.popitem(last=False)
+        self.stalled_since = time.monotonic() if self._items else None
+        return item
+
+    def stalled(self, now: float, limit: float) -> bool:
+        return self.stalled_since is not None and now - self.stalled_since > limit
+
+    def __len__(self):
+        return len(self._items)
+
+
+class _ClientWriter:
+    def __init__(self, client: dict, maxsize: int):
+        self.client = client
+        self.queue = OutboundQueue(maxsize)
+        self.cond = threading.Condition()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        handler = self.client["handler"]
+        sock = handler.request
+        # websocket_server >= 0.6 serializes its own sends (pongs, close frames) on this lock.
+        send_lock = getattr(handler, "_send_lock", None) or threading.Lock()
+        while True:
+            with self.cond:
+                while not self.queue and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                frame = self.queue.pop()
+            try:
+                with send_lock:
+                    sock.sendall(frame)
+            except OSError as e:
+                if not self.closed:
+                    print(f"Error sending message to client {self.client['id']}: {e}")
+                self.close()
+                return
+
+    def close(self):
+        with self.cond:
+            if self.closed:
+                return
+            self.closed = True
+            self.cond.notify()
+        handler = self.client["handler"]
+        handler.keep_alive = False
+        try:
+            handler.request.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class Broadcaster:
+    """Fan-out for ``websocket_server`` clients with one writer thread per client."""
+
+    def __init__(self, maxsize: int = MAX_QUEUE, evict_after: float = EVICT_AFTER):
+        self.maxsize = maxsize
+        self.evict_after = evict_after
+        self._writers: Dict[int, _ClientWriter] = {}
+        self._lock = threading.Lock()
+
+    def add(self, client: dict):
+        with self._lock:
+            self._writers[client["id"]] = _ClientWriter(client, self.maxsize)
+
+    def remove(self, client: dict):
+        with self._lock:
+            writer = self._writers.pop(client["id"], None)
+        if writer:
+            writer.close()
+
+    def publish(self, message: Any, key: Optional[Hashable] = None):
+        """Encode ``message`` once and queue it for every client without blocking."""
+        with self._lock:
+            writers = list(self._writers.values())
+        self._enqueue(writers, websocket_frame(encode_payload(message)), key)
+
+    def send(self, client: dict, message: Any, key: Optional[Hashable] = None):
+        """Queue ``message`` for one client only (e.g. a resync snapshot)."""
+        with self._lock:
+            writer = self._writers.get(client["id"])
+        if writer:
+            self._enqueue([writer], websocket_frame(encode_payload(message)), key)
+
+    def _enqueue(self, writers, frame: bytes, key: Optional[Hashable]):
+        now = time.monotonic()
+        for writer in writers:
+            with writer.cond:
+                writer.queue.push(frame, key)
+                stuck = writer.queue.stalled(now, self.evict_after)
+                writer.cond.notify()
+            if stuck or writer.closed:
+                print(f"Evicting slow client {writer.client['id']}")
+                self.remove(writer.client)
+
+    def __len__(self):
+        return len(self._writers)
+
+
+class AsyncBroadcaster:
+    """Fan-out for ``websockets`` connections with one writer task per client."""
+
+    def __init__(self, maxsize: int = MAX_QUEUE, evict_after: float = EVICT_AFTER):
+        self.maxsize = maxsize
+        self.evict_after = evict_after
+        self._clients: Dict[Any, Tuple[OutboundQueue, asyncio.Event, asyncio.Task]] = {}
+
+    def add(self, ws):
+        queue, ready = OutboundQueue(self.maxsize), asyncio.Event()
+        task = asyncio.get_running_loop().create_task(self._drain(ws, queue, ready))
+        self._clients[ws] = (queue, ready, task)
+
+    def remove(self, ws):
+        entry = self._clients.pop(ws, None)
+        if entry:
+            entry[2].cancel()
+
+    async def _drain(self, ws, queue: OutboundQueue, ready: asyncio.Event):
+        try:
+            while True:
+                await ready.wait()
+                while queue:
+                    await ws.send(queue.pop())
+                ready.clear()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Error sending message to client {ws.remote_address}: {e}")
+            self._clients.pop(ws, None)
+            await ws.close()
+
+    def publish(self, message: Any, key: Optional[Hashable] = None):
+        self._enqueue(list(self._clients), encode_payload(message), key)
+
+    def send(self, ws, message: Any, key: Optional[Hashable] = None):
+        if ws in self._clients:
+            self._enqueue([ws], encode_payload(message), key)
+
+    def _enqueue(self, clients, payload, key: Optional[Hashable]):
+        now = time.monotonic()
+        for ws in clients:
+            queue, ready, _ = self._clients[ws]
+            queue.push(payload, key)
+            ready.set()
+            if queue.stalled(now, self.evict_after):
+                print(f"Evicting slow client {ws.remote_address}")
+                self.remove(ws)
+                asyncio.get_running_loop().create_task(ws.close())
+
+    def __len__(self):
+        return len(self._clients)
+
+
+# -- load test ---------------------------------------------------------------
+
+async def _fake_client(port: int, latencies: list, slow: bool, done: asyncio.Event):
+    import base64
+    import os
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write((
+        f"GET / HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    ).encode())
+    await reader.readuntil(b"\r\n\r\n")
+    if slow:
+        await done.wait()  # a stuck tab: never reads
+        writer.close()
+        return
+    try:
+        while not done.is_set():
+            b1, b2 = await reader.readexactly(2)
+            length = b2 & 0x7F
+            if length == 126:
+                length = struct.unpack(">H", await reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack(">Q", await reader.readexactly(8))[0]
+            payload = await reader.readexactly(length)
+            if b1 & 0x0F == OPCODE_TEXT:
+                latencies.append(time.perf_counter() - json.loads(payload)["t"])
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    writer.close()
+
+
+def load_test(clients: int, messages: int, slow: int, size: int, port: int = 18765):
+    import statistics
+
+    from websocket_server import WebsocketServer
+
+    class LoadTestServer(WebsocketServer):
+        request_queue_size = 1024  # default backlog of 5 drops simultaneous connects
+
+    server = LoadTestServer(host="127.0.0.1", port=port)
+    broadcaster = Broadcaster(evict_after=1.0)
+    server.set_fn_new_client(lambda client, server: broadcaster.add(client))
+    server.set_fn_client_left(lambda client, server: broadcaster.remove(client))
+    threading.Thread(target=server.run_forever, daemon=True).start()
+
+    async def run():
+        latencies = []
+        done = asyncio.Event()
+        tasks = [
+            asyncio.create_task(_fake_client(port, latencies, i < slow, done))
+            for i in range(clients)
+        ]
+        while len(broadcaster) < clients:
+            await asyncio.sleep(0.05)
+        filler = "x" * size
+        start = time.perf_counter()
+        for seq in range(messages):
+            await asyncio.get_running_loop().run_in_executor(
+                None, broadcaster.publish, {"seq": seq, "t": time.perf_counter(), "data": filler}
+            )
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(1.5)
+        elapsed = time.perf_counter() - start
+        done.set()
+        for task in tasks:
+            task.cancel()
+        return latencies, elapsed
+
+    latencies, elapsed = asyncio.run(run())
+    server.shutdown_abruptly()
+    expected = (clients - slow) * messages
+    latencies.sort()
+    print(f"{clients} clients ({slow} stuck), {messages} messages of {size} bytes in {elapsed:.2f}s")
+    print(f"  delivered {len(latencies)}/{expected} to live clients, {len(broadcaster)} clients left")
+    if latencies:
+        print(f"  latency p50 {statistics.median(latencies) * 1000:.2f} ms, "
+              f"p99 {latencies[int(0.99 * (len(latencies) - 1))] * 1000:.2f} ms, "
+              f"max {latencies[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test the websocket broadcaster")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--slow", type=int, default=5, help="clients that never read")
+    parser.add_argument("--size", type=int, default=2000, help="payload filler bytes")
+    args = parser.parse_args()
+    load_test(args.clients, args.messages, args.slow, args.size)
@@ -1,7 +1,7 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { motion } from 'motion/react';
 import { WordHuntBoard } from './components/WordHuntBoard';
-import { WordList, Word } from './components/WordList';
+import { WordList, Word, WordStatus } from './components/WordList';
 import { ControlPanel } from './components/ControlPanel';
 import { Eye, Zap } from 'lucide-react';
 
@@ -59,123 +59,124 @@ const sampleWords: Word[] = [
   // }
 ];
 
+type ProgressMessage =
+  | { type: 'snapshot'; round: number; seq: number; board: string[][]; words: Word[] }
+  | { type: 'add'; round: number; seq: number; words: Word[] }
+  | { type: 'status'; round: number; seq: number; index: number; status: WordStatus }
+  | { type: 'heartbeat'; round: number; seq: number };
+
+// Ask gemini for definitions and merge them into the matching words
+function fetchDefinitions(wordsToDefine: string[], setWords: (update: (prev: Word[]) => Word[]) => void) {
+  if (wordsToDefine.length === 0) return;
+  fetch('https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent',
+    {
+      method: 'POST', 
+      headers: {
+        'Content-Type': 'application/json',
+        'x-goog-api-key': import.meta.env.VITE_GEMINI_API_KEY
+      },
+      body: JSON.stringify({
+        "contents": [
+          {
+            "parts": [
+              {
+                "text": `Return only raw JSON. No markdown, no triple backticks, no formatting. Provide a brief definition for each of the following words in this format: {"words":[{"word":"WORD","definition":"..."}]} — words: ${wordsToDefine.join(', ')}`
+              }
+            ]
+          }
+        ],
+        "generationConfig": {
+          "thinkingConfig": {
+            "thinkingBudget": 0
+          }
+        }
+      })}).then(res => res.json()).then(res => {
+        console.log('Gemini response:', res);
+        if (res.candidates && res.candidates.length > 0) {
+          try {
+            const definitions = JSON.parse(res.candidates[0].content.parts[0].text).words;
+            console.log('Parsed definitions:', definitions);
+            setWords((prevWords) => prevWords.map((word) => {
+              const defObj = definitions.find((d: any) => d.word.toLowerCase() === word.word.toLowerCase());
+              return defObj ? { ...word, definition: defObj.definition } : word;
+            }));
+          } catch (e) {
+            console.error('Error parsing definitions JSON:', e);
+          }
+        }
+    }).catch(err => console.error('Error fetching definitions:', err));
+}
+
 export default function App() {
   const [words, setWords] = useState<Word[]>(sampleWords);
   const [board, setBoard] = useState<string[][]>(sampleBoard);
-  const [currentWordIndex, setCurrentWordIndex] = useState(-1);
   const [timeRemaining, setTimeRemaining] = useState(0);
-  const [isPlaying, setIsPlaying] = useState(false);
-  const [isPaused, setIsPaused] = useState(false);
-  const [highlightedTiles, setHighlightedTiles] = useState<number[][]>([]);
+  // Position in the robot's message stream; a gap means we missed a delta
+  const round = useRef(0);
+  const seq = useRef(0);
+  const awaitingSnapshot = useRef(true);
 
-  const resetGame = useCallback(() => {
-    setWords(sampleWords.map(word => ({ ...word, status: 'pending' })));
-    setCurrentWordIndex(-1);
-    setTimeRemaining(0);
-    setIsPlaying(false);
-    setIsPaused(false);
-    setHighlightedTiles([]);
-  }, []);
-
-  const startNextWord = useCallback(() => {
-    const nextPendingIndex = words.findIndex(word => word.status === 'pending');
-    
-    if (nextPendingIndex === -1) {
-      // All words completed
-      setIsPlaying(false);
-      setCurrentWordIndex(-1);
-      setHighlightedTiles([]);
-      return;
-    }
-
-    setCurrentWordIndex(nextPendingIndex);
-    setTimeRemaining(words[nextPendingIndex].duration);
-    setHighlightedTiles(words[nextPendingIndex].coordinates);
-    
-    // Update word status to playing
-    setWords(prev => prev.map((word, index) => 
-      index === nextPendingIndex 
-        ? { ...word, status: 'playing' }
-        : word
-    ));
-  }, [words]);
-
-  const completeCurrentWord = useCallback(() => {
-    if (currentWordIndex >= 0) {
-      setWords(prev => prev.map((word, index) => 
-        index === currentWordIndex 
-          ? { ...word, status: 'completed' }
-          : word
-      ));
-      setHighlightedTiles([]);
-      setCurrentWordIndex(-1);
-      
-      // Start next word after a brief pause
-      setTimeout(() => {
-        if (isPlaying && !isPaused) {
-          startNextWord();
-        }
-      }, 1000);
-    }
-  }, [currentWordIndex, isPlaying, isPaused, startNextWord]);
+  // The robot reports which word it is tracing; nothing is simulated here
+  const currentWordIndex = words.findIndex(word => word.status === 'active');
+  const highlightedTiles = currentWordIndex >= 0 ? words[currentWordIndex].coordinates : [];
 
   useEffect(() => {
     const ws = new WebSocket('ws://localhost:8765');
 
+    const resync = () => {
+      awaitingSnapshot.current = true;
+      ws.send(JSON.stringify({ type: 'resync' }));
+    };
+
+    const applyMessage = (msg: ProgressMessage) => {
+      if (msg.type === 'snapshot') {
+        round.current = msg.round;
+        seq.current = msg.seq;
+        awaitingSnapshot.current = false;
+        setBoard(msg.board);
+        setWords(msg.words);
+        fetchDefinitions(msg.words.map(w => w.word), setWords);
+        return;
+      }
+      if (awaitingSnapshot.current) return;
+      if (msg.round !== round.current) {
+        resync();
+        return;
+      }
+      if (msg.type === 'heartbeat') {
+        if (msg.seq !== seq.current) resync();
+        return;
+      }
+      if (msg.seq !== seq.current + 1) {
+        resync();
+        return;
+      }
+      seq.current = msg.seq;
+      if (msg.type === 'add') {
+        const added = msg.words;
+        setWords(prev => [...prev, ...added]);
+        fetchDefinitions(added.map(w => w.word), setWords);
+      } else if (msg.type === 'status') {
+        const { index: changed, status } = msg;
+        setWords(prev => prev.map((word, index) =>
+          index === changed ? { ...word, status } : word
+        ));
+      }
+    };
+
     ws.onopen = () => {
       console.log('Connected to WebSocket server');
     };
 
     ws.onmessage = (event) => {
-      console.log('Received:', event.data);
-      // set words
       try {
         const data = JSON.parse(event.data);
-        if (!data.words || !data.board) {
+        if (!data.type) {
           console.error('Invalid data format from WebSocket:', data);
           return;
         }
-        setWords(data.words);
-        setBoard(data.board);
-        // send request to gemini for definitions
-        const wordsToDefine = data.words.map((w: any) => w.word);
-        fetch('https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent',
-          {
-            method: 'POST', 
-            headers: {
-              'Content-Type': 'application/json',
-              'x-goog-api-key': import.meta.env.VITE_GEMINI_API_KEY
-            },
-            body: JSON.stringify({
-              "contents": [
-                {
-                  "parts": [
-                    {
-                      "text": `Return only raw JSON. No markdown, no triple backticks, no formatting. Provide a brief definition for each of the following words in this format: {"words":[{"word":"WORD","definition":"..."}]} — words: ${wordsToDefine.join(', ')}`
-                    }
-                  ]
-                }
-              ],
-              "generationConfig": {
-                "thinkingConfig": {
-                  "thinkingBudget": 0
-                }
-              }
-            })}).then(res => res.json()).then(res => {
-              console.log('Gemini response:', res);
-              if (res.candidates && res.candidates.length > 0) {
-                try {
-                  const definitions = JSON.parse(res.candidates[0].content.parts[0].text).words;
-                  console.log('Parsed definitions:', definitions);
-                  setWords((prevWords) => prevWords.map((word) => {
-                    const defObj = definitions.find((d: any) => d.word.toLowerCase() === word.word.toLowerCase());
-                    return defObj ? { ...word, definition: defObj.definition } : word;
-                  }));
-                } catch (e) {
-                  console.error('Error parsing definitions JSON:', e);
-                }
-              }
-          }).catch(err => console.error('Error fetching definitions:', err));
+        if (data.type !== 'heartbeat') console.log('Received:', data);
+        applyMessage(data as ProgressMessage);
       } catch (e) {
         console.error('Error parsing WebSocket message:', e);
       }
@@ -195,40 +196,19 @@ export default function App() {
     };
   }, []);
 
+  // Countdown for the active word, display only; the robot decides when it's done
   useEffect(() => {
-    console.log("Words updated:", words);
-    if (!isPlaying && words.length > 0) {
-      console.log("Starting game");
-      handlePlay();
+    if (currentWordIndex === -1) {
+      setTimeRemaining(0);
+      return;
     }
-  }, [words]);
-
-
-  // Timer effect
-  useEffect(() => {
-    if (!isPlaying || isPaused || currentWordIndex === -1) return;
-
+    setTimeRemaining(words[currentWordIndex].duration);
     const timer = setInterval(() => {
-      setTimeRemaining(prev => {
-        if (prev <= 1) {
-          completeCurrentWord();
-          return 0;
-        }
-        return prev - 1;
-      });
+      setTimeRemaining(prev => Math.max(0, prev - 1));
     }, 1000);
 
     return () => clearInterval(timer);
-  }, [isPlaying, isPaused, currentWordIndex, completeCurrentWord]);
-
-  const handlePlay = () => {
-    if (isPaused) {
-      setIsPaused(false);
-    } else {
-      setIsPlaying(true);
-      startNextWord();
-    }
-  };
+  }, [currentWordIndex]);
 
   return (
     <div className="min-h-screen p-6" style={{ background: 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)' }}>
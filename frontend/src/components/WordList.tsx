@@ -3,11 +3,13 @@ import { CheckCircle, Clock, Play, Info } from 'lucide-react';
 import { Badge } from './ui/badge';
 import { Tooltip, TooltipContent, TooltipProvider, TooltipTrigger } from './ui/tooltip';
 
+export type WordStatus = 'pending' | 'active' | 'done' | 'skipped';
+
 export interface Word {
   word: string;
   coordinates: number[][];
   duration: number; // seconds to highlight
-  status: 'pending' | 'playing' | 'completed';
+  status: WordStatus;
   definition: string; // definition of the word
 }
 
@@ -34,7 +36,7 @@ export function WordList({ words, currentWordIndex, timeRemaining }: WordListPro
               p-3 rounded-xl border transition-all duration-200
               ${index === currentWordIndex
                 ? 'bg-gradient-to-r from-blue-50 to-indigo-50 border-blue-300 shadow-md'
-                : wordData.status === 'completed'
+                : wordData.status === 'done'
                 ? 'bg-gradient-to-r from-green-50 to-emerald-50 border-green-300 shadow-md'
                 : 'bg-white/60 border-gray-200 hover:bg-white/80'
               }
@@ -61,7 +63,7 @@ export function WordList({ words, currentWordIndex, timeRemaining }: WordListPro
                 </Tooltip>
               </div>
               <div className="flex items-center gap-2">
-                {wordData.status === 'completed' && (
+                {wordData.status === 'done' && (
                   <CheckCircle className="w-4 h-4 text-green-600" />
                 )}
                 {index === currentWordIndex && (
@@ -73,7 +75,7 @@ export function WordList({ words, currentWordIndex, timeRemaining }: WordListPro
                 <Badge 
                   variant="secondary"
                   className={`
-                    ${wordData.status === 'completed' 
+                    ${wordData.status === 'done' 
                       ? 'bg-green-100 text-green-800 border-green-200' :
                       index === currentWordIndex 
                       ? 'bg-blue-100 text-blue-800 border-blue-200' :
@@ -81,7 +83,8 @@ export function WordList({ words, currentWordIndex, timeRemaining }: WordListPro
                     }
                   `}
                 >
-                  {wordData.status === 'completed' ? 'Done' :
+                  {wordData.status === 'done' ? 'Done' :
+                   wordData.status === 'skipped' ? 'Skipped' :
                    index === currentWordIndex ? 'Playing' :
                    'Pending'}
                 </Badge>
@@ -113,12 +116,12 @@ export function WordList({ words, currentWordIndex, timeRemaining }: WordListPro
       <div className="mt-4 p-3 bg-muted rounded-lg">
         <div className="flex justify-between text-sm">
           <span>Progress:</span>
-          <span>{words.filter(w => w.status === 'completed').length} / {words.length} words</span>
+          <span>{words.filter(w => w.status === 'done').length} / {words.length} words</span>
         </div>
         <div className="mt-2 h-2 bg-gray-200 rounded-full overflow-hidden">
           <div 
             className="h-full bg-gradient-to-r from-green-500 to-emerald-600 transition-all duration-500"
-            style={{ width: `${(words.filter(w => w.status === 'completed').length / words.length) * 100}%` }}
+            style={{ width: `${(words.filter(w => w.status === 'done').length / words.length) * 100}%` }}
           />
         </div>
       </div>
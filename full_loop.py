@@ -1,51 +1,21 @@
-import pygetwindow as gw
-import mss
-import cv2
-import numpy as np
 import time
 import keyboard 
-import win32gui
-import win32con
-import win32com.client
-import memryx
-# import solver logic
-from solver import load_trie, find_words
-ready= False
-
-
-def find_lonelyscreen_window():
-    windows = gw.getWindowsWithTitle('LonelyScreen')
-    if not windows:
-        print("LonelyScreen window not found.")
-        return None
-    return windows[0]
-
-def activate_and_maximize_window(window):
-    hwnd = window._hWnd  # get native window handle
-
-    # Restore if minimized
-    if win32gui.IsIconic(hwnd):
-        win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-        time.sleep(0.2)
-
-    # Force foreground
-    shell = win32com.client.Dispatch("WScript.Shell")
-    shell.SendKeys('%')  # Send ALT key to allow SetForegroundWindow
-    win32gui.SetForegroundWindow(hwnd)
-
-    # Maximize
-    win32gui.ShowWindow(hwnd, win32con.SW_MAXIMIZE)
-    time.sleep(0.5)
-
-def capture_fullscreen():
-    with mss.mss() as sct:
-        monitor = sct.monitors[0]  # Primary monitor (full screen)
-        img = sct.grab(monitor)
-        img_np = np.array(img)
-        img_bgr = cv2.cvtColor(img_np, cv2.COLOR_BGRA2BGR)
-        # crop to 1054, 1504 (x), 655, 1108 (y)
-        img_bgr = img_bgr[896:150+1108, 1062:150+1264]
-        return img_bgr
+import threading
+from broadcast import Broadcaster
+from image_codec import encode_board_frame
+from progress import ProgressState, is_resync_request
+from screen_capture import find_lonelyscreen_window, activate_and_maximize_window, capture_board, locator
+from board_watch import BoardWatcher
+from scoring import ROUND_SECONDS
+ready = threading.Event()  # set when the rpi acks, sends the board or reports a failure
+failed = threading.Event()  # set when the rpi reports a failure
+IMAGE_CODEC = "jpeg"  # "raw", "png" or "jpeg", see image_codec.py
+WATCH_BOARD = True  # send the board as soon as a fresh one settles (board_watch.py) instead of sleeping
+BOARD_APPEAR_TIMEOUT = 10.0
+START_TIMEOUT = 10.0  # rpi taps start and acks
+BOARD_TIMEOUT = 15.0  # rpi runs OCR + solve and sends back the board
+watcher = BoardWatcher(locator)
+
 
 def send_img_to_pi(img):
     """
@@ -53,85 +23,85 @@ def send_img_to_pi(img):
     Output:rpi handles it
     """
 
-    # preprocessing so we can run the yolo model on rpi after sending thorugh scoket
-    inp = cv2.resize(img, (640, 640))          
-    inp = cv2.cvtColor(inp, cv2.COLOR_BGR2RGB) 
-    inp = inp.astype(np.float32) / 255.0  
-    inp = np.transpose(inp, (2,0,1))
-    inp = np.expand_dims(inp, 0) 
-
-
-    # no output, send raw image data to pi and compute shit on that end
-    send_message2(inp)
+    # resize + RGB here; float normalization for the yolo model happens on the rpi
+    # compressed uint8 frame instead of a json list of floats
+    send_binary2(encode_board_frame(img, IMAGE_CODEC))
 
 from websocket_server import WebsocketServer
-import threading
 import json
 
 server = WebsocketServer(host="0.0.0.0", port=8765)
 server2 = WebsocketServer(host="0.0.0.0", port=8766)
 clients = []
 clients2 = []
+frontend = Broadcaster()
+robot = Broadcaster()
+progress = ProgressState()  # current round, replayed to frontends that join late
 
 def new_client(client, server):
     print(f"New client connected: {client['id']}")
     clients.append(client)
+    frontend.add(client)
+    send_snapshot(client)
 
 def new_client2(client, server):
     print(f"New client connected: {client['id']}")
     clients2.append(client)
+    robot.add(client)
 
 def client_left(client, server):
     print(f"Client disconnected: {client['id']}")
     clients.remove(client)
+    frontend.remove(client)
 
 def client_left2(client, server):
     print(f"Client disconnected: {client['id']}")
     clients2.remove(client)
+    robot.remove(client)
 
 def send_message(message):
-    disconnected = []
-    for client in clients:
-        try:
-            server.send_message(client, json.dumps(message))
-        except Exception as e:
-            print(f"Error sending message to client {client['id']}: {e}")
-            disconnected.append(client)
-    
-    for client in disconnected:
-        try:
-            clients.remove(client)
-        except ValueError:
-            pass
+    # encoded once; each client drains its own queue so a slow tab can't stall the rest
+    frontend.publish(json.dumps(message))
 
 def send_message2(message):
-    disconnected = []
-    for client in clients2:
-        try:
-            server.send_message(client, json.dumps(message))
-        except Exception as e:
-            print(f"Error sending message to client {client['id']}: {e}")
-            disconnected.append(client)
-    
-    # Remove disconnected clients
-    for client in disconnected:
-        try:
-            clients2.remove(client)
-        except ValueError:
-            pass
+    robot.publish(json.dumps(message))
+
+def send_binary2(payload: bytes):
+    robot.publish(payload)
+
+def send_snapshot(client):
+    snapshot = progress.snapshot()
+    if snapshot:
+        frontend.send(client, snapshot)
+
+def frontend_message_received(client, server, message):
+    if is_resync_request(message):
+        send_snapshot(client)
 
 def message_received(client, server, message):
-    print(f"Received message from client")
-    global ready 
-    ready = True
-    if message != "ack":
-        send_message(message) # send to webserver
+    if message == "ack":
+        print("Received ack from rpi")
+        ready.set()
+        return
+    if message == "fail":
+        print("⚠️ rpi reported a failure")
+        failed.set()
+        ready.set()
+        return
+    update = progress.apply(message)
+    if update is None or update["type"] == "snapshot":
+        print("Received board from rpi")
+        ready.set()
+    # already json from the rpi, relay as is; heartbeats coalesce in slow queues
+    heartbeat = update is not None and update["type"] == "heartbeat"
+    frontend.publish(message, key="heartbeat" if heartbeat else None)
 
 server.set_fn_new_client(new_client)
 server.set_fn_client_left(client_left)
+server.set_fn_message_received(frontend_message_received)
 
 server2.set_fn_new_client(new_client2)
-server2.set_fn_new_client(new_client2)
+server2.set_fn_client_left(client_left2)
 
 server2.set_fn_message_received(message_received)
 
@@ -139,11 +109,30 @@ threading.Thread(target=server.run_forever, daemon=True).start()
 threading.Thread(target=server2.run_forever, daemon=True).start()
 
 
+def wait_for_rpi(timeout):
+    """True once the rpi has replied, False if it reported a failure or went quiet."""
+    if not ready.wait(timeout):
+        print(f"⚠️ No reply from rpi in {timeout:.0f}s.")
+        return False
+    return not failed.is_set()
+
+
+def abort_round(started):
+    """
+    Tell the rpi to drop the round and wait for the game's round to end, so
+    the next start tap can't land on a tile of the board still in play.
+    """
+    send_message2("abort")
+    remaining = started + ROUND_SECONDS - time.monotonic()
+    if remaining > 0:
+        print(f"Waiting {remaining:.0f}s for the round to end...")
+        time.sleep(remaining)
+
+
 def main():
-    global ready
     print("in main")
     while not clients2:
-        pass
+        time.sleep(0.1)
     print("Press ~ to start game...")
     
     # Wait for spacebar press before continuing
@@ -151,28 +140,44 @@ def main():
 
     # send socket message to rpi 
     message = "start"
+    ready.clear()
+    failed.clear()
+    started = time.monotonic()
     send_message2(message)
 
     # receive ack from rpi 
-    while(not ready):
-        pass
-
-    # allow time to hit the start
-    time.sleep(1)
-    
-    window = find_lonelyscreen_window()
-    if window is None:
+    if not wait_for_rpi(START_TIMEOUT):
+        abort_round(started)  # the tap may still have happened
         return
 
-    activate_and_maximize_window(window)
-    img = capture_fullscreen()
+    if WATCH_BOARD:
+        # the window was brought forward once at startup; grab the board the moment it settles
+        img = watcher.wait_for_new_board(timeout=BOARD_APPEAR_TIMEOUT)
+    else:
+        # allow time to hit the start
+        time.sleep(1)
+
+        window = find_lonelyscreen_window()
+        if window is not None:
+            activate_and_maximize_window(window)
+            img = capture_board()
+        else:
+            img = None
+    if img is None:
+        print("No new board on screen.")
+        abort_round(started)
+        return
+    ready.clear()
     send_img_to_pi(img)
 
     # wait for rpi to send back board and words
-    ready = False
-    while(not ready):
-        pass
+    if not wait_for_rpi(BOARD_TIMEOUT):
+        abort_round(started)
 
 if __name__ == "__main__":
+    if WATCH_BOARD:
+        window = find_lonelyscreen_window()
+        if window is not None:
+            activate_and_maximize_window(window)
     while True:
         main()
@@ -0,0 +1,149 @@
+"""
+Solving boards with uncertain OCR reads.
+
+Instead of one letter per cell, each cell carries its top-k candidate letters
+with confidences (e.g. a softmax over the OCR logits). ``find_words_uncertain``
+searches every candidate in one DFS pass, pruning by trie prefix and by a
+minimum joint confidence (the product of the letter confidences along the
+path), and ranks words by expected points. It also scores how many points
+depend on each ambiguous cell, so a single uncertain tile can be re-checked
+instead of recapturing the whole board.
+
+``RoundExecutor`` takes candidate boards from ``InferenceBackend.candidates``
+and solves them here when any cell is unsure.
+
+Usage:
+    cells = candidates_from_probs(probs, num_rows=4, num_cols=4)  # probs: 16 x 26
+    if is_uncertain(cells):
+        words, recheck = find_words_uncertain(cells, trie)
+"""
+import math
+from typing import Dict, List, Sequence, Tuple
+
+from lexicon import ALPHABET
+from scoring import word_points
+from solver import SOLVER_NUMWORDS_LIMIT, WordResult, neighbor_table
+
+Candidates = List[Tuple[str, float]]
+CandidateBoard = List[List[Candidates]]
+
+MIN_CONFIDENCE = 0.05
+AMBIGUOUS_BELOW = 0.9
+
+
+def candidates_from_probs(probs: Sequence[Sequence[float]], num_rows: int = 4, num_cols: int = 4,
+                          k: int = 3, logits: bool = False) -> CandidateBoard:
+    """
+    Build a candidate board from per-cell scores over ``A..Z`` (row-major,
+    ``num_rows * num_cols`` rows of 26). Pass ``logits=True`` to softmax raw
+    model outputs first.
+    """
+    board = []
+    for r in range(num_rows):
+        row = []
+        for c in range(num_cols):
+            scores = [float(x) for x in probs[r * num_cols + c]]
+            if logits:
+                top = max(scores)
+                exps = [math.exp(x - top) for x in scores]
+                total = sum(exps)
+                scores = [x / total for x in exps]
+            ranked = sorted(range(len(scores)), key=lambda i: -scores[i])[:k]
+            row.append([(ALPHABET[i], scores[i]) for i in ranked])
+        board.append(row)
+    return board
+
+
+def certain_board(board: List[List[str]]) -> CandidateBoard:
+    """Wrap a plain letter board as a candidate board with full confidence."""
+    return [[[(ch.lower(), 1.0)] for ch in row] for row in board]
+
+
+def is_candidate_board(board) -> bool:
+    """True for a candidate board, False for a plain letter grid."""
+    return not isinstance(board[0][0], str)
+
+
+def best_letters(cells: CandidateBoard) -> List[List[str]]:
+    """The most likely letter of every cell, uppercase like the OCR output."""
+    return [[cell[0][0].upper() for cell in row] for row in cells]
+
+
+def is_uncertain(cells: CandidateBoard, threshold: float = AMBIGUOUS_BELOW) -> bool:
+    """Whether any cell's best guess is below ``threshold``."""
+    return any(cell[0][1] < threshold for row in cells for cell in row)
+
+
+def find_words_uncertain(
+    cells: CandidateBoard,
+    trie,
+    min_confidence: float = MIN_CONFIDENCE,
+    limit: int = SOLVER_NUMWORDS_LIMIT,
+) -> Tuple[List[WordResult], List[dict]]:
+    """
+    Find words over all candidate letters. Returns ``(words, recheck)``:
+    words ranked by points x confidence, each with its joint ``confidence``
+    (the word's letters are the ones it assumed along its path); and the
+    ambiguous cells ordered by how many expected points hinge on them.
+    """
+    num_rows, num_cols = len(cells), len(cells[0])
+    neighbors = neighbor_table(num_rows, num_cols)
+    flat = [[(letter.lower(), p) for letter, p in cell] for row in cells for cell in row]
+    positions = [(i // num_cols, i % num_cols) for i in range(len(flat))]
+    letters = [""] * len(flat)
+    path = [0] * len(flat)
+    best: Dict[str, Tuple[float, List[int]]] = {}
+
+    stack = []
+    for cell, options in enumerate(flat):
+        for letter, p in options:
+            node = trie.get(letter)
+            if node and p >= min_confidence:
+                stack.append((cell, letter, node, 1 << cell, 0, p))
+
+    while stack:
+        cell, letter, node, visited, depth, conf = stack.pop()
+        letters[depth] = letter
+        path[depth] = cell
+        if "$" in node and depth >= 2:
+            word = "".join(letters[:depth + 1])
+            if word not in best or conf > best[word][0]:
+                best[word] = (conf, path[:depth + 1])
+        for nb in neighbors[cell]:
+            if visited >> nb & 1:
+                continue
+            for next_letter, p in flat[nb]:
+                next_conf = conf * p
+                if next_conf < min_confidence:
+                    continue
+                next_node = node.get(next_letter)
+                if next_node:
+                    stack.append((nb, next_letter, next_node, visited | 1 << nb, depth + 1, next_conf))
+
+    ranked = sorted(best, key=lambda w: (-word_points(w) * best[w][0], -len(w), w))[:limit]
+    words = []
+    for word in ranked:
+        conf, cell_path = best[word]
+        words.append({
+            "word": word,
+            "coordinates": [positions[i] for i in cell_path],
+            "duration": max(3, len(word)),
+            "status": "pending",
+            "confidence": conf,
+        })
+
+    # Points at stake per cell: words whose path goes through an ambiguous
+    # cell, weighted by how unsure that cell's assumed letter is.
+    stake = [0.0] * len(flat)
+    for word in best:
+        conf, cell_path = best[word]
+        for letter, cell in zip(word, cell_path):
+            p = dict(flat[cell]).get(letter, 0.0)
+            if p < AMBIGUOUS_BELOW:
+                stake[cell] += word_points(word) * conf * (1 - p)
+    recheck = [
+        {"cell": positions[i], "candidates": flat[i], "stake": stake[i]}
+        for i in sorted(range(len(flat)), key=lambda i: -stake[i])
+        if stake[i] > 0
+    ]
+    return words, recheck
@@ -0,0 +1,223 @@
+"""
+Compile an ordered word list into one G-code program.
+
+``play_path`` emitted one ``G1`` per cell with fixed feeds and a full
+rest-height lift and drop around every word. ``PathCompiler`` builds the
+program for a whole round instead:
+
+- straight runs of cells (rows, columns, diagonals) become one move,
+- a Z move is folded into the neighbouring XY move when both stay at or
+  above ``HOVER_Z``, where the stylus can't touch the glass,
+- between words the pen only lifts to ``HOVER_Z``, not ``REST_Z``,
+- every move type gets its own feed (travel, trace, press, lift), and
+  ``F`` is only written when it changes, to keep lines short on the wire.
+
+``motion.estimate_seconds`` predicts how long the program takes; the same
+estimate is used to budget words (``scoring.motion_cost``).
+
+Usage:
+    program = compile_words(ordered_words, num_rows=4)
+    for word_lines in program.words:
+        for line in word_lines:
+            gcode.send(line)
+    print(program.seconds)
+
+    python gcode_compiler.py      # compare against the per-cell play_path output
+"""
+from typing import List, Optional, Sequence, Tuple
+
+from motion import Vector, estimate_seconds, parse_gcode, plan_seconds
+from path_order import CELL_SIZE, START_LOCATION, TRAVEL_FEED
+from solver import Position, WordResult
+
+PRESS_Z = 0.0  # stylus on the glass
+HOVER_Z = 2.0  # lowest height that is safely clear of the glass, used between words
+REST_Z = 3.0  # parked height at the start and end of a round
+TRACE_FEED = 8000  # mm/min while dragging across letters
+PRESS_FEED = 2000  # mm/min lowering onto the glass
+LIFT_FEED = 2000  # mm/min lifting off
+PRESS_DWELL_MS = 100  # let the touch register before dragging
+
+
+def cell_to_xy(cell: Sequence[float], num_rows: int) -> Tuple[float, float]:
+    """Board (row, col) to machine XY, row 0 at the top (largest Y)."""
+    row, col = cell
+    return col * CELL_SIZE, (num_rows - 1 - row) * CELL_SIZE
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.2f}"
+
+
+def merge_collinear(points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """Drop interior points of straight runs (and repeated points)."""
+    merged: List[Tuple[float, float]] = []
+    for point in points:
+        if merged and point == merged[-1]:
+            continue
+        if len(merged) >= 2:
+            (ax, ay), (bx, by) = merged[-2], merged[-1]
+            cross = (bx - ax) * (point[1] - by) - (by - ay) * (point[0] - bx)
+            same_way = (bx - ax) * (point[0] - bx) + (by - ay) * (point[1] - by) > 0
+            if abs(cross) < 1e-9 and same_way:
+                merged[-1] = point
+                continue
+        merged.append(point)
+    return merged
+
+
+class Program:
+    """A compiled round: a header, one chunk of lines per word, and a footer."""
+
+    def __init__(self, header: List[str], words: List[List[str]], footer: List[str], start: Vector):
+        self.header = header
+        self.words = words
+        self.footer = footer
+        self.start = start
+
+    @property
+    def lines(self) -> List[str]:
+        return self.header + [line for chunk in self.words for line in chunk] + self.footer
+
+    @property
+    def seconds(self) -> float:
+        return estimate_seconds(self.lines, self.start)
+
+    def word_seconds(self) -> List[float]:
+        """Estimated time per word chunk, including the hop to its first cell."""
+        per_block = plan_seconds(parse_gcode(self.lines, self.start))
+        # The compiler never emits a no-op move, so every G1/G4 line is one block.
+        blocks_per_chunk = [sum(line.startswith(("G1", "G4")) for line in chunk)
+                            for chunk in [self.header] + self.words]
+        times, index = [], blocks_per_chunk[0]
+        for count in blocks_per_chunk[1:]:
+            times.append(sum(per_block[index:index + count]))
+            index += count
+        return times
+
+
+class PathCompiler:
+    """Stateful compiler: feed it words in order, it tracks where the pen is."""
+
+    def __init__(self, num_rows: int = 4, start: Position = START_LOCATION, hover_z: float = HOVER_Z):
+        self.num_rows = num_rows
+        self.hover_z = hover_z
+        x, y = cell_to_xy(start, num_rows)
+        self.start: Vector = (x, y, REST_Z)
+        self.position: Vector = self.start
+        self.feed: Optional[float] = None
+
+    def _move(self, x: Optional[float] = None, y: Optional[float] = None,
+              z: Optional[float] = None, feed: float = TRAVEL_FEED) -> Optional[str]:
+        target = (
+            self.position[0] if x is None else x,
+            self.position[1] if y is None else y,
+            self.position[2] if z is None else z,
+        )
+        words = [f"{axis}{_fmt(new)}" for axis, old, new in zip("XYZ", self.position, target)
+                 if _fmt(old) != _fmt(new)]
+        if not words:
+            return None
+        if feed != self.feed:
+            words.append(f"F{feed:g}")
+            self.feed = feed
+        self.position = target
+        return "G1 " + " ".join(words)
+
+    def _emit(self, lines: List[str], *moves: Optional[str]):
+        lines.extend(move for move in moves if move)
+
+    def header(self) -> List[str]:
+        self.feed = None
+        return ["G90"]  # absolute positioning
+
+    def word(self, path: Sequence[Position]) -> List[str]:
+        """Hop to the word's first cell, press, trace it, and lift to hover height."""
+        lines: List[str] = []
+        if not path:
+            return lines
+        points = merge_collinear([cell_to_xy(cell, self.num_rows) for cell in path])
+        x0, y0 = points[0]
+
+        if self.position[2] < self.hover_z:
+            self._emit(lines, self._move(z=self.hover_z, feed=LIFT_FEED))
+        # Both ends are clear of the glass, so the height change rides along with the hop.
+        self._emit(lines, self._move(x0, y0, self.hover_z, TRAVEL_FEED))
+        self._emit(lines, self._move(z=PRESS_Z, feed=PRESS_FEED))
+        if PRESS_DWELL_MS:
+            lines.append(f"G4 P{PRESS_DWELL_MS}")
+        for x, y in points[1:]:
+            self._emit(lines, self._move(x, y, feed=TRACE_FEED))
+        self._emit(lines, self._move(z=self.hover_z, feed=LIFT_FEED))
+        return lines
+
+    def tap(self, cell: Position) -> List[str]:
+        """Press a single cell (e.g. the start button)."""
+        return self.word([cell])
+
+    def footer(self) -> List[str]:
+        """Park at the start position at rest height, hop and rise in one move."""
+        lines: List[str] = []
+        if self.position[2] < self.hover_z:
+            self._emit(lines, self._move(z=self.hover_z, feed=LIFT_FEED))
+        self._emit(lines, self._move(*self.start, feed=TRAVEL_FEED))
+        return lines
+
+
+def compile_words(words: List[WordResult], num_rows: int = 4, start: Position = START_LOCATION,
+                  hover_z: float = HOVER_Z) -> Program:
+    compiler = PathCompiler(num_rows, start, hover_z)
+    header = compiler.header()
+    chunks = [compiler.word(w.get("coordinates", [])) for w in words]
+    return Program(header, chunks, compiler.footer(), compiler.start)
+
+
+def word_trace_seconds(path: Sequence[Position], num_rows: int = 4) -> float:
+    """Press, trace and lift for one word, from hovering over its first cell."""
+    compiler = PathCompiler(num_rows, path[0])
+    x, y, _ = compiler.start
+    hovering = (x, y, compiler.hover_z)
+    compiler.position = hovering
+    return estimate_seconds(compiler.word(path), hovering)
+
+
+def per_cell_program(words: List[WordResult], num_rows: int = 4, start: Position = START_LOCATION) -> List[str]:
+    """What the old ``play_path`` sent for the same words, for comparison."""
+    lines = []
+    for w in words:
+        path = w.get("coordinates", [])
+        if not path:
+            continue
+        lines.append(f"G1 Z{REST_Z:g} F2000")
+        x, y = cell_to_xy(path[0], num_rows)
+        lines.append(f"G1 X{x:.2f} Y{y:.2f} F8000")
+        lines.append(f"G1 Z{PRESS_Z:g} F2000")
+        lines.append("G4 P500")  # the old time.sleep(0.5) after pressing; host-side DELAYs not counted
+        for cell in path[1:]:
+            x, y = cell_to_xy(cell, num_rows)
+            lines.append(f"G1 X{x:.2f} Y{y:.2f} F8000")
+        lines.append(f"G1 Z{REST_Z:g} F2000")
+    x, y = cell_to_xy(start, num_rows)
+    lines.append(f"G1 X{x:.2f} Y{y:.2f} F8000")
+    return lines
+
+
+if __name__ == "__main__":
+    from path_order import order_words
+    from solver import find_words, load_trie
+
+    board = [
+        ['t', 'h', 'i', 's'],
+        ['w', 'a', 't', 's'],
+        ['o', 'a', 'h', 'g'],
+        ['f', 'g', 'd', 't']
+    ]
+    words, _ = order_words(find_words(board, load_trie("./trie.lex")))
+    program = compile_words(words, len(board))
+    x, y = cell_to_xy(START_LOCATION, len(board))
+    old = per_cell_program(words, len(board))
+    print(f"{len(words)} words")
+    print(f"per-cell: {len(old):4d} lines, {sum(map(len, old)):5d} bytes, "
+          f"estimated {estimate_seconds(old, (x, y, REST_Z)):.2f} s")
+    print(f"compiled: {len(program.lines):4d} lines, {sum(map(len, program.lines)):5d} bytes, "
+          f"estimated {program.seconds:.2f} s")
@@ -0,0 +1,289 @@
+"""
+Flow-controlled G-code streaming over the printer's serial port.
+
+``send_gcode`` used to sleep a fixed ``DELAY`` after every command and hope
+the move was done. ``GcodeStreamer`` instead keeps the firmware's input
+buffer full: each line is numbered and checksummed, and a reader thread
+matches the firmware's ``ok`` replies to the oldest outstanding line. New
+lines go out as soon as they fit in the serial RX buffer (character
+counting) and the firmware's command queue, so moves queue back-to-back in
+the planner.
+
+Resend requests (``Resend: N`` / ``rs N``) retransmit from line N. If an
+``ok`` goes missing for ``ok_timeout`` seconds, the oldest line is sent
+again; the firmware either takes it or answers with a resend request for
+the line it actually expects, so a lost ack can't stall the stream. Any
+reply, including Marlin's ``busy: processing`` keepalives, shows the
+printer is alive and restarts that wait.
+
+``M400`` and ``G4`` only reply once every queued move is done, which
+firmware without keepalives spends in silence. As lines go out, the
+streamer predicts when the planner will run dry with the ``motion`` time
+model (``time_scale`` maps its seconds to wall seconds, as for
+``virtual_printer``), and those commands wait until then plus
+``sync_margin``. Homing can't be predicted and gets ``home_timeout``.
+
+Usage:
+    gcode = GcodeStreamer(serial.Serial(PORT, BAUDRATE, timeout=0.1))
+    gcode.send("G1 X10 Y10 F8000")      # returns once the line is queued
+    last = gcode.send("G1 Z3 F2000")
+    gcode.wait(last)                    # firmware accepted everything up to here
+    gcode.finish()                      # M400: every queued move is done
+"""
+import re
+import threading
+import time
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Tuple
+
+from motion import WORD, Block, plan_seconds
+
+RX_BUFFER = 127  # Marlin's serial RX ring holds 128 bytes
+MAX_IN_FLIGHT = 4  # Marlin BUFSIZE: commands parsed ahead of the planner
+OK_TIMEOUT = 5.0  # seconds without an ok or busy message before resending
+SYNC_MARGIN = 5.0  # seconds past the predicted end of queued motion before an M400/G4 ok counts as lost
+HOME_TIMEOUT = 60.0  # seconds without a reply before a G28/G29 ok counts as lost
+SYNC_COMMANDS = {"M400", "G4"}  # reply once the planner has drained
+HOME_COMMANDS = {"G28", "G29"}  # home, bed level
+BUSY_PREFIXES = ("busy:", "echo:busy:")  # Marlin host keepalives
+MAX_TIMEOUTS = 3
+
+RESEND = re.compile(r"^(?:resend:|rs)\s*n?:?\s*(\d+)", re.IGNORECASE)
+
+
+class GcodeError(Exception):
+    pass
+
+
+class GcodeTimeout(GcodeError):
+    pass
+
+
+def checksum(line: str) -> int:
+    cs = 0
+    for byte in line.encode():
+        cs ^= byte
+    return cs
+
+
+def numbered(line_no: int, command: str) -> bytes:
+    line = f"N{line_no} {command}"
+    return f"{line}*{checksum(line)}\n".encode()
+
+
+def strip_comment(command: str) -> str:
+    return command.split(";", 1)[0].strip()
+
+
+def command_code(raw: bytes) -> str:
+    """``G28``, ``M400``, ... from a numbered line as sent."""
+    words = raw.decode(errors="replace").split("*", 1)[0].upper().split()
+    return words[1] if len(words) > 1 else ""
+
+
+class GcodeStreamer:
+    """Stream G-code with ``ok``-based flow control, resends and error tracking."""
+
+    def __init__(self, ser, rx_buffer: int = RX_BUFFER, max_in_flight: int = MAX_IN_FLIGHT,
+                 ok_timeout: float = OK_TIMEOUT, sync_margin: float = SYNC_MARGIN,
+                 home_timeout: float = HOME_TIMEOUT, time_scale: float = 1.0, verbose: bool = True):
+        self.ser = ser
+        self.rx_buffer = rx_buffer
+        self.max_in_flight = max_in_flight
+        self.ok_timeout = ok_timeout
+        self.sync_margin = sync_margin
+        self.home_timeout = home_timeout
+        self.time_scale = time_scale
+        self.verbose = verbose
+
+        self.errors: List[str] = []
+        self.resends = 0
+        self.timeouts = 0
+        self.keepalives = 0
+        self.sent = 0
+        self._missed_oks = 0
+
+        # Predicted motion: where the last queued move ends (None until an axis is known) and when it's done.
+        self._position: List[Optional[float]] = [None, None, None]
+        self._feed = 1000.0
+        self._relative = False
+        self._busy_until = time.monotonic()
+
+        self._cond = threading.Condition()
+        self._in_flight: Deque[Tuple[int, bytes]] = deque()
+        self._bytes = 0
+        self._next_line = 1
+        self._ignore_ok = 0
+        self._last_reply = time.monotonic()
+        self._fatal: Optional[str] = None
+        self._closed = False
+
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+        with self._cond:
+            self._transmit(0, numbered(0, "M110 N0"))  # restart line numbering
+
+    # -- sending -------------------------------------------------------------
+
+    def send(self, command: str) -> int:
+        """Queue one command, blocking only while the firmware's buffers are full. Returns its line number."""
+        command = strip_comment(command)
+        if not command:
+            return self._next_line - 1
+        with self._cond:
+            line_no = self._next_line
+            raw = numbered(line_no, command)
+            self._wait_until(lambda: not self._in_flight or (
+                len(self._in_flight) < self.max_in_flight and self._bytes + len(raw) <= self.rx_buffer
+            ))
+            self._next_line += 1
+            if self.verbose:
+                print(f"> {command}")
+            self._track(command)
+            self._transmit(line_no, raw)
+        return line_no
+
+    def send_lines(self, lines: Iterable[str]) -> int:
+        """Stream a whole program back-to-back. Returns the last line number."""
+        last = self._next_line - 1
+        for line in lines:
+            last = self.send(line)
+        return last
+
+    def wait(self, line_no: Optional[int] = None):
+        """Block until the firmware has acknowledged ``line_no`` (default: everything sent)."""
+        with self._cond:
+            target = self._next_line - 1 if line_no is None else line_no
+            self._wait_until(lambda: not self._in_flight or self._in_flight[0][0] > target)
+
+    def finish(self):
+        """Wait for every queued move to physically complete."""
+        self.wait(self.send("M400"))
+
+    def close(self):
+        self._closed = True
+        self._reader.join()
+
+    def _transmit(self, line_no: int, raw: bytes):
+        self._in_flight.append((line_no, raw))
+        self._bytes += len(raw)
+        self.sent += 1
+        self.ser.write(raw)
+
+    def _wait_until(self, predicate):
+        # Called with the condition held.
+        while not predicate():
+            if self._fatal:
+                raise GcodeError(self._fatal)
+            if self._closed:
+                raise GcodeError("streamer closed")
+            self._cond.wait(0.1)
+            if self._in_flight and time.monotonic() > self.reply_deadline(self._in_flight[0][1]):
+                self._on_timeout()
+
+    def reply_deadline(self, raw: bytes) -> float:
+        """When the ``ok`` for ``raw``, the oldest line in flight, counts as lost."""
+        code = command_code(raw)
+        if code in HOME_COMMANDS:
+            return self._last_reply + self.home_timeout
+        if code in SYNC_COMMANDS:
+            return max(self._last_reply, self._busy_until) + self.sync_margin
+        return self._last_reply + self.ok_timeout
+
+    def _track(self, command: str):
+        """Push the predicted end of queued motion out by what ``command`` adds."""
+        upper = command.upper()
+        code = upper.split()[0]
+        words = dict(WORD.findall(upper[len(code):]))
+        seconds = 0.0
+        if code in ("G0", "G1"):
+            if "F" in words:
+                self._feed = float(words["F"])
+            target = list(self._position)
+            for i, axis in enumerate("XYZ"):
+                if axis in words:
+                    value = float(words[axis])
+                    target[i] = (target[i] or 0.0) + value if self._relative else value
+            # An axis whose position isn't known yet contributes no distance.
+            delta = tuple(0.0 if a is None or b is None else b - a for a, b in zip(self._position, target))
+            if any(delta):
+                seconds = plan_seconds([Block(delta, self._feed)])[0]
+            self._position = target
+        elif code == "G4":
+            seconds = float(words["P"]) / 1000 if "P" in words else float(words.get("S", 0))
+        elif code == "G28":
+            self._position = [0.0, 0.0, 0.0]
+        elif code == "G92":
+            self._position = [float(words[axis]) if axis in words else self._position[i]
+                              for i, axis in enumerate("XYZ")]
+        elif code in ("G90", "G91"):
+            self._relative = code == "G91"
+        self._busy_until = max(time.monotonic(), self._busy_until) + seconds * self.time_scale
+
+    def _on_timeout(self):
+        self.timeouts += 1
+        self._missed_oks += 1
+        if self._missed_oks > MAX_TIMEOUTS:
+            raise GcodeTimeout(f"no reply from printer for line {self._in_flight[0][0]}")
+        line_no, raw = self._in_flight[0]
+        print(f"⚠️ No ok for line {line_no}, resending")
+        self._last_reply = time.monotonic()
+        self.ser.write(raw)
+
+    # -- receiving -----------------------------------------------------------
+
+    def _read_loop(self):
+        while not self._closed:
+            try:
+                line = self.ser.readline()
+            except Exception as e:  # port closed under us
+                with self._cond:
+                    self._fatal = f"serial read failed: {e}"
+                    self._cond.notify_all()
+                return
+            if line:
+                self._on_line(line.decode(errors="replace").strip())
+
+    def _on_line(self, line: str):
+        with self._cond:
+            self._last_reply = time.monotonic()
+            if line.startswith("ok"):
+                self._missed_oks = 0
+                if self._ignore_ok:
+                    self._ignore_ok -= 1
+                elif self._in_flight:
+                    _, raw = self._in_flight.popleft()
+                    self._bytes -= len(raw)
+                self._cond.notify_all()
+                return
+
+            if line.startswith(BUSY_PREFIXES):
+                self.keepalives += 1  # still working on the oldest line; _last_reply restarts its wait
+                self._missed_oks = 0
+                return
+
+            match = RESEND.match(line)
+            if match:
+                self._resend_from(int(match.group(1)))
+            elif line.startswith("Error:"):
+                self.errors.append(line)
+                print(f"⚠️ {line}")
+                if "halted" in line or "kill" in line.lower():
+                    self._fatal = line
+                    self._cond.notify_all()
+            elif self.verbose:
+                print(f"< {line}")
+
+    def _resend_from(self, line_no: int):
+        # The firmware has every line before ``line_no`` (their oks may have
+        # been lost), dropped the rest, and follows the request with one ok.
+        self.resends += 1
+        self._ignore_ok += 1
+        while self._in_flight and self._in_flight[0][0] < line_no:
+            _, raw = self._in_flight.popleft()
+            self._bytes -= len(raw)
+        if self.verbose:
+            print(f"< resend from line {line_no}")
+        for _, raw in self._in_flight:
+            self.ser.write(raw)
+        self._cond.notify_all()
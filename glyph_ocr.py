@@ -0,0 +1,247 @@
+"""
+CPU-only glyph-template OCR for Word Hunt boards.
+
+GamePigeon draws every tile in the same font, so a letter looks the same
+on every board up to scale. ``GlyphRecognizer`` learns one prototype per
+letter from a few labeled captures. A prototype is the mean of the
+normalized glyphs: each glyph's ink is cropped to its bounding box,
+resampled to ``GLYPH_SIZE`` squared and scaled to unit length. At run time all
+cells are normalized at once with numpy indexing and classified by cosine
+distance to every prototype in one matrix product, in about a millisecond
+per board.
+
+A cell whose best and second-best distances are closer than
+``MIN_MARGIN`` is handed to the fallback recognizer (the MemryX pipeline
+or easyocr). Without a fallback its best guess is kept.
+
+Labeled captures are board images named after their letters, row by row,
+e.g. ``captures/THISWATSOAHGFGDT.png``.
+
+Usage:
+    python glyph_ocr.py train captures/            # writes models/glyph_prototypes.npz
+    python glyph_ocr.py bench captures/            # ms per board and accuracy
+    python glyph_ocr.py read board.png
+
+    glyphs = GlyphRecognizer.load(PROTOTYPES_PATH, fallback=extract_with_model)
+    letters = glyphs(img, 4, 4)
+"""
+import argparse
+import os
+import string
+import time
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+PROTOTYPES_PATH = "models/glyph_prototypes.npz"
+GLYPH_SIZE = 20  # prototypes are GLYPH_SIZE x GLYPH_SIZE
+INK_LEVEL = 100  # a pixel is ink when its brightest channel is below this
+BORDER = 0.1  # fraction of each cell trimmed off every side (the tile edge)
+MIN_INK = 0.01  # cells with less ink than this are treated as unreadable
+MIN_MARGIN = 0.05  # cosine-distance gap to the runner-up below which a cell falls back
+SUPERSAMPLE = 2  # samples per glyph pixel along each axis, averaged for anti-aliasing
+
+Grid = List[List[str]]
+Fallback = Callable[[np.ndarray, int, int], Grid]
+
+
+def board_ink(img: np.ndarray, step: int = 1) -> np.ndarray:
+    """
+    Boolean ink mask of the centered square board (same crop as
+    ``screenshot_ocr``), keeping every ``step``-th pixel.
+    """
+    h, w = img.shape[:2]
+    size = min(h, w)
+    top, left = (h - size) // 2, (w - size) // 2
+    board = img[top:top + size:step, left:left + size:step]
+    if board.ndim == 3:
+        # Channel-wise maximum without a reduction over the short last axis, which numpy does slowly.
+        board = np.maximum(np.maximum(board[..., 0], board[..., 1]), board[..., 2])
+    return board < INK_LEVEL
+
+
+def cell_ink(img: np.ndarray, num_rows: int, num_cols: int, border: float = BORDER) -> np.ndarray:
+    """(num_rows * num_cols, h, w) ink masks, row-major, tile edges trimmed."""
+    # Glyphs are resampled to GLYPH_SIZE anyway: skip pixels beyond ~4 per glyph pixel.
+    step = max(1, min(img.shape[:2]) // max(num_rows, num_cols) // (4 * GLYPH_SIZE))
+    ink = board_ink(img, step)
+    ch, cw = ink.shape[0] // num_rows, ink.shape[1] // num_cols
+    cells = ink[:ch * num_rows, :cw * num_cols].reshape(num_rows, ch, num_cols, cw).swapaxes(1, 2)
+    ty, tx = int(ch * border), int(cw * border)
+    cells = cells[:, :, ty:ch - ty, tx:cw - tx]
+    return cells.reshape(num_rows * num_cols, ch - 2 * ty, cw - 2 * tx)
+
+
+def glyph_features(cells: np.ndarray, size: int = GLYPH_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Crop every cell to its ink bounding box and resample it to ``size`` x
+    ``size`` in one gather. Returns unit-length feature rows and a mask of
+    cells that had enough ink to read.
+    """
+    n, h, w = cells.shape
+    rows, cols = cells.any(axis=2), cells.any(axis=1)
+    has_ink = cells.mean(axis=(1, 2)) >= MIN_INK
+    top = rows.argmax(axis=1)
+    bottom = h - rows[:, ::-1].argmax(axis=1)
+    left = cols.argmax(axis=1)
+    right = w - cols[:, ::-1].argmax(axis=1)
+    # Keep the aspect ratio: sample a square box centered on the glyph.
+    side = np.maximum(bottom - top, right - left)
+    cy, cx = (top + bottom) / 2, (left + right) / 2
+
+    steps = (np.arange(size * SUPERSAMPLE) + 0.5) / (size * SUPERSAMPLE) - 0.5
+    ys = np.floor(cy[:, None] + steps[None, :] * side[:, None]).astype(np.int64)
+    xs = np.floor(cx[:, None] + steps[None, :] * side[:, None]).astype(np.int64)
+    inside_y, inside_x = (ys >= 0) & (ys < h), (xs >= 0) & (xs < w)
+    samples = cells[np.arange(n)[:, None, None], np.clip(ys, 0, h - 1)[:, :, None], np.clip(xs, 0, w - 1)[:, None, :]]
+    samples &= inside_y[:, :, None] & inside_x[:, None, :]
+    glyphs = samples.reshape(n, size, SUPERSAMPLE, size, SUPERSAMPLE).mean(axis=(2, 4), dtype=np.float32)
+
+    features = glyphs.reshape(n, size * size)
+    features -= features.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    features /= np.maximum(norms, 1e-6)
+    return features, has_ink
+
+
+def parse_label(path: str, num_cells: int) -> Optional[str]:
+    """Board letters from a capture's file name, or None if it isn't a label."""
+    name = os.path.splitext(os.path.basename(path))[0].upper()
+    return name if len(name) == num_cells and name.isalpha() else None
+
+
+def labeled_captures(folder: str, num_rows: int = 4, num_cols: int = 4) -> List[Tuple[str, str]]:
+    captures = []
+    for name in sorted(os.listdir(folder)):
+        label = parse_label(name, num_rows * num_cols)
+        if label and name.lower().endswith((".png", ".jpg", ".jpeg", ".bmp")):
+            captures.append((os.path.join(folder, name), label))
+    return captures
+
+
+class GlyphRecognizer:
+    """Nearest-prototype letter classifier with a fallback for ambiguous cells."""
+
+    def __init__(self, prototypes: np.ndarray, letters: Sequence[str], fallback: Optional[Fallback] = None,
+                 min_margin: float = MIN_MARGIN):
+        self.prototypes = np.asarray(prototypes, dtype=np.float32)
+        self.letters = np.array(list(letters))
+        self.size = int(round(np.sqrt(self.prototypes.shape[1])))
+        self.fallback = fallback
+        self.min_margin = min_margin
+        self.boards = 0
+        self.fallbacks = 0  # cells sent to the fallback
+
+    @classmethod
+    def train(cls, samples: Iterable[Tuple[np.ndarray, str]], num_rows: int = 4, num_cols: int = 4,
+              size: int = GLYPH_SIZE, **kwargs) -> "GlyphRecognizer":
+        """Average the glyphs of every letter over labeled boards (image, 16-letter string)."""
+        sums, counts = {}, {}
+        for img, label in samples:
+            features, has_ink = glyph_features(cell_ink(img, num_rows, num_cols), size)
+            for letter, feature, ok in zip(label.upper(), features, has_ink):
+                if ok:
+                    sums[letter] = sums.get(letter, 0) + feature
+                    counts[letter] = counts.get(letter, 0) + 1
+        if not sums:
+            raise ValueError("No labeled glyphs to learn from")
+        letters = sorted(sums)
+        prototypes = np.stack([sums[letter] / counts[letter] for letter in letters])
+        prototypes /= np.linalg.norm(prototypes, axis=1, keepdims=True)
+        missing = sorted(set(string.ascii_uppercase) - set(letters))
+        if missing:
+            print(f"⚠️ No samples for {''.join(missing)}; those letters can only come from the fallback")
+        return cls(prototypes, letters, **kwargs)
+
+    @classmethod
+    def load(cls, path: str = PROTOTYPES_PATH, **kwargs) -> "GlyphRecognizer":
+        data = np.load(path)
+        return cls(data["prototypes"], str(data["letters"]), **kwargs)
+
+    def save(self, path: str = PROTOTYPES_PATH):
+        np.savez_compressed(path, prototypes=self.prototypes, letters="".join(self.letters))
+
+    def classify(self, img: np.ndarray, num_rows: int = 4, num_cols: int = 4) -> Tuple[List[str], np.ndarray]:
+        """Best letter per cell (row-major) and its margin over the runner-up (0 when unreadable)."""
+        features, has_ink = glyph_features(cell_ink(img, num_rows, num_cols), self.size)
+        distances = 1.0 - features @ self.prototypes.T
+        if distances.shape[1] < 2:
+            return self.letters[distances.argmin(axis=1)].tolist(), np.where(has_ink, 1.0, 0.0).astype(np.float32)
+        best = distances.argmin(axis=1)
+        two = np.partition(distances, 1, axis=1)
+        margins = two[:, 1] - two[:, 0]
+        margins[~has_ink] = 0.0
+        return self.letters[best].tolist(), margins
+
+    def __call__(self, img: np.ndarray, num_rows: int = 4, num_cols: int = 4,
+                 fallback: Optional[Fallback] = None) -> Grid:
+        letters, margins = self.classify(img, num_rows, num_cols)
+        unsure = np.flatnonzero(margins < self.min_margin)
+        fallback = fallback or self.fallback
+        self.boards += 1
+        if len(unsure) and fallback is not None:
+            self.fallbacks += len(unsure)
+            model = [ch for row in fallback(img, num_rows, num_cols) for ch in row]
+            for i in unsure:
+                letters[i] = model[i].upper()
+        elif len(unsure):
+            print(f"⚠️ {len(unsure)} low-confidence cells and no fallback; keeping the best guesses")
+        return [letters[r * num_cols:(r + 1) * num_cols] for r in range(num_rows)]
+
+
+def _read(path: str) -> np.ndarray:
+    import cv2
+
+    img = cv2.imread(path)
+    if img is None:
+        raise ValueError(f"Can't read {path}")
+    return img
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Glyph-template OCR for Word Hunt boards")
+    parser.add_argument("command", choices=["train", "bench", "read"])
+    parser.add_argument("path", help="folder of labeled captures (train/bench) or one image (read)")
+    parser.add_argument("--prototypes", default=PROTOTYPES_PATH)
+    parser.add_argument("--rows", type=int, default=4)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == "read":
+        glyphs = GlyphRecognizer.load(args.prototypes)
+        letters, margins = glyphs.classify(_read(args.path), args.rows, args.cols)
+        for r in range(args.rows):
+            cells = range(r * args.cols, (r + 1) * args.cols)
+            print(" ".join(letters[i] for i in cells) + "    " + " ".join(f"{margins[i]:.2f}" for i in cells))
+        return
+
+    captures = labeled_captures(args.path, args.rows, args.cols)
+    if not captures:
+        raise SystemExit(f"No labeled captures (e.g. THISWATSOAHGFGDT.png) in {args.path}")
+    samples = [(_read(path), label) for path, label in captures]
+
+    if args.command == "train":
+        glyphs = GlyphRecognizer.train(samples, args.rows, args.cols)
+        glyphs.save(args.prototypes)
+        print(f"✅ {len(glyphs.letters)} letter prototypes from {len(samples)} boards written to {args.prototypes}")
+        return
+
+    glyphs = GlyphRecognizer.load(args.prototypes)
+    correct = unsure = 0
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for img, _ in samples:
+            glyphs.classify(img, args.rows, args.cols)
+    per_board = (time.perf_counter() - start) / (args.repeat * len(samples))
+    for img, label in samples:
+        letters, margins = glyphs.classify(img, args.rows, args.cols)
+        correct += sum(a == b for a, b in zip(letters, label))
+        unsure += int((margins < glyphs.min_margin).sum())
+    cells = len(samples) * args.rows * args.cols
+    print(f"{len(samples)} boards: {per_board * 1000:.2f} ms/board, {correct}/{cells} cells correct, "
+          f"{unsure} would fall back")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Binary image frames for the PC -> Pi websocket.
+
+The PC sends the cropped board as uint8 pixels (raw, PNG or JPEG) behind a
+small fixed header instead of a JSON list of floats; the Pi decodes it and
+does the float normalization for the model itself.
+
+Frame layout (little-endian):
+
+    magic "WHIM" | version u8 | codec u8 | dtype u8 | height u16 | width u16 | channels u8 | payload
+
+Usage:
+    frame = encode_frame(img, "jpeg")     # PC
+    img = decode_frame(frame)             # Pi
+    inp = normalize_for_model(img)        # Pi, float32 NCHW
+
+    python image_codec.py screenshot2.jpg   # bytes on the wire and latency per codec
+"""
+import struct
+import sys
+import time
+
+import numpy as np
+
+MAGIC = b"WHIM"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBHHB")
+
+CODECS = {"raw": 0, "png": 1, "jpeg": 2}
+CODEC_NAMES = {v: k for k, v in CODECS.items()}
+DTYPES = {1: np.dtype(np.uint8), 2: np.dtype(np.float32)}
+DTYPE_CODES = {v: k for k, v in DTYPES.items()}
+
+JPEG_QUALITY = 90
+
+
+def encode_frame(img: np.ndarray, codec: str = "raw", quality: int = JPEG_QUALITY) -> bytes:
+    """Pack an HxW or HxWxC image into a binary frame."""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec {codec!r}, expected one of {sorted(CODECS)}")
+    if img.dtype not in DTYPE_CODES:
+        raise ValueError(f"Unsupported dtype {img.dtype}")
+    height, width = img.shape[:2]
+    channels = 1 if img.ndim == 2 else img.shape[2]
+
+    if codec == "raw":
+        payload = np.ascontiguousarray(img).tobytes()
+    else:
+        import cv2
+        if img.dtype != np.uint8:
+            raise ValueError(f"{codec} frames must be uint8")
+        params = [cv2.IMWRITE_JPEG_QUALITY, quality] if codec == "jpeg" else [cv2.IMWRITE_PNG_COMPRESSION, 1]
+        ok, buf = cv2.imencode(".jpg" if codec == "jpeg" else ".png", img, params)
+        if not ok:
+            raise ValueError(f"cv2 could not encode {codec}")
+        payload = buf.tobytes()
+
+    header = HEADER.pack(MAGIC, VERSION, CODECS[codec], DTYPE_CODES[img.dtype], height, width, channels)
+    return header + payload
+
+
+def decode_frame(frame: bytes) -> np.ndarray:
+    """Unpack a frame made by ``encode_frame``."""
+    magic, version, codec, dtype_code, height, width, channels = HEADER.unpack_from(frame, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not an image frame")
+    payload = memoryview(frame)[HEADER.size:]
+    shape = (height, width) if channels == 1 else (height, width, channels)
+
+    if CODEC_NAMES[codec] == "raw":
+        return np.frombuffer(payload, dtype=DTYPES[dtype_code]).reshape(shape)
+
+    import cv2
+    flags = cv2.IMREAD_GRAYSCALE if channels == 1 else cv2.IMREAD_COLOR
+    img = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), flags)
+    if img is None or img.shape != shape:
+        raise ValueError(f"Corrupt {CODEC_NAMES[codec]} frame")
+    return img
+
+
+def is_frame(message) -> bool:
+    return isinstance(message, (bytes, bytearray)) and bytes(message[:len(MAGIC)]) == MAGIC
+
+
+def normalize_for_model(img: np.ndarray) -> np.ndarray:
+    """uint8 HxWxC -> float32 1xCxHxW in [0, 1], as the compiled pipeline expects."""
+    return np.transpose(img.astype(np.float32) / 255.0, (2, 0, 1))[None, ...]
+
+
+def encode_board_frame(img_bgr: np.ndarray, codec: str = "jpeg", size: int = 640) -> bytes:
+    """PC side: resize a BGR board screenshot to the model size, convert to RGB and encode."""
+    import cv2
+    inp = cv2.cvtColor(cv2.resize(img_bgr, (size, size)), cv2.COLOR_BGR2RGB)
+    return encode_frame(inp, codec)
+
+
+def benchmark(img: np.ndarray, repeats: int = 20):
+    import json
+
+    legacy = np.transpose(img.astype(np.float32) / 255.0, (2, 0, 1))[None, ...]
+    start = time.perf_counter()
+    for _ in range(max(1, repeats // 10)):
+        text = json.dumps(legacy.tolist())
+    legacy_ms = (time.perf_counter() - start) / max(1, repeats // 10) * 1000
+    print(f"{'codec':>8} {'bytes':>10} {'encode ms':>10} {'decode ms':>10}")
+    print(f"{'json':>8} {len(text):10d} {legacy_ms:10.2f} {'-':>10}")
+
+    for codec in CODECS:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            frame = encode_frame(img, codec)
+        encode_ms = (time.perf_counter() - start) / repeats * 1000
+        start = time.perf_counter()
+        for _ in range(repeats):
+            decode_frame(frame)
+        decode_ms = (time.perf_counter() - start) / repeats * 1000
+        print(f"{codec:>8} {len(frame):10d} {encode_ms:10.2f} {decode_ms:10.2f}")
+
+
+if __name__ == "__main__":
+    import cv2
+
+    image = cv2.imread(sys.argv[1]) if len(sys.argv) > 1 else None
+    if image is None:
+        image = np.random.default_rng(0).integers(0, 256, (362, 352, 3), dtype=np.uint8)
+    image = cv2.cvtColor(cv2.resize(image, (640, 640)), cv2.COLOR_BGR2RGB)
+    benchmark(image)
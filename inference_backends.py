@@ -0,0 +1,346 @@
+"""
+Pluggable letter-grid inference backends for the Pi.
+
+Every backend turns one uint8 RGB board image (as decoded from a board
+frame) into a num_rows x num_cols grid of letters, or with ``candidates``
+into each cell's top letters and their confidences for ``fuzzy_solver``:
+
+- ``memryx``: the compiled YOLO + OCR pipeline (``DFP_PATH``) on the MemryX
+  accelerator, through ``accel_pipeline.InferencePipeline``.
+- ``onnx``: the OCR model on the CPU with ONNX Runtime. The board is
+  already cropped to the grid, so no detector is needed: each cell is
+  cropped to its letter, preprocessed as in ``OCR_model.ipynb`` (28x28,
+  gray, inverted, /255), and all cells go through one ``session.run``.
+  The session is created once, with its thread counts set.
+- ``glyph``: ``glyph_ocr`` templates alone.
+
+The repo only ships the post-processing head of the YOLO model as ONNX
+(``model_0_yoloactual_post.onnx``), not a runnable detector, so the CPU
+path uses the OCR model alone. ``python inference_backends.py export``
+converts ``models/model_1_ocr_model_crop.h5`` to ``OCR_ONNX_PATH``. It
+builds the graph from the Keras weights with ``onnx`` and ``h5py``, so
+TensorFlow isn't needed.
+
+Usage:
+    backend = make_backend("onnx")
+    letters = backend.letters(rgb_board)      # [['T', 'H', ...], ...]
+    cells = backend.candidates(rgb_board)     # [[[('t', 0.97), ('f', 0.02), ...], ...], ...]
+    backend.close()
+
+    python inference_backends.py export
+    python inference_backends.py bench captures/ --backends onnx memryx glyph
+"""
+import abc
+import argparse
+import json
+import os
+import statistics
+import string
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from fuzzy_solver import CandidateBoard, candidates_from_probs, certain_board
+
+DFP_PATH = "models/yolo_ocr_pipeline.dfp"
+OCR_H5_PATH = "models/model_1_ocr_model_crop.h5"
+OCR_ONNX_PATH = "models/ocr_model.onnx"
+OCR_SIZE = 28  # OCR model input is OCR_SIZE x OCR_SIZE x 1
+OCR_MARGIN = 4  # blank pixels around the letter, as in the 28x28 training images
+INK_LEVEL = 100  # a gray pixel darker than this is part of a letter
+BORDER = 0.1  # fraction of each cell trimmed off every side (the tile edge)
+MAX_THREADS = 4
+
+Grid = List[List[str]]
+
+
+class InferenceBackend(abc.ABC):
+    """Board image in, letter grid out."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def letters(self, img: np.ndarray, num_rows: int = 4, num_cols: int = 4) -> Grid:
+        """Uppercase letters, one row per board row."""
+
+    def candidates(self, img: np.ndarray, num_rows: int = 4, num_cols: int = 4, k: int = 3) -> CandidateBoard:
+        """Each cell's top ``k`` letters with their confidences. Backends without scores report certainty."""
+        return certain_board(self.letters(img, num_rows, num_cols))
+
+    def close(self):
+        pass
+
+
+class MemryXBackend(InferenceBackend):
+    """The compiled YOLO + OCR pipeline on the MemryX accelerator."""
+
+    name = "memryx"
+
+    def __init__(self, dfp_path: str = DFP_PATH, num_rows: int = 4, num_cols: int = 4):
+        from memryx import AsyncAccl
+        from accel_pipeline import InferencePipeline
+
+        self.accl = AsyncAccl(dfp_path)
+        self.pipeline = InferencePipeline(self.accl, num_rows, num_cols)  # callbacks wired once
+
+    def letters(self, img: np.ndarray, num_rows: int = 4, num_cols: int = 4) -> Grid:
+        return self.pipeline.submit(img, num_rows, num_cols).result()
+
+    def close(self):
+        self.pipeline.close()
+        self.accl.shutdown()
+
+
+def letter_crops(img: np.ndarray, num_rows: int = 4, num_cols: int = 4, border: float = BORDER) -> np.ndarray:
+    """
+    (num_rows * num_cols, OCR_SIZE, OCR_SIZE, 1) float32 model input: each
+    cell's letter cropped to a square around its ink, resized, inverted to
+    white-on-black and scaled to [0, 1], row-major.
+    """
+    import cv2
+
+    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY) if img.ndim == 3 else img
+    size = min(gray.shape)
+    top, left = (gray.shape[0] - size) // 2, (gray.shape[1] - size) // 2
+    ch, cw = size // num_rows, size // num_cols
+    board = gray[top:top + ch * num_rows, left:left + cw * num_cols]
+    cells = board.reshape(num_rows, ch, num_cols, cw).swapaxes(1, 2).reshape(num_rows * num_cols, ch, cw)
+    ty, tx = int(ch * border), int(cw * border)
+    cells = cells[:, ty:ch - ty, tx:cw - tx]
+
+    inner = OCR_SIZE - 2 * OCR_MARGIN
+    crops = np.zeros((len(cells), OCR_SIZE, OCR_SIZE), dtype=np.uint8)
+    for i, cell in enumerate(cells):
+        ys, xs = np.nonzero(cell < INK_LEVEL)
+        if len(ys):
+            cell = cell[ys.min():ys.max() + 1, xs.min():xs.max() + 1]
+        h, w = cell.shape
+        side = max(h, w)
+        square = np.full((side, side), 255, dtype=np.uint8)
+        square[(side - h) // 2:(side - h) // 2 + h, (side - w) // 2:(side - w) // 2 + w] = cell
+        letter = cv2.resize(square, (inner, inner), interpolation=cv2.INTER_AREA)
+        crops[i, OCR_MARGIN:OCR_MARGIN + inner, OCR_MARGIN:OCR_MARGIN + inner] = 255 - letter
+    return (crops.astype(np.float32) / 255.0)[..., None]
+
+
+class OnnxBackend(InferenceBackend):
+    """The OCR model on the CPU with ONNX Runtime, one batched run per board."""
+
+    name = "onnx"
+
+    def __init__(self, model_path: str = OCR_ONNX_PATH, threads: Optional[int] = None,
+                 num_rows: int = 4, num_cols: int = 4):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        # One small batch per board: a few intra-op threads help, more just contend with the solver.
+        options.intra_op_num_threads = threads or min(MAX_THREADS, os.cpu_count() or 1)
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def probabilities(self, img: np.ndarray, num_rows: int = 4, num_cols: int = 4) -> np.ndarray:
+        return self.session.run(None, {self.input_name: letter_crops(img, num_rows, num_cols)})[0]
+
+    def letters(self, img: np.ndarray, num_rows: int = 4, num_cols: int = 4) -> Grid:
+        ids = self.probabilities(img, num_rows, num_cols).argmax(axis=1).reshape(num_rows, num_cols)
+        return [[string.ascii_uppercase[i] for i in row] for row in ids]
+
+    def candidates(self, img: np.ndarray, num_rows: int = 4, num_cols: int = 4, k: int = 3) -> CandidateBoard:
+        return candidates_from_probs(self.probabilities(img, num_rows, num_cols), num_rows, num_cols, k)
+
+
+class GlyphBackend(InferenceBackend):
+    """``glyph_ocr`` templates with no fallback."""
+
+    name = "glyph"
+
+    def __init__(self, prototypes_path: Optional[str] = None, num_rows: int = 4, num_cols: int = 4):
+        from glyph_ocr import PROTOTYPES_PATH, GlyphRecognizer
+
+        self.glyphs = GlyphRecognizer.load(prototypes_path or PROTOTYPES_PATH)
+
+    def letters(self, img: np.ndarray, num_rows: int = 4, num_cols: int = 4) -> Grid:
+        letters, _ = self.glyphs.classify(img, num_rows, num_cols)
+        return [letters[r * num_cols:(r + 1) * num_cols] for r in range(num_rows)]
+
+
+BACKENDS = {
+    "memryx": MemryXBackend,
+    "onnx": OnnxBackend,
+    "glyph": GlyphBackend,
+}
+
+
+def make_backend(name: str, **kwargs) -> InferenceBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend {name!r} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](**kwargs)
+
+
+# -- Keras -> ONNX ---------------------------------------------------------------
+
+def export_onnx(h5_path: str = OCR_H5_PATH, onnx_path: str = OCR_ONNX_PATH, opset: int = 13):
+    """
+    Rebuild the Sequential OCR model (Conv2D, MaxPooling2D, Dropout, Flatten,
+    Dense) as an ONNX graph from its saved weights. The input stays NHWC,
+    like the Keras model, with a dynamic batch dimension.
+    """
+    import h5py
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    activations = {"relu": "Relu", "softmax": "Softmax", "sigmoid": "Sigmoid", "linear": None}
+    nodes, initializers = [], []
+    with h5py.File(h5_path, "r") as f:
+        config = json.loads(f.attrs["model_config"])
+        weights = f["model_weights"]
+        layers = config["config"]["layers"]
+        first = layers[0]["config"]
+        shape = first.get("batch_input_shape") or first.get("batch_shape")
+        tensor, layout = "input", "nhwc"
+
+        def add(op, inputs, name, **attrs):
+            nodes.append(helper.make_node(op, inputs, [name], name=name, **attrs))
+            return name
+
+        def weight(layer, kind):
+            group = weights[layer][layer]
+            key = next(k for k in group if k.startswith(kind))
+            return np.asarray(group[key], dtype=np.float32)
+
+        def activate(name, activation):
+            op = activations[activation]
+            if op is None:
+                return name
+            return add(op, [name], f"{name}_{activation}", **({"axis": -1} if op == "Softmax" else {}))
+
+        for layer in layers:
+            kind, cfg = layer["class_name"], layer["config"]
+            name = cfg["name"]
+            if kind in ("InputLayer", "Dropout"):
+                continue
+            if kind in ("Conv2D", "MaxPooling2D") and layout == "nhwc":
+                tensor, layout = add("Transpose", [tensor], f"{name}_to_nchw", perm=[0, 3, 1, 2]), "nchw"
+            if kind == "Conv2D":
+                if cfg.get("padding", "valid") != "valid":
+                    raise ValueError(f"{name}: only 'valid' padding is supported")
+                kernel = weight(name, "kernel").transpose(3, 2, 0, 1)  # HWIO -> OIHW
+                initializers += [numpy_helper.from_array(kernel, f"{name}_W"),
+                                 numpy_helper.from_array(weight(name, "bias"), f"{name}_B")]
+                tensor = add("Conv", [tensor, f"{name}_W", f"{name}_B"], name,
+                             kernel_shape=list(cfg["kernel_size"]), strides=list(cfg.get("strides", [1, 1])))
+                tensor = activate(tensor, cfg.get("activation", "linear"))
+            elif kind == "MaxPooling2D":
+                pool = list(cfg["pool_size"])
+                tensor = add("MaxPool", [tensor], name, kernel_shape=pool, strides=list(cfg.get("strides") or pool))
+            elif kind == "Flatten":
+                if layout == "nchw":  # Keras flattens channels-last
+                    tensor, layout = add("Transpose", [tensor], f"{name}_to_nhwc", perm=[0, 2, 3, 1]), "nhwc"
+                tensor = add("Flatten", [tensor], name, axis=1)
+            elif kind == "Dense":
+                initializers += [numpy_helper.from_array(weight(name, "kernel"), f"{name}_W"),
+                                 numpy_helper.from_array(weight(name, "bias"), f"{name}_B")]
+                tensor = add("Gemm", [tensor, f"{name}_W", f"{name}_B"], name)
+                tensor = activate(tensor, cfg.get("activation", "linear"))
+            else:
+                raise ValueError(f"Unsupported layer {kind} ({name})")
+
+    nodes.append(helper.make_node("Identity", [tensor], ["probabilities"], name="probabilities"))
+    graph = helper.make_graph(
+        nodes, "ocr_model",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, ["batch"] + list(shape[1:]))],
+        [helper.make_tensor_value_info("probabilities", TensorProto.FLOAT, ["batch", None])],
+        initializers,
+    )
+    # Pin the IR version: a newer onnx package would otherwise stamp one older runtimes (the Pi's) reject.
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", opset)], producer_name="inference_backends",
+                              ir_version=8)
+    onnx.checker.check_model(model)
+    onnx.save(model, onnx_path)
+    print(f"✅ Wrote {onnx_path} ({len(nodes)} nodes) from {h5_path}")
+
+
+# -- benchmark -------------------------------------------------------------------
+
+def load_capture(path: str, size: int = 640) -> np.ndarray:
+    """A saved BGR capture as the Pi sees it: resized to the model size, RGB."""
+    import cv2
+
+    img = cv2.imread(path)
+    if img is None:
+        raise ValueError(f"Can't read {path}")
+    return cv2.cvtColor(cv2.resize(img, (size, size)), cv2.COLOR_BGR2RGB)
+
+
+def benchmark(folder: str, names: List[str], repeat: int = 10, num_rows: int = 4, num_cols: int = 4,
+              threads: Optional[int] = None) -> Dict[str, dict]:
+    from glyph_ocr import labeled_captures
+
+    captures = labeled_captures(folder, num_rows, num_cols)
+    if not captures:
+        raise SystemExit(f"No labeled captures (e.g. THISWATSOAHGFGDT.png) in {folder}")
+    samples = [(load_capture(path), label) for path, label in captures]
+    cells = len(samples) * num_rows * num_cols
+    results = {}
+    for name in names:
+        kwargs = {"threads": threads} if name == "onnx" and threads else {}
+        try:
+            backend = make_backend(name, num_rows=num_rows, num_cols=num_cols, **kwargs)
+        except Exception as e:  # missing package or model file, no card: each runtime raises its own type
+            print(f"{name:8s} unavailable: {e}")
+            continue
+        try:
+            backend.letters(samples[0][0], num_rows, num_cols)  # warm up
+            latencies, correct = [], 0
+            for _ in range(repeat):
+                for img, label in samples:
+                    start = time.perf_counter()
+                    grid = backend.letters(img, num_rows, num_cols)
+                    latencies.append(time.perf_counter() - start)
+            for img, label in samples:
+                grid = backend.letters(img, num_rows, num_cols)
+                correct += sum(a.upper() == b for a, b in zip((ch for row in grid for ch in row), label))
+        finally:
+            backend.close()
+        latencies.sort()
+        results[name] = {
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000,
+            "accuracy": correct / cells,
+        }
+        r = results[name]
+        print(f"{name:8s} p50 {r['p50_ms']:8.2f} ms  p95 {r['p95_ms']:8.2f} ms  "
+              f"accuracy {correct}/{cells} ({r['accuracy']:.1%})")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Letter-grid inference backends")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="convert the Keras OCR model to ONNX")
+    export.add_argument("--h5", default=OCR_H5_PATH)
+    export.add_argument("--onnx", default=OCR_ONNX_PATH)
+    bench = sub.add_parser("bench", help="compare backends on labeled captures")
+    bench.add_argument("folder", help="captures named after their letters, e.g. THISWATSOAHGFGDT.png")
+    bench.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    bench.add_argument("--repeat", type=int, default=10)
+    bench.add_argument("--threads", type=int, help="ONNX Runtime intra-op threads")
+    bench.add_argument("--json", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_onnx(args.h5, args.onnx)
+        return
+    results = benchmark(args.folder, args.backends, args.repeat, threads=args.threads)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
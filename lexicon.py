@@ -0,0 +1,268 @@
+"""
+Compact, memory-mappable lexicon for the Word Hunt solver.
+
+The pickled ``trie.pkl`` is a nested dict keyed by letter with a ``"$"``
+terminal marker. Unpickling it builds ~600k small dicts, which is slow and
+memory hungry on the Raspberry Pi. This module compiles the same words into a
+minimized DAWG stored as two flat ``uint32`` arrays that are mapped straight
+from disk with ``mmap`` (no parsing, pages shared between processes).
+
+File layout (little-endian):
+
+    header  magic "WHLX", version, node_count, edge_count, root
+    nodes   node_count x (mask, edge_base)
+    edges   edge_count x child node id
+
+``mask`` has bit ``i`` set when the node has a child for letter ``chr(97+i)``
+and bit 31 set when the node ends a word. The children of a node are stored
+in letter order at ``edges[edge_base:]``, so the child for a letter is found
+with a popcount of the lower mask bits.
+
+Usage:
+    python lexicon.py trie.pkl trie.lex
+    python lexicon.py words.txt trie.lex
+"""
+import argparse
+import mmap
+import pickle
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"WHLX"
+VERSION = 1
+HEADER = struct.Struct("<4sIIII")
+TERMINAL_BIT = 1 << 31
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+LETTER_BITS = {ch: 1 << i for i, ch in enumerate(ALPHABET)}
+
+
+class Lexicon:
+    """A compiled lexicon file mapped into memory."""
+
+    def __init__(self, filepath: str):
+        self._file = open(filepath, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, node_count, edge_count, root = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filepath} is not a v{VERSION} lexicon file")
+
+        nodes_start = HEADER.size
+        edges_start = nodes_start + 8 * node_count
+        end = edges_start + 4 * edge_count
+        if sys.byteorder == "little":
+            buf = memoryview(self._mmap)
+            self.nodes = buf[nodes_start:edges_start].cast("I")
+            self.edges = buf[edges_start:end].cast("I")
+        else:
+            # Big-endian hosts can't use the file as-is; fall back to a copy.
+            self.nodes = array("I", self._mmap[nodes_start:edges_start])
+            self.edges = array("I", self._mmap[edges_start:end])
+            self.nodes.byteswap()
+            self.edges.byteswap()
+
+        self.node_count = node_count
+        self.edge_count = edge_count
+        self.root_id = root
+
+    @property
+    def root(self) -> "LexiconNode":
+        return LexiconNode(self, self.root_id)
+
+    def child(self, node_id: int, letter: str) -> int:
+        """Return the child node id for ``letter``, or -1 if there is none."""
+        bit = LETTER_BITS.get(letter)
+        mask = self.nodes[2 * node_id]
+        if bit is None or not mask & bit:
+            return -1
+        return self.edges[self.nodes[2 * node_id + 1] + (mask & (bit - 1)).bit_count()]
+
+    def is_terminal(self, node_id: int) -> bool:
+        return bool(self.nodes[2 * node_id] & TERMINAL_BIT)
+
+    def __contains__(self, word: str) -> bool:
+        node_id = self.root_id
+        for letter in word:
+            node_id = self.child(node_id, letter)
+            if node_id < 0:
+                return False
+        return self.is_terminal(node_id)
+
+    def words(self) -> Iterator[str]:
+        """Yield every word in the lexicon in alphabetical order."""
+        stack = [(self.root_id, "")]
+        while stack:
+            node_id, prefix = stack.pop()
+            mask = self.nodes[2 * node_id]
+            if mask & TERMINAL_BIT:
+                yield prefix
+            base = self.nodes[2 * node_id + 1]
+            children = []
+            for i, ch in enumerate(ALPHABET):
+                if mask & (1 << i):
+                    children.append((self.edges[base + len(children)], prefix + ch))
+            stack.extend(reversed(children))
+
+    def close(self):
+        if isinstance(self.nodes, memoryview):
+            self.nodes.release()
+            self.edges.release()
+        self._mmap.close()
+        self._file.close()
+
+
+class LexiconNode:
+    """
+    Read-only view of one lexicon node that behaves like the nested dicts of
+    ``trie.pkl`` (``node.get(letter)``, ``"$" in node``, ``node.items()``), so
+    ``solver.dfs`` can walk either format unchanged.
+    """
+
+    __slots__ = ("lexicon", "node_id")
+
+    def __init__(self, lexicon: Lexicon, node_id: int):
+        self.lexicon = lexicon
+        self.node_id = node_id
+
+    def get(self, letter: str, default=None):
+        child = self.lexicon.child(self.node_id, letter)
+        return LexiconNode(self.lexicon, child) if child >= 0 else default
+
+    def __getitem__(self, letter: str):
+        node = self.get(letter)
+        if node is None:
+            raise KeyError(letter)
+        return node
+
+    def __contains__(self, key: str) -> bool:
+        if key == "$":
+            return self.lexicon.is_terminal(self.node_id)
+        return self.lexicon.child(self.node_id, key) >= 0
+
+    def keys(self) -> List[str]:
+        mask = self.lexicon.nodes[2 * self.node_id]
+        keys = [ch for ch, bit in LETTER_BITS.items() if mask & bit]
+        if mask & TERMINAL_BIT:
+            keys.append("$")
+        return keys
+
+    def items(self) -> List[Tuple[str, "LexiconNode"]]:
+        return [(ch, self[ch]) for ch in self.keys() if ch != "$"]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, LexiconNode)
+            and other.lexicon is self.lexicon
+            and other.node_id == self.node_id
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.lexicon), self.node_id))
+
+
+def load_lexicon(filepath: str) -> Lexicon:
+    return Lexicon(filepath)
+
+
+def is_lexicon_file(filepath: str) -> bool:
+    with open(filepath, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def trie_from_words(words) -> dict:
+    """Build a ``trie.pkl``-style nested dict from an iterable of words."""
+    trie: dict = {}
+    for word in words:
+        word = word.strip().lower()
+        if not word or any(ch not in LETTER_BITS for ch in word):
+            continue
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node["$"] = True
+    return trie
+
+
+def compile_trie(trie: dict) -> Tuple[array, array, int]:
+    """
+    Minimize a nested-dict trie into a DAWG. Returns ``(nodes, edges, root)``
+    arrays in the on-disk layout.
+    """
+    nodes = array("I")
+    edges = array("I")
+    registry: Dict[Tuple[bool, Tuple[Tuple[str, int], ...]], int] = {}
+
+    def visit(node: dict) -> int:
+        children = tuple(
+            (ch, visit(node[ch])) for ch in sorted(node) if ch != "$"
+        )
+        key = ("$" in node, children)
+        node_id = registry.get(key)
+        if node_id is not None:
+            return node_id
+
+        mask = TERMINAL_BIT if "$" in node else 0
+        for ch, _ in children:
+            if ch not in LETTER_BITS:
+                raise ValueError(f"unsupported trie key {ch!r}")
+            mask |= LETTER_BITS[ch]
+        node_id = len(nodes) // 2
+        nodes.extend((mask, len(edges)))
+        edges.extend(child_id for _, child_id in children)
+        registry[key] = node_id
+        return node_id
+
+    root = visit(trie)
+    return nodes, edges, root
+
+
+def write_lexicon(trie: dict, filepath: str) -> Tuple[int, int]:
+    """Compile ``trie`` and write it to ``filepath``. Returns (nodes, edges)."""
+    nodes, edges, root = compile_trie(trie)
+    if sys.byteorder != "little":
+        nodes.byteswap()
+        edges.byteswap()
+    node_count, edge_count = len(nodes) // 2, len(edges)
+    with open(filepath, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, node_count, edge_count, root))
+        nodes.tofile(f)
+        edges.tofile(f)
+    return node_count, edge_count
+
+
+def load_source(filepath: str) -> dict:
+    """Load a pickled trie or a one-word-per-line text file."""
+    with open(filepath, "rb") as f:
+        head = f.read(2)
+    if head[:1] == b"\x80":
+        with open(filepath, "rb") as f:
+            return pickle.load(f)
+    with open(filepath, encoding="utf-8") as f:
+        return trie_from_words(f)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compile a word list or trie.pkl into a .lex file")
+    parser.add_argument("source", help="trie.pkl or a text file with one word per line")
+    parser.add_argument("output", help="path of the .lex file to write")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    trie = load_source(args.source)
+    node_count, edge_count = write_lexicon(trie, args.output)
+    elapsed = time.perf_counter() - start
+    size = HEADER.size + 8 * node_count + 4 * edge_count
+    print(f"Wrote {args.output}: {node_count} nodes, {edge_count} edges, "
+          f"{size / 1e6:.2f} MB in {elapsed:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Acceleration-aware motion time model for the plotter.
+
+Simulates what Marlin's planner does with a stream of ``G1`` moves: each
+move is capped by its feedrate and the per-axis speed and acceleration
+limits, consecutive moves blend at the junction speed allowed by the
+junction deviation, and every block follows a trapezoidal velocity profile.
+Dwells (``G4``) and the end of the program stop the head.
+
+Used by ``gcode_compiler`` to predict trace time, by ``path_order`` for the
+cost of idle hops and by ``scoring`` to budget words.
+
+Usage:
+    seconds = estimate_seconds(lines, start=(0.0, 0.0, 3.0))
+    python motion.py program.gcode
+"""
+import math
+import re
+import sys
+from typing import Iterable, List, Sequence, Tuple
+
+# Marlin's stock Cartesian defaults; match them to your firmware (M203/M201/M204/M205).
+MAX_FEEDRATE = (300.0, 300.0, 5.0)  # mm/s per X, Y, Z
+MAX_ACCEL = (3000.0, 3000.0, 100.0)  # mm/s^2 per X, Y, Z
+ACCELERATION = 3000.0  # mm/s^2, M204 travel acceleration
+JUNCTION_DEVIATION = 0.013  # mm
+
+Vector = Tuple[float, float, float]
+
+WORD = re.compile(r"([A-Z])([-+]?\d*\.?\d+)")
+
+
+class Block:
+    """One straight move (or a dwell when ``length`` is 0 and ``dwell`` > 0)."""
+
+    __slots__ = ("length", "unit", "speed", "accel", "dwell")
+
+    def __init__(self, delta: Vector, feed: float, dwell: float = 0.0):
+        self.length = math.sqrt(sum(d * d for d in delta))
+        self.dwell = dwell
+        if self.length == 0:
+            self.unit, self.speed, self.accel = (0.0, 0.0, 0.0), 0.0, ACCELERATION
+            return
+        self.unit = tuple(d / self.length for d in delta)
+        speed, accel = feed / 60.0, ACCELERATION
+        for u, vmax, amax in zip(self.unit, MAX_FEEDRATE, MAX_ACCEL):
+            if u:
+                speed = min(speed, vmax / abs(u))
+                accel = min(accel, amax / abs(u))
+        self.speed, self.accel = speed, accel
+
+
+def junction_speed(prev: Block, cur: Block) -> float:
+    """Max speed through the corner between two blocks (Marlin junction deviation)."""
+    cos_theta = -sum(a * b for a, b in zip(prev.unit, cur.unit))
+    if cos_theta > 0.999999:
+        return 0.0  # reversal
+    limit = min(prev.speed, cur.speed)
+    if cos_theta < -0.999999:
+        return limit  # straight through
+    sin_half = math.sqrt(0.5 * (1.0 - cos_theta))
+    accel = min(prev.accel, cur.accel)
+    return min(limit, math.sqrt(accel * JUNCTION_DEVIATION * sin_half / (1.0 - sin_half)))
+
+
+def trapezoid_seconds(length: float, entry: float, exit_: float, cruise: float, accel: float) -> float:
+    accel_dist = (cruise * cruise - entry * entry) / (2 * accel)
+    decel_dist = (cruise * cruise - exit_ * exit_) / (2 * accel)
+    if accel_dist + decel_dist <= length:
+        return (cruise - entry) / accel + (cruise - exit_) / accel + (length - accel_dist - decel_dist) / cruise
+    peak = math.sqrt((2 * accel * length + entry * entry + exit_ * exit_) / 2)
+    return max(0.0, (peak - entry) / accel) + max(0.0, (peak - exit_) / accel)
+
+
+def plan_seconds(blocks: Sequence[Block]) -> List[float]:
+    """Seconds spent in each block, planning the whole sequence like the firmware."""
+    n = len(blocks)
+    entry = [0.0] * (n + 1)  # entry[n] is the final stop
+    for i in range(1, n):
+        prev, cur = blocks[i - 1], blocks[i]
+        if prev.length and cur.length:
+            entry[i] = junction_speed(prev, cur)
+
+    # Backward pass: every block must be able to slow down to the next entry.
+    for i in range(n - 1, -1, -1):
+        b = blocks[i]
+        if b.length:
+            entry[i] = min(entry[i], math.sqrt(entry[i + 1] ** 2 + 2 * b.accel * b.length))
+    # Forward pass: and to speed up from its own entry.
+    for i in range(n):
+        b = blocks[i]
+        if b.length:
+            entry[i + 1] = min(entry[i + 1], math.sqrt(entry[i] ** 2 + 2 * b.accel * b.length))
+
+    seconds = []
+    for i, b in enumerate(blocks):
+        if not b.length:
+            seconds.append(b.dwell)
+            continue
+        seconds.append(trapezoid_seconds(b.length, entry[i], entry[i + 1], b.speed, b.accel))
+    return seconds
+
+
+def parse_gcode(lines: Iterable[str], start: Vector = (0.0, 0.0, 0.0),
+                feed: float = 1000.0) -> List[Block]:
+    """Turn absolute-mode G-code into planner blocks. Unknown commands are ignored."""
+    position = list(start)
+    blocks = []
+    for line in lines:
+        line = line.split(";", 1)[0].strip().upper()
+        if not line:
+            continue
+        words = dict(WORD.findall(line))
+        code = line.split()[0]
+        if code in ("G0", "G1"):
+            if "F" in words:
+                feed = float(words["F"])
+            target = [float(words[axis]) if axis in words else position[i] for i, axis in enumerate("XYZ")]
+            delta = tuple(t - p for t, p in zip(target, position))
+            if any(delta):
+                blocks.append(Block(delta, feed))
+            position = target
+        elif code == "G4":
+            dwell = float(words["P"]) / 1000 if "P" in words else float(words.get("S", 0))
+            blocks.append(Block((0.0, 0.0, 0.0), feed, dwell))
+        elif code == "G92":
+            position = [float(words[axis]) if axis in words else position[i] for i, axis in enumerate("XYZ")]
+    return blocks
+
+
+def estimate_seconds(lines: Iterable[str], start: Vector = (0.0, 0.0, 0.0)) -> float:
+    """Predicted run time of a G-code program."""
+    return sum(plan_seconds(parse_gcode(lines, start)))
+
+
+def hop_seconds(distance: float, feed: float) -> float:
+    """A single rest-to-rest XY move of ``distance`` mm."""
+    if distance <= 0:
+        return 0.0
+    return sum(plan_seconds([Block((distance, 0.0, 0.0), feed)]))
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1]) as f:
+        program = f.read().splitlines()
+    blocks = parse_gcode(program)
+    print(f"{len(blocks)} blocks, estimated {sum(plan_seconds(blocks)):.2f} s")
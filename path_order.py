@@ -0,0 +1,162 @@
+"""
+Travel-optimal ordering of word paths for the plotter.
+
+Every word is a directed segment: the pen lands on its first cell and lifts
+off its last. Traced moves are fixed, so only the idle jumps between words
+(and from/back to the start button) depend on the order. ``order_words``
+builds a nearest-neighbor tour and refines it with 2-opt and Or-opt moves
+until no move helps or the time cap is hit, then reports the travel time
+saved against the original order. Hops are costed with the acceleration-aware
+motion model (``motion.hop_seconds``), not distance over feed.
+"""
+import math
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from motion import hop_seconds
+from solver import WordResult
+
+# Board geometry and travel feed used by rpi_script.play_path.
+CELL_SIZE = 13.6  # mm
+TRAVEL_FEED = 8000  # mm/min
+START_LOCATION = (2.5, 1.5)  # (row, col) of the start button, in cells
+
+Point = Tuple[float, float]
+
+
+def distance(a: Point, b: Point) -> float:
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def travel_seconds(cells: float) -> float:
+    """Time for an idle hop of ``cells`` cell widths, accelerating from and to rest."""
+    return hop_seconds(cells * CELL_SIZE, TRAVEL_FEED)
+
+
+def tour_length(order: Sequence[int], starts: List[Point], ends: List[Point], depot: Point,
+                cost=distance) -> float:
+    total, here = 0.0, depot
+    for i in order:
+        total += cost(here, starts[i])
+        here = ends[i]
+    return total + cost(here, depot)
+
+
+def hop_cost(a: Point, b: Point) -> float:
+    """Seconds for the idle hop between two cells; short hops are dominated by acceleration."""
+    return travel_seconds(distance(a, b))
+
+
+def _nearest_neighbor(starts: List[Point], ends: List[Point], depot: Point) -> List[int]:
+    remaining = set(range(len(starts)))
+    order, here = [], depot
+    while remaining:
+        nxt = min(remaining, key=lambda i: (distance(here, starts[i]), i))
+        remaining.remove(nxt)
+        order.append(nxt)
+        here = ends[nxt]
+    return order
+
+
+def _improve(order: List[int], starts: List[Point], ends: List[Point], depot: Point, deadline: float) -> List[int]:
+    # Sequence with the depot at both ends; d(a, b) is the jump from a's end to b's start.
+    nodes_in = starts + [depot]
+    nodes_out = ends + [depot]
+    D = len(starts)
+
+    def d(a: int, b: int) -> float:
+        return hop_cost(nodes_out[a], nodes_in[b])
+
+    seq = [D] + order + [D]
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+
+        # Or-opt: move a block of 1-3 words somewhere else, keeping its direction.
+        for k in (1, 2, 3):
+            for i in range(1, len(seq) - k):
+                if time.perf_counter() >= deadline:
+                    return seq[1:-1]
+                first, last = seq[i], seq[i + k - 1]
+                prev, nxt = seq[i - 1], seq[i + k]
+                removed = d(prev, first) + d(last, nxt) - d(prev, nxt)
+                best, best_j = 1e-9, None
+                for j in range(len(seq) - 1):
+                    if i - 1 <= j <= i + k - 1:
+                        continue
+                    a, b = seq[j], seq[j + 1]
+                    gain = removed - (d(a, first) + d(last, b) - d(a, b))
+                    if gain > best:
+                        best, best_j = gain, j
+                if best_j is not None:
+                    block = seq[i:i + k]
+                    rest = seq[:i] + seq[i + k:]
+                    j = best_j if best_j < i else best_j - k
+                    seq = rest[:j + 1] + block + rest[j + 1:]
+                    improved = True
+
+        # 2-opt: reverse the visiting order of a run of words.
+        for i in range(1, len(seq) - 2):
+            for j in range(i + 1, len(seq) - 1):
+                if time.perf_counter() >= deadline:
+                    return seq[1:-1]
+                old = d(seq[i - 1], seq[i]) + d(seq[j], seq[j + 1])
+                new = d(seq[i - 1], seq[j]) + d(seq[i], seq[j + 1])
+                for m in range(i, j):
+                    old += d(seq[m], seq[m + 1])
+                    new += d(seq[m + 1], seq[m])
+                if new < old - 1e-9:
+                    seq[i:j + 1] = reversed(seq[i:j + 1])
+                    improved = True
+
+    return seq[1:-1]
+
+
+def order_words(
+    words: List[WordResult],
+    start: Point = START_LOCATION,
+    time_limit: float = 0.05,
+) -> Tuple[List[WordResult], Dict[str, float]]:
+    """
+    Reorder ``words`` to minimize idle pen travel, starting and ending at
+    ``start``. Returns the new list and a report with the travel distance (in
+    cells) and time (in seconds) before and after, and the time saved.
+    """
+    starts = [tuple(w["coordinates"][0]) for w in words]
+    ends = [tuple(w["coordinates"][-1]) for w in words]
+    original = list(range(len(words)))
+    before = tour_length(original, starts, ends, start, hop_cost)
+
+    deadline = time.perf_counter() + time_limit
+    order = _improve(_nearest_neighbor(starts, ends, start), starts, ends, start, deadline)
+    after = tour_length(order, starts, ends, start, hop_cost)
+    if after >= before:
+        order, after = original, before
+
+    report = {
+        "travel_before": tour_length(original, starts, ends, start),
+        "travel_after": tour_length(order, starts, ends, start),
+        "seconds_before": before,
+        "seconds_after": after,
+        "seconds_saved": before - after,
+    }
+    return [words[i] for i in order], report
+
+
+if __name__ == "__main__":
+    from solver import find_words, load_trie
+
+    board = [
+        ['t', 'h', 'i', 's'],
+        ['w', 'a', 't', 's'],
+        ['o', 'a', 'h', 'g'],
+        ['f', 'g', 'd', 't']
+    ]
+    words = find_words(board, load_trie("./trie.lex"))
+
+    begin = time.perf_counter()
+    ordered, report = order_words(words)
+    elapsed = time.perf_counter() - begin
+    print(f"Ordered {len(ordered)} words in {elapsed:.4f} seconds")
+    print(f"Travel {report['travel_before']:.1f} -> {report['travel_after']:.1f} cells, "
+          f"saved {report['seconds_saved']:.2f} s")
@@ -0,0 +1,286 @@
+"""
+Event-driven PC controller (asyncio replacement for full_loop.main).
+
+Both websocket endpoints run on one event loop: the frontend on 8765 and the
+Raspberry Pi on 8766. Each round is a small state machine
+
+    idle -> start -> capture -> inference -> tracing -> idle
+
+where every phase awaits a message or event with a timeout instead of
+spinning on a flag, and logs how long it took. Nothing is resent: "start"
+taps the screen and a board frame gets traced, so a duplicate sent after a
+lost reply could tap a tile mid-round. A missing reply, a ``"fail"`` from
+the robot (unreadable board, printer error) or a robot disconnect fails the
+round. After the start tap, a failed round also sends ``"abort"`` to the
+robot and waits until the game's round is over before starting another,
+so the next start tap can't land on a tile of the board still in play.
+
+With ``--watch`` the capture phase doesn't sleep ``START_SETTLE`` and
+re-activate the window. It watches the board region and sends the board
+the moment a fresh one has settled (see ``board_watch``).
+
+Usage:
+    python pc_orchestrator.py [--no-key] [--watch]   # --no-key starts rounds without waiting for ~
+"""
+import argparse
+import asyncio
+import enum
+import json
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import websockets
+
+from broadcast import AsyncBroadcaster
+from progress import ProgressState, is_resync_request
+from scoring import ROUND_SECONDS
+
+HOST = "0.0.0.0"
+FRONTEND_PORT = 8765
+ROBOT_PORT = 8766
+IMAGE_CODEC = "jpeg"
+
+START_TIMEOUT = 10.0   # robot presses the start button and acks
+START_SETTLE = 1.0     # wait for the game board to appear after the start tap
+BOARD_APPEAR_TIMEOUT = 10.0  # watch mode: a fresh board shows up after the start tap
+BOARD_TIMEOUT = 15.0   # robot runs OCR + solve and sends back the board
+TRACE_TIMEOUT = 120.0  # robot traces every word and acks
+
+DISCONNECTED = object()  # queued when the robot drops, so a round waiting on it fails at once
+
+
+class Phase(enum.Enum):
+    IDLE = "idle"
+    START = "start"
+    CAPTURE = "capture"
+    INFERENCE = "inference"
+    TRACING = "tracing"
+
+
+class RoundFailed(Exception):
+    pass
+
+
+class Orchestrator:
+    def __init__(self, host: str = HOST, frontend_port: int = FRONTEND_PORT, robot_port: int = ROBOT_PORT,
+                 watch: bool = False):
+        self.host = host
+        self.frontend_port = frontend_port
+        self.robot_port = robot_port
+        self.frontends = AsyncBroadcaster()
+        self.progress = ProgressState()
+        self.robot = None
+        self.robot_connected = asyncio.Event()
+        self.robot_messages: "asyncio.Queue[str]" = asyncio.Queue()
+        self.phase = Phase.IDLE
+        self.timings = {}
+        self.started_at: Optional[float] = None  # when "start" went out for the round in progress
+        self.watcher = None
+        if watch:
+            from board_watch import BoardWatcher
+            from screen_capture import locator
+            self.watcher = BoardWatcher(locator)
+
+    # -- websocket endpoints -------------------------------------------------
+
+    async def frontend_handler(self, ws, path=None):
+        print(f"Frontend connected: {ws.remote_address}")
+        self.frontends.add(ws)
+        self.send_snapshot(ws)
+        try:
+            async for message in ws:
+                if is_resync_request(message):
+                    self.send_snapshot(ws)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.frontends.remove(ws)
+            print(f"Frontend disconnected: {ws.remote_address}")
+
+    async def robot_handler(self, ws, path=None):
+        print(f"Robot connected: {ws.remote_address}")
+        self.robot = ws
+        self.robot_messages = asyncio.Queue()
+        self.robot_connected.set()
+        try:
+            async for message in ws:
+                if message in ("ack", "fail"):
+                    await self.robot_messages.put(message)
+                    continue
+                update = self.progress.apply(message)
+                heartbeat = update is not None and update["type"] == "heartbeat"
+                self.broadcast(message, key="heartbeat" if heartbeat else None)
+                # word deltas and heartbeats are for the frontend; rounds only wait on the board
+                if update is None or update["type"] == "snapshot":
+                    await self.robot_messages.put(message)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if self.robot is ws:
+                self.robot = None
+                self.robot_connected.clear()
+                await self.robot_messages.put(DISCONNECTED)
+            print(f"Robot disconnected: {ws.remote_address}")
+
+    def broadcast(self, message: str, key=None):
+        """Queue ``message`` for every frontend; never waits on a slow client."""
+        self.frontends.publish(message, key)
+
+    def send_snapshot(self, ws):
+        snapshot = self.progress.snapshot()
+        if snapshot:
+            self.frontends.send(ws, snapshot)
+
+    # -- phases --------------------------------------------------------------
+
+    @contextmanager
+    def enter(self, phase: Phase):
+        self.phase = phase
+        start = time.perf_counter()
+        print(f">> {phase.value}")
+        try:
+            yield
+        finally:
+            self.timings[phase.value] = time.perf_counter() - start
+            print(f"<< {phase.value} took {self.timings[phase.value]:.3f}s")
+
+    async def wait_for_message(self, accept: Callable[[str], bool], timeout: float) -> str:
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            message = await asyncio.wait_for(self.robot_messages.get(), remaining)
+            if message is DISCONNECTED:
+                raise RoundFailed("robot disconnected")
+            if message == "fail":
+                raise RoundFailed("robot reported a failure")
+            if accept(message):
+                return message
+
+    async def request(self, payload, accept: Callable[[str], bool], timeout: float) -> str:
+        """Send ``payload`` to the robot once and wait for an accepted reply."""
+        if self.robot is None:
+            raise RoundFailed("robot disconnected")
+        try:
+            await self.robot.send(payload)
+        except websockets.ConnectionClosed:
+            raise RoundFailed("robot disconnected")
+        try:
+            return await self.wait_for_message(accept, timeout)
+        except asyncio.TimeoutError:
+            raise RoundFailed(f"robot did not reply during {self.phase.value}")
+
+    async def abort_round(self):
+        """Tell the robot to drop the round and wait out the game's round timer."""
+        if self.robot is not None:
+            try:
+                await self.robot.send(json.dumps("abort"))
+            except websockets.ConnectionClosed:
+                pass
+        remaining = self.started_at + ROUND_SECONDS - asyncio.get_running_loop().time()
+        self.started_at = None
+        if remaining > 0:
+            print(f"Waiting {remaining:.0f}s for the round to end...")
+            await asyncio.sleep(remaining)
+
+    async def run_round(self):
+        loop = asyncio.get_running_loop()
+        self.timings = {}
+        round_start = time.perf_counter()
+
+        with self.enter(Phase.START):
+            self.started_at = loop.time()  # the tap may happen even if its ack is lost
+            await self.request(json.dumps("start"), lambda m: m == "ack", START_TIMEOUT)
+            if self.watcher is None:
+                await asyncio.sleep(START_SETTLE)
+
+        with self.enter(Phase.CAPTURE):
+            if self.watcher is None:
+                frame = await loop.run_in_executor(None, capture_board_frame)
+            else:
+                frame = await loop.run_in_executor(None, watch_board_frame, self.watcher)
+            if frame is None:
+                raise RoundFailed("no board on screen (is the LonelyScreen window open?)")
+
+        with self.enter(Phase.INFERENCE):
+            await self.request(frame, lambda m: m != "ack", BOARD_TIMEOUT)
+
+        with self.enter(Phase.TRACING):
+            try:
+                await self.wait_for_message(lambda m: m == "ack", TRACE_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise RoundFailed("robot did not finish tracing in time")
+
+        self.phase = Phase.IDLE
+        self.started_at = None
+        total = time.perf_counter() - round_start
+        summary = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.timings.items())
+        print(f"✅ Round done in {total:.2f}s ({summary})")
+
+    async def run(self, wait_for_key: bool = True):
+        async with websockets.serve(self.frontend_handler, self.host, self.frontend_port), \
+                websockets.serve(self.robot_handler, self.host, self.robot_port, max_size=None):
+            print(f"Serving frontend on :{self.frontend_port}, robot on :{self.robot_port}")
+            loop = asyncio.get_running_loop()
+            if self.watcher is not None:
+                await loop.run_in_executor(None, bring_window_forward)
+            while True:
+                self.phase = Phase.IDLE
+                await self.robot_connected.wait()
+                if wait_for_key:
+                    print("Press ~ to start game...")
+                    await loop.run_in_executor(None, wait_for_start_key)
+                try:
+                    await self.run_round()
+                except RoundFailed as e:
+                    print(f"⚠️ Round failed in {self.phase.value}: {e}")
+                    if self.started_at is not None:
+                        await self.abort_round()
+
+
+def wait_for_start_key():
+    import keyboard
+    keyboard.wait("~")
+
+
+def capture_board_frame() -> Optional[bytes]:
+    from image_codec import encode_board_frame
+    from screen_capture import activate_and_maximize_window, capture_board, find_lonelyscreen_window
+
+    window = find_lonelyscreen_window()
+    if window is None:
+        return None
+    activate_and_maximize_window(window)
+    img = capture_board()
+    return None if img is None else encode_board_frame(img, IMAGE_CODEC)
+
+
+def bring_window_forward() -> bool:
+    from screen_capture import activate_and_maximize_window, find_lonelyscreen_window
+
+    window = find_lonelyscreen_window()
+    if window is None:
+        return False
+    activate_and_maximize_window(window)
+    return True
+
+
+def watch_board_frame(watcher) -> Optional[bytes]:
+    from image_codec import encode_board_frame
+
+    img = watcher.wait_for_new_board(timeout=BOARD_APPEAR_TIMEOUT)
+    return None if img is None else encode_board_frame(img, IMAGE_CODEC)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Word Hunt PC controller")
+    parser.add_argument("--no-key", action="store_true", help="start rounds without waiting for ~")
+    parser.add_argument("--watch", action="store_true",
+                        help="send the board as soon as a fresh one settles instead of sleeping and grabbing once")
+    args = parser.parse_args()
+    try:
+        asyncio.run(Orchestrator(watch=args.watch).run(wait_for_key=not args.no_key))
+    except KeyboardInterrupt:
+        print("\n🛑 Exiting...")
@@ -0,0 +1,177 @@
+"""
+Sequenced progress protocol between the robot and the frontend.
+
+Instead of one ``{"board", "words"}`` blob that the frontend replays with
+local timers, the Pi reports what it is actually doing:
+
+    {"type": "snapshot", "round": 3, "seq": 0, "board": [...], "words": [...]}
+    {"type": "add", "round": 3, "seq": 1, "words": [{"word", "coordinates", "duration", "status"}]}
+    {"type": "status", "round": 3, "seq": 2, "index": 0, "status": "active"}
+    {"type": "heartbeat", "round": 3, "seq": 2}
+
+A snapshot starts a round (seq 0). ``add`` appends words (the streaming
+solver finds them while the robot is already tracing) and ``status`` moves
+one word through pending -> active -> done/skipped. Heartbeats carry the last
+seq, so a client that missed a delta notices the gap even when nothing else
+is sent. A client that sees a gap sends ``{"type": "resync"}``; the PC folds
+every message into ``ProgressState`` and answers it (and every newly joined
+frontend) with a snapshot of the current round.
+
+Usage:
+    progress = ProgressEmitter(ws.send)          # Pi
+    progress.snapshot(board, words)
+    progress.set_status(0, ACTIVE)
+
+    state = ProgressState()                      # PC
+    state.apply(message)
+    state.snapshot()                             # for late joiners
+"""
+import json
+import threading
+import time
+from typing import Callable, List, Optional
+
+from solver import WordResult
+
+PENDING = "pending"
+ACTIVE = "active"
+DONE = "done"
+SKIPPED = "skipped"
+STATUSES = (PENDING, ACTIVE, DONE, SKIPPED)
+
+HEARTBEAT_SECONDS = 1.0
+WORD_FIELDS = ("word", "coordinates", "duration", "status")
+
+
+def compact_word(word_data: WordResult, status: str = PENDING) -> dict:
+    """Only the fields the frontend draws; the solver's extras stay on the Pi."""
+    word = {key: word_data[key] for key in WORD_FIELDS if key in word_data}
+    word["status"] = status
+    return word
+
+
+def resync_request() -> str:
+    return json.dumps({"type": "resync"})
+
+
+def is_resync_request(message) -> bool:
+    try:
+        return json.loads(message).get("type") == "resync"
+    except (ValueError, AttributeError):
+        return False
+
+
+class ProgressEmitter:
+    """Robot side: numbers and sends progress messages, plus idle heartbeats."""
+
+    def __init__(self, send: Callable[[str], None], heartbeat: float = HEARTBEAT_SECONDS):
+        self._send = send
+        self.heartbeat_interval = heartbeat
+        self.round = 0
+        self.seq = 0
+        self.num_words = 0
+        self._last_sent = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _emit(self, message: dict, advance: bool = True):
+        with self._lock:
+            self._emit_locked(message, advance)
+
+    def _emit_locked(self, message: dict, advance: bool = True):
+        # Called with _lock held, so a round's counters and its messages can't be split by another thread.
+        if advance:
+            self.seq += 1
+        message.update(round=self.round, seq=self.seq)
+        self._last_sent = time.monotonic()
+        try:
+            self._send(json.dumps(message))
+        except Exception as e:
+            print(f"⚠️ Could not send {message['type']}: {e}")
+
+    def snapshot(self, board: List[List[str]], words: List[WordResult] = ()):
+        """Start a new round with the board and any words already known."""
+        with self._lock:
+            self.round += 1
+            self.seq = -1
+            self.num_words = len(words)
+            self._emit_locked({"type": "snapshot", "board": board, "words": [compact_word(w) for w in words]})
+
+    def add(self, words: List[WordResult], status: str = PENDING) -> int:
+        """Append words and return the index of the first one."""
+        with self._lock:
+            first = self.num_words
+            if words:
+                self.num_words += len(words)
+                self._emit_locked({"type": "add", "words": [compact_word(w, status) for w in words]})
+        return first
+
+    def set_status(self, index: int, status: str):
+        if status not in STATUSES:
+            raise ValueError(f"Unknown status {status!r}")
+        self._emit({"type": "status", "index": index, "status": status})
+
+    def heartbeat(self):
+        self._emit({"type": "heartbeat"}, advance=False)
+
+    def start_heartbeats(self):
+        """Send a heartbeat whenever nothing else went out for one interval."""
+        if self._thread:
+            return
+        self._stop.clear()
+
+        def beat():
+            while not self._stop.wait(self.heartbeat_interval / 2):
+                if time.monotonic() - self._last_sent >= self.heartbeat_interval:
+                    self.heartbeat()
+
+        self._thread = threading.Thread(target=beat, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+
+class ProgressState:
+    """PC side: folds progress messages into the current round for late joiners."""
+
+    def __init__(self):
+        self.round = 0
+        self.seq = 0
+        self.board: List[List[str]] = []
+        self.words: List[dict] = []
+
+    def apply(self, message) -> Optional[dict]:
+        """Fold one robot message in. Returns it parsed, or None if it isn't progress."""
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(data, dict) or "type" not in data:
+            return None
+
+        kind = data["type"]
+        if kind == "snapshot":
+            self.round, self.board = data["round"], data["board"]
+            self.words = [dict(w) for w in data["words"]]
+        elif data.get("round") != self.round:
+            return data  # a delta from a round we never saw the snapshot of
+        elif kind == "add":
+            self.words.extend(dict(w) for w in data["words"])
+        elif kind == "status" and 0 <= data["index"] < len(self.words):
+            self.words[data["index"]]["status"] = data["status"]
+        self.seq = max(self.seq, data.get("seq", 0)) if kind != "snapshot" else data["seq"]
+        return data
+
+    def snapshot(self) -> Optional[str]:
+        """The current round as one snapshot message, or None before the first round."""
+        if not self.round:
+            return None
+        return json.dumps({
+            "type": "snapshot", "round": self.round, "seq": self.seq,
+            "board": self.board, "words": self.words,
+        })
@@ -0,0 +1,349 @@
+"""
+Pipelined, deadline-aware round execution on the Pi.
+
+``on_message`` used to OCR the board, solve it, send the results and then
+trace every word, all on the websocket thread and with no idea how much of
+the round was left. ``RoundExecutor`` splits that into three stages joined
+by queues:
+
+    frames -> [ocr] -> boards -> [solve] -> words -> [trace] -> serial
+
+The trace stage is the only thread that talks to the printer. It starts on
+the first word the streaming solver finds while the search is still
+running. The game clock starts when the start button tap completes. Before
+each word the trace stage checks that the hop, the word and the trip back
+to ``START_LOCATION`` still fit before the deadline. Close to the deadline
+it picks whichever pending word earns the most points per second and
+still fits. When time runs out it skips the rest, parks at the start
+position and reports the round done. A board that can't be read, or a
+start tap or round that fails on the printer, is reported with ``on_fail``
+instead, so the PC never waits on a round that isn't coming.
+
+``recognize`` returns a letter grid, or a candidate board (each cell's top
+letters with confidences, see ``fuzzy_solver``). When any cell of a
+candidate board is unsure, the solve stage searches every candidate with
+``find_words_uncertain`` instead of streaming, and ``recheck`` lists the
+cells the most points depend on.
+
+Usage:
+    executor = RoundExecutor(gcode, recognize, trie, progress,
+                             on_ack=lambda: ws.send("ack"), on_fail=lambda: ws.send("fail"))
+    executor.press_start()           # "start" from the PC
+    executor.submit_frame(frame)     # board frame from the PC
+    executor.abort()                 # "abort": the PC gave up on this round
+    executor.stop()
+"""
+import math
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fuzzy_solver import best_letters, find_words_uncertain, is_candidate_board, is_uncertain
+from gcode_compiler import PathCompiler, word_trace_seconds
+from path_order import START_LOCATION, order_words, travel_seconds
+from progress import ACTIVE, DONE, SKIPPED, ProgressEmitter
+from scoring import ROUND_SECONDS, word_points
+from solver import SOLVER_NUMWORDS_LIMIT, WordResult, find_words
+from stream_solver import SolveStream
+
+SAFETY_MARGIN = 1.5  # seconds kept free at the end of the round
+REORDER_HORIZON = 15.0  # with less time than this left, pick by points per second
+RECHECK_SHOWN = 3  # unsure cells logged per board
+
+END = object()  # no more words for this round
+Position = Tuple[float, float]
+
+
+def _distance(a: Position, b: Position) -> float:
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+class RoundExecutor:
+    def __init__(
+        self,
+        gcode,
+        recognize: Callable[[bytes], list],
+        trie,
+        progress: ProgressEmitter,
+        on_ack: Callable[[], None],
+        on_fail: Callable[[], None] = lambda: None,
+        num_rows: int = 4,
+        start: Position = START_LOCATION,
+        round_seconds: float = ROUND_SECONDS,
+        margin: float = SAFETY_MARGIN,
+        stream: bool = True,
+        limit: int = SOLVER_NUMWORDS_LIMIT,
+    ):
+        self.gcode = gcode
+        self.recognize = recognize
+        self.trie = trie
+        self.progress = progress
+        self.on_ack = on_ack
+        self.on_fail = on_fail
+        self.num_rows = num_rows
+        self.start = start
+        self.round_seconds = round_seconds
+        self.margin = margin
+        self.stream = stream
+        self.limit = limit
+
+        self.round_started: Optional[float] = None
+        self.deadline = math.inf
+        self.report: Dict[str, float] = {}
+        self.recheck: List[dict] = []  # unsure cells of the last uncertain board, most points at stake first
+        self._costs: Dict[str, float] = {}
+        self._cancel = threading.Event()
+        self._stream: Optional[SolveStream] = None
+
+        self._frames: "queue.Queue" = queue.Queue()
+        self._boards: "queue.Queue" = queue.Queue()
+        self._words: "queue.Queue" = queue.Queue()
+        self._commands: "queue.Queue" = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._ocr_loop, daemon=True),
+            threading.Thread(target=self._solve_loop, daemon=True),
+            threading.Thread(target=self._trace_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # -- inputs --------------------------------------------------------------
+
+    def press_start(self):
+        self._commands.put(("start",))
+
+    def submit_frame(self, frame: bytes):
+        self._frames.put(frame)
+
+    def abort(self):
+        """Drop the round in play: forget the start tap and stop tracing before the next word."""
+        print(">> Round aborted")
+        self.round_started = None
+        self.deadline = -math.inf  # a round being traced parks at once; the next board starts a new clock
+
+    def stop(self):
+        self._cancel.set()
+        self._frames.put(None)
+        self._commands.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def time_left(self, at: Optional[float] = None) -> float:
+        return self.deadline - (time.monotonic() if at is None else at)
+
+    # -- stages --------------------------------------------------------------
+
+    def _ocr_loop(self):
+        while True:
+            frame = self._frames.get()
+            if frame is None:
+                self._boards.put(None)
+                return
+            try:
+                board = self.recognize(frame)
+            except Exception as e:
+                print(f"⚠️ OCR failed: {e}")
+                self.on_fail()
+                continue
+            cells = board if is_candidate_board(board) else None
+            letters = best_letters(cells) if cells is not None else board
+            print(">> Board letters:")
+            for row in letters:
+                print("   " + " ".join(row))
+            self._cancel.clear()
+            self.progress.snapshot(letters)
+            self._commands.put(("board", letters))
+            self._boards.put((letters, cells))
+
+    def _solve_loop(self):
+        while True:
+            item = self._boards.get()
+            if item is None:
+                return
+            letters, cells = item
+            try:
+                if cells is not None and is_uncertain(cells):
+                    self._uncertain_words(cells)
+                elif self.stream:
+                    self._stream_words(letters)
+                else:
+                    self._queue_words(order_words(find_words(letters, self.trie), self.start)[0])
+            except Exception as e:
+                print(f"⚠️ Solver failed: {e}")
+            finally:
+                self._words.put(END)
+
+    def _queue_words(self, results: List[WordResult]):
+        first = self.progress.add(results)
+        for offset, word_data in enumerate(results):
+            self._words.put((first + offset, word_data))
+
+    def _uncertain_words(self, cells):
+        words, self.recheck = find_words_uncertain(cells, self.trie, limit=self.limit)
+        for spot in self.recheck[:RECHECK_SHOWN]:
+            options = ", ".join(f"{letter.upper()} {p:.2f}" for letter, p in spot["candidates"])
+            print(f"⚠️ Unsure of cell {spot['cell']}: {options} ({spot['stake']:.1f} points at stake)")
+        self._queue_words(order_words(words, self.start)[0])
+
+    def _stream_words(self, letters):
+        stream = self._stream = SolveStream(letters, self.trie, limit=self.limit, start=self.start)
+        if self._cancel.is_set():
+            stream.cancel()
+        for index, word_data in enumerate(stream):
+            if self._cancel.is_set():
+                return
+            if stream.done():
+                # The search is over: announce the ordered remainder at once.
+                self._queue_words(stream.result()[index:])
+                return
+            self._words.put((self.progress.add([word_data]), word_data))
+
+    def _trace_loop(self):
+        while True:
+            command = self._commands.get()
+            if command is None:
+                return
+            try:
+                if command[0] == "start":
+                    self._press_start()
+                else:
+                    self._run_round(command[1])
+            except Exception as e:
+                print(f"⚠️ Error while tracing: {e}")
+                self.on_fail()
+
+    # -- tracing -------------------------------------------------------------
+
+    def _press_start(self):
+        print(">> Pressing start button")
+        compiler = PathCompiler(self.num_rows, self.start)
+        self.gcode.send_lines(compiler.header() + compiler.tap(self.start) + compiler.footer())
+        self.gcode.finish()
+        self.round_started = time.monotonic()
+        self.deadline = self.round_started + self.round_seconds - self.margin
+        self.on_ack()
+
+    def _word_cost(self, here: Position, word_data: WordResult) -> float:
+        path = word_data["coordinates"]
+        word = word_data["word"]
+        if word not in self._costs:
+            self._costs[word] = word_trace_seconds(path, self.num_rows)
+        return travel_seconds(_distance(here, path[0])) + self._costs[word]
+
+    def _choose(self, pending: List[Tuple[int, WordResult]], here: Position, at: float) -> Optional[int]:
+        """Index into ``pending`` of the next word to trace, or None if nothing fits."""
+        left = self.time_left(at)
+        fits = []
+        for i, (_, word_data) in enumerate(pending):
+            cost = self._word_cost(here, word_data)
+            back = travel_seconds(_distance(word_data["coordinates"][-1], self.start))
+            if cost + back <= left:
+                if i == 0 and left > REORDER_HORIZON:
+                    return 0  # plenty of time: keep the solver's order
+                fits.append((word_points(word_data["word"]) / cost, -i, i))
+        return max(fits)[2] if fits else None
+
+    def _cancel_solve(self):
+        self._cancel.set()
+        stream = self._stream
+        if stream is not None:
+            stream.cancel()
+
+    def _collect(self, pending: List[Tuple[int, WordResult]], timeout: Optional[float]) -> bool:
+        """
+        Move solver output into ``pending``, waiting up to ``timeout`` seconds
+        for the first item (0: don't wait, None: until there is one).
+        Returns False once the solver is finished.
+        """
+        try:
+            if timeout == 0:
+                item = self._words.get_nowait()
+            else:
+                item = self._words.get(timeout=timeout)
+            while True:
+                if item is END:
+                    return False
+                pending.append(item)
+                item = self._words.get_nowait()
+        except queue.Empty:
+            return True
+
+    def _run_round(self, letters: List[List[str]]):
+        now = time.monotonic()
+        if self.round_started is None or now - self.round_started > self.round_seconds:
+            # No start tap seen for this board (e.g. a test harness): the clock starts now.
+            self.round_started = now
+            self.deadline = now + self.round_seconds - self.margin
+        deadline = self.deadline
+
+        compiler = PathCompiler(len(letters), self.start)
+        pending: List[Tuple[int, WordResult]] = []
+        solving = True
+        here = self.start
+        busy_until = now  # when the head will have finished what is already queued
+        traced = points = 0
+        first_word_at = None
+
+        try:
+            self.gcode.send_lines(compiler.header())
+            while True:
+                if solving:
+                    left = self.time_left()
+                    if not pending and left <= 0:
+                        break
+                    # Wait for the solver only when there is nothing to trace, and never past the deadline.
+                    solving = self._collect(pending, 0 if pending else (None if left == math.inf else left))
+                if not pending:
+                    if not solving or self.time_left() <= 0:
+                        break
+                    continue
+                at = max(time.monotonic(), busy_until)
+                choice = self._choose(pending, here, at)
+                if choice is None:
+                    break
+                index, word_data = pending.pop(choice)
+                lines = compiler.word(word_data["coordinates"])
+                if not lines:
+                    self.progress.set_status(index, SKIPPED)
+                    continue
+                cost = self._word_cost(here, word_data)
+                print(f">> Playing word: {word_data['word']} ({self.time_left(at):.1f}s left)")
+                self.progress.set_status(index, ACTIVE)
+                try:
+                    self.gcode.wait(self.gcode.send_lines(lines))
+                except Exception:
+                    self.progress.set_status(index, SKIPPED)
+                    raise
+                self.progress.set_status(index, DONE)
+                if first_word_at is None:
+                    first_word_at = time.monotonic()
+                busy_until = at + cost
+                here = tuple(word_data["coordinates"][-1])
+                traced += 1
+                points += word_points(word_data["word"])
+        finally:
+            # Out of words, out of time or the printer failed: stop the search
+            # and skip whatever is left, so nothing leaks into the next round.
+            self._cancel_solve()
+            while solving:
+                solving = self._collect(pending, None)
+            for index, _ in pending:
+                self.progress.set_status(index, SKIPPED)
+            self.round_started = None
+            self.deadline = math.inf
+
+        self.gcode.send_lines(compiler.footer())
+        self.gcode.finish()
+
+        self.report = {
+            "traced": traced,
+            "skipped": len(pending),
+            "points": points,
+            "first_word_after": (first_word_at or time.monotonic()) - now,
+            "time_left": deadline - time.monotonic(),
+        }
+        print(f">> Round done: {traced} words for {points} points, {len(pending)} skipped, "
+              f"first word {self.report['first_word_after']:.2f}s after the board, "
+              f"{self.report['time_left']:.1f}s to spare")
+        self.on_ack()
@@ -1,123 +1,103 @@
 import json
+import os
 import signal
 import time
-from typing import Tuple, List
 import sys
-from solver import load_trie, find_words
-trie = load_trie("./trie.pkl")
+from solver import load_trie
+from image_codec import decode_frame, is_frame
+from progress import ProgressEmitter
+from gcode_stream import GcodeStreamer
+from round_executor import RoundExecutor
+# Loaded in-process, not through solver_daemon: SolveStream searches the trie one
+# start cell at a time so tracing can start before the search ends, which the
+# daemon's whole-board requests can't do.
+trie = load_trie("./trie.lex")
 import websocket
 import serial
-import numpy as np
-from memryx import AsyncAccl
+from glyph_ocr import PROTOTYPES_PATH, GlyphRecognizer
+from inference_backends import make_backend
 
-PORT = "/dev/ttyUSB0"
+PORT = os.environ.get("PRINTER_PORT", "/dev/ttyUSB0")  # virtual_printer.py prints a pty to use here
 BAUDRATE = 115200
-CELL_SIZE = 13.6  # mm
-PRESS_Z = 0
-REST_Z = 3
-DELAY = 0.25
+HOME_GCODE_TIMEOUT = 60.0  # s to wait for a G28 ok; firmware without busy: keepalives is silent until done
 START_LOCATION = (2.5, 1.5)
-
-DFP_PATH = "models/yolo_ocr_pipeline.dfp"  # compiled pipeline
-accl = AsyncAccl(DFP_PATH)
+BOARD_ROWS = 4
+BOARD_COLS = 4
+STREAM_WORDS = True  # trace words while the solver is still searching
+
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "memryx")  # "memryx" or "onnx", see inference_backends.py
+try:
+    backend = make_backend(INFERENCE_BACKEND, num_rows=BOARD_ROWS, num_cols=BOARD_COLS)  # loaded once
+except Exception as e:  # no package, no exported model, no MemryX card: read boards with glyph templates alone
+    print(f"⚠️ {INFERENCE_BACKEND} backend unavailable: {e}")
+    backend = None
+# Template OCR first when prototypes were trained (python glyph_ocr.py train captures/);
+# the model then only runs for boards with an ambiguous cell.
+glyphs = GlyphRecognizer.load(PROTOTYPES_PATH) if os.path.exists(PROTOTYPES_PATH) else None
+if backend is None and glyphs is None:
+    sys.exit(f"No {INFERENCE_BACKEND} backend and no glyph prototypes at {PROTOTYPES_PATH}")
+
+progress = ProgressEmitter(lambda message: ws.send(message))  # sequenced updates for the frontend
 
 websocket.enableTrace(True)
-def send_gcode(ser, command: str, wait: float = DELAY):
-    print(f"> {command}")
-    ser.write((command + "\n").encode())
-    time.sleep(wait)
-    while ser.in_waiting:
-        line = ser.readline().decode().strip()
-        print(f"< {line}")
-
-def play_path(ser, path: List[Tuple[int, int]]):
-    if not path:
-        print(">> Empty path, nothing to play.")
-        return
-
-    send_gcode(ser, f"G1 Z{REST_Z} F2000")
-    max_row = 3 
-
-    print(f">> Playing path with {len(path)} points...")
-
-    first_row, first_col = path[0]
-    x0 = first_col * CELL_SIZE
-    y0 = (max_row - first_row) * CELL_SIZE
-    send_gcode(ser, f"G1 X{x0:.2f} Y{y0:.2f} F8000")
-
-    send_gcode(ser, f"G1 Z{PRESS_Z} F2000")
-    time.sleep(0.5)
-
-    for row, col in path[1:]:
-        x = col * CELL_SIZE
-        y = (max_row - row) * CELL_SIZE
-        send_gcode(ser, f"G1 X{x:.2f} Y{y:.2f} F8000")
-
-    send_gcode(ser, f"G1 Z{REST_Z} F2000")
-    print("✅ Path playback complete.")
-
 def exit_gracefully(sig, frame):
     print("\n🛑 Exiting gracefully...")
     try:
+        if executor:
+            executor.stop()
+        progress.stop()
         if ws:
             ws.close()
+        if gcode:
+            gcode.close()
         if ser:
             ser.close()
-        if accl:
-            accl.shutdown()
+        if backend:
+            backend.close()
     except:
         pass
     sys.exit(0)
 
 signal.signal(signal.SIGINT, exit_gracefully)
 
-def extract_board_letters(inp, grid_size=4):
-    inp_proc = np.transpose(inp.astype(np.float32)/255.0, (2,0,1))[None, ...]  # NCHW
-    results = []
-    def output_processor(*logits):
-        class_ids = logits[0].reshape((grid_size, grid_size))
-        letters = [[chr(ord("A")+cid) for cid in row] for row in class_ids]
-        results.append(letters)
-    accl.connect_input(lambda: (inp_proc,))
-    accl.connect_output(output_processor)
-    accl.wait()
-    return results[0]
+def model_letters(img, num_rows=BOARD_ROWS, num_cols=BOARD_COLS):
+    return backend.letters(img, num_rows, num_cols)
+
+def extract_board_letters(message, num_rows=BOARD_ROWS, num_cols=BOARD_COLS):
+    img = decode_frame(message)
+    if glyphs is not None:
+        return glyphs(img, num_rows, num_cols, fallback=model_letters if backend else None)
+    # candidate letters with confidences: the executor solves unsure boards over every candidate
+    return backend.candidates(img, num_rows, num_cols)
+
+def round_done():
+    print(f">> Serial: {gcode.sent} lines sent, {gcode.resends} resends, {len(gcode.errors)} errors")
+    ws.send("ack")
+
+def round_failed():
+    # the PC is waiting on this round: tell it to give up instead of timing out
+    ws.send("fail")
 
 def on_message(ws, message):
-    print(f"Received from server: {message}")
+    # Only hands work to the executor; OCR, solving and tracing run on its threads.
     try:
-        if json.loads(message) == "start":
-            print(">> Pressing start button")
-            play_path(ser, [START_LOCATION])
-            ws.send("ack")
+        if not is_frame(message):
+            print(f"Received from server: {message}")
+            command = json.loads(message)
+            if command == "start":
+                executor.press_start()
+            elif command == "abort":
+                executor.abort()
         else:
-            inp = np.array(json.loads(message), dtype=np.uint8)
-            letters = extract_board_letters(inp)
-            print(">> Board letters:")
-            for row in letters:
-                print("   " + " ".join(row))
-
-            results = find_words(letters, trie)
-            print(f">> Found {len(results)} words:")
-            board_message = {"board": letters, "words": results}
-            ws.send(json.dumps(board_message))
-
-            for word_data in results:
-                coords = word_data.get("coordinates", [])
-                if coords:
-                    print(f">> Playing word: {word_data.get('word')}")
-                    play_path(ser, coords)
-                    time.sleep(0.5)
-                else:
-                    print(">> Skipping word with no coordinates.")
-            send_gcode(ser, f"G1 X{START_LOCATION[0]} F2000")
-            send_gcode(ser, f"G1 Y{START_LOCATION[1]} F2000")
-            send_gcode(ser, f"G1 Z{REST_Z} F2000")
-            ws.send("ack")
-
+            print(f"Received board frame from server ({len(message)} bytes)")
+            executor.submit_frame(message)
     except Exception as e:
         print(f"⚠️ Error in on_message: {e}")
 
+def on_open(ws):
+    print("✅ Connected to server.")
+    progress.start_heartbeats()
+
 def on_close(ws, close_status, close_msg):
     print(f"❌ WebSocket closed. Status: {close_status}, Message: {close_msg}")
     exit_gracefully(None, None)
@@ -128,15 +108,19 @@ def on_error(ws, error):
 
 if __name__ == "__main__":
     print("Connecting to printer...")
-    ser = serial.Serial(PORT, BAUDRATE, timeout=2)
-    time.sleep(2)
+    ser = serial.Serial(PORT, BAUDRATE, timeout=0.1)
+    time.sleep(2)  # the board resets when the port opens
     ser.reset_input_buffer()
+    gcode = GcodeStreamer(ser, home_timeout=HOME_GCODE_TIMEOUT)
+    executor = RoundExecutor(gcode, extract_board_letters, trie, progress, on_ack=round_done, on_fail=round_failed,
+                             num_rows=BOARD_ROWS, start=START_LOCATION, stream=STREAM_WORDS)
 
     print("✅ Printer ready. Connecting to WebSocket...")
 
     ws_url = "ws://172.20.10.8:8766"
     ws = websocket.WebSocketApp(
         ws_url,
+        on_open=on_open,
         on_message=on_message,
         on_close=on_close,
         on_error=on_error
@@ -0,0 +1,131 @@
+"""
+Score-maximizing word selection under a round time budget.
+
+``rank_words`` in ``solver.py`` orders words by length and cuts the list at
+``SOLVER_NUMWORDS_LIMIT``. Here every candidate word gets its Word Hunt points
+and an estimated trace time (from the G-code motion model), and a 0/1 knapsack picks the subset that scores
+the most within the budget. Words with identical (cost, points) are grouped
+and binary-split, so the DP stays small enough to run in a few milliseconds.
+"""
+import math
+from typing import Callable, Dict, List, Tuple
+
+from solver import Position, WordResult
+
+ROUND_SECONDS = 80
+
+# GamePigeon Word Hunt points by word length; each letter past 8 adds 400.
+WORD_POINTS = {3: 100, 4: 400, 5: 800, 6: 1400, 7: 1800, 8: 2200}
+
+CostModel = Callable[[str, List[Position]], float]
+
+
+def word_points(word: str) -> int:
+    if len(word) < 3:
+        return 0
+    if len(word) in WORD_POINTS:
+        return WORD_POINTS[len(word)]
+    return WORD_POINTS[8] + 400 * (len(word) - 8)
+
+
+def duration_cost(word: str, path: List[Position]) -> float:
+    """Flat trace-time model, the same ``duration`` the frontend shows."""
+    return max(3, len(word))
+
+
+# Typical hop between consecutive words after ``order_words``, in cell widths.
+MEAN_HOP_CELLS = 1.5
+
+
+def motion_cost(word: str, path: List[Position]) -> float:
+    """Default cost: compiled press/trace/lift time plus an average hop to the word."""
+    from gcode_compiler import word_trace_seconds
+    from path_order import travel_seconds
+
+    return word_trace_seconds(path) + travel_seconds(MEAN_HOP_CELLS)
+
+
+def _knapsack(items: List[Tuple[int, int]], capacity: int) -> List[int]:
+    """
+    Pick items ``(cost, value)`` maximizing total value with total cost at
+    most ``capacity``. Returns the indices of the chosen items.
+    """
+    dp = [0] * (capacity + 1)
+    taken = []
+    for cost, value in items:
+        if cost > capacity:
+            taken.append(None)
+            continue
+        with_item = [v + value for v in dp[:capacity + 1 - cost]]
+        without_item = dp[cost:]
+        taken.append([False] * cost + [w > v for w, v in zip(with_item, without_item)])
+        dp = dp[:cost] + list(map(max, with_item, without_item))
+
+    chosen = []
+    remaining = capacity
+    for index in range(len(items) - 1, -1, -1):
+        keep = taken[index]
+        if keep is not None and keep[remaining]:
+            chosen.append(index)
+            remaining -= items[index][0]
+    return chosen
+
+
+def select_words(
+    paths: Dict[str, List[Position]],
+    time_budget: float = ROUND_SECONDS,
+    cost_model: CostModel = motion_cost,
+    resolution: float = 0.1,
+) -> List[WordResult]:
+    """
+    Choose and order words to maximize points traced within ``time_budget``
+    seconds.
+
+    Costs are rounded up to ``resolution`` seconds. The chosen words are
+    played in decreasing points-per-second order, so if the round ends early
+    the words already traced are the most valuable ones.
+    """
+    capacity = int(time_budget / resolution)
+    scored = {}
+    for word, path in paths.items():
+        points = word_points(word)
+        if points:
+            cost = cost_model(word, path)
+            scored[word] = (max(1, math.ceil(round(cost / resolution, 6))), points, cost)
+
+    # Group interchangeable words and binary-split each group into bundles.
+    groups: Dict[Tuple[int, int], List[str]] = {}
+    for word in sorted(scored, key=lambda w: (-len(w), w)):
+        units, points, _ = scored[word]
+        groups.setdefault((units, points), []).append(word)
+
+    items: List[Tuple[int, int]] = []
+    bundles: List[Tuple[Tuple[int, int], int, int]] = []
+    for key, words in groups.items():
+        units, points = key
+        limit = min(len(words), capacity // units)
+        start, size = 0, 1
+        while limit > 0:
+            take = min(size, limit)
+            items.append((units * take, points * take))
+            bundles.append((key, start, take))
+            start += take
+            limit -= take
+            size *= 2
+
+    selected = []
+    for index in _knapsack(items, capacity):
+        key, start, take = bundles[index]
+        selected.extend(groups[key][start:start + take])
+
+    selected.sort(key=lambda w: (-scored[w][1] / scored[w][2], -len(w), w))
+    return [
+        {
+            "word": word,
+            "coordinates": paths[word],
+            "duration": max(3, len(word)),
+            "points": scored[word][1],
+            "status": "pending",
+        }
+        for word in selected
+    ]
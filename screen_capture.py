@@ -0,0 +1,48 @@
+"""
+LonelyScreen window handling and board screenshots for the PC side.
+
+Board screenshots go through a shared ``BoardLocator``: the board is found
+on screen once, and later captures grab only its region.
+"""
+import time
+
+import pygetwindow as gw
+import win32com.client
+import win32con
+import win32gui
+
+from board_locator import BoardLocator
+
+locator = BoardLocator()
+
+
+def find_lonelyscreen_window():
+    windows = gw.getWindowsWithTitle('LonelyScreen')
+    if not windows:
+        print("LonelyScreen window not found.")
+        return None
+    return windows[0]
+
+def activate_and_maximize_window(window):
+    hwnd = window._hWnd  # get native window handle
+
+    # Restore if minimized
+    if win32gui.IsIconic(hwnd):
+        win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+        time.sleep(0.2)
+
+    # Force foreground
+    shell = win32com.client.Dispatch("WScript.Shell")
+    shell.SendKeys('%')  # Send ALT key to allow SetForegroundWindow
+    win32gui.SetForegroundWindow(hwnd)
+
+    # Maximize
+    win32gui.ShowWindow(hwnd, win32con.SW_MAXIMIZE)
+    time.sleep(0.5)
+
+def capture_board(relocate=True):
+    """
+    BGR screenshot of just the board, found on screen once and cached (see
+    ``board_locator``); None if no board is visible.
+    """
+    return locator.capture(relocate)
@@ -1,8 +1,31 @@
+"""
+Read a Word Hunt board from a screenshot with easyocr.
+
+The board is thresholded once and cut into cells with numpy slicing. By
+default the cells are laid out as one line and recognized in a single
+pass with no text detection, since the cell boxes are already known. The old path ran
+``readtext`` (detection + recognition) once per upscaled cell.
+
+Usage:
+    letters = extract_board_letters("capture.png")
+    python screenshot_ocr.py capture.png
+    python screenshot_ocr.py capture.png --bench     # per-cell loop vs batched pass
+    python screenshot_ocr.py capture.png --glyphs    # glyph templates, easyocr for ambiguous cells
+"""
+import time
+
 import cv2
 import easyocr
 
 import numpy as np
 
+from glyph_ocr import PROTOTYPES_PATH, GlyphRecognizer
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+BORDER = 0.1  # fraction of each cell trimmed off every side (the tile edge)
+GAP = 0.5  # blank space between cells in the batched strip, so the decoder keeps repeats apart
+CELL_PIXELS = 160  # per-cell upscale for the readtext path (200 px before the border crop)
+
 reader = easyocr.Reader(['en'], gpu=False)
 
 def clean_letter(text):
@@ -17,61 +40,131 @@ def clean_letter(text):
     }
     return corrections.get(text, text if text.isalpha() else "?")
 
-def extract_board_letters(image_path, grid_size=4):
+def board_cells(img, grid_size=4, border=BORDER):
+    """
+    Threshold the board once and cut it into cells with a single reshape.
+
+    Returns a (grid_size * grid_size, h, w) uint8 array of dark letters on a
+    white background, row-major, with ``border`` (a fraction of the cell)
+    trimmed from every side to drop the tile edges.
+    """
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV)
+
+    # Assume the board is roughly square in the center
+    h, w = thresh.shape
+    board_size = min(h, w) // grid_size * grid_size
+    start_x = (w - board_size) // 2
+    start_y = (h - board_size) // 2
+    board = cv2.bitwise_not(thresh[start_y:start_y+board_size, start_x:start_x+board_size])
+
+    cell = board_size // grid_size
+    cells = board.reshape(grid_size, cell, grid_size, cell).swapaxes(1, 2)
+    trim = int(cell * border)
+    cells = cells[:, :, trim:cell-trim, trim:cell-trim]
+    return cells.reshape(grid_size * grid_size, cell - 2 * trim, cell - 2 * trim)
+
+def read_cells_per_cell(cells):
+    """The original path: upscale each cell and run full detection + recognition on it."""
+    letters = []
+    for cell in cells:
+        cell = cv2.resize(cell, (CELL_PIXELS, CELL_PIXELS), interpolation=cv2.INTER_LINEAR)
+        results = reader.readtext(cell)
+        letters.append(clean_letter(results[0][1] if results else ""))
+    return letters
+
+def cell_strip(cells, gap=GAP):
+    """Lay the cells side by side on white, ``gap`` (a fraction of the cell width) apart."""
+    n, h, w = cells.shape
+    pad = int(w * gap)
+    padded = np.full((n, h, w + pad), 255, dtype=np.uint8)
+    padded[:, :, pad // 2:pad // 2 + w] = cells
+    return np.ascontiguousarray(padded.transpose(1, 0, 2).reshape(h, n * (w + pad)))
+
+def read_cells_batched(cells):
+    """
+    Recognize every cell in one pass. The cells are laid out as one line of
+    text with a known box, so detection is skipped and the recognizer runs
+    once for the whole board. If it doesn't return exactly one letter per
+    cell, each cell is read from its own known box instead (still no
+    detection, but one recognizer call per cell on CPU).
+    """
+    n, h, _ = cells.shape
+    strip = cell_strip(cells)
+    line = reader.recognize(strip, horizontal_list=[[0, strip.shape[1], 0, h]], free_list=[],
+                            allowlist=ALPHABET, detail=0)
+    letters = [ch for ch in "".join(line) if ch.isalpha()]
+    if len(letters) == n:
+        return [clean_letter(ch) for ch in letters]
+
+    step = strip.shape[1] // n
+    boxes = [[i * step, (i + 1) * step, 0, h] for i in range(n)]
+    results = reader.recognize(strip, horizontal_list=boxes, free_list=[],
+                               batch_size=n, allowlist=ALPHABET, detail=1)
+    # Results carry their box; map them back by x instead of trusting the order.
+    texts = [""] * n
+    for box, text, _ in results:
+        texts[min(n - 1, int(box[0][0]) // step)] = text
+    return [clean_letter(text) for text in texts]
+
+def extract_board_letters(image, grid_size=4, batched=True, glyphs=None):
     """
     Takes a screenshot of the Word Hunt board, runs OCR, 
     and returns a grid of recognized letters.
     
     Args:
-        image_path (str): Path to the screenshot image.
+        image (str | np.ndarray): Path to the screenshot image, or the BGR image itself.
         grid_size (int): Number of cells per row/col (default=4 for Word Hunt).
+        batched (bool): Recognize all cells in one pass (False: one readtext per cell).
+        glyphs (GlyphRecognizer): Read cells by glyph template first; easyocr only
+            runs when some cell is ambiguous.
         
     Returns:
         list[list[str]]: grid_size x grid_size grid of letters.
     """
+    img = cv2.imread(image) if isinstance(image, str) else image
+    if glyphs is not None:
+        return glyphs(img, grid_size, grid_size,
+                      fallback=lambda im, rows, _: extract_board_letters(im, rows, batched))
+    cells = board_cells(img, grid_size)
+    flat = read_cells_batched(cells) if batched else read_cells_per_cell(cells)
+    return [flat[r * grid_size:(r + 1) * grid_size] for r in range(grid_size)]
 
-    # Load image
+def benchmark(image_path, grid_size=4, repeat=5):
+    """Time the per-cell loop against the batched pass on one capture."""
     img = cv2.imread(image_path)
+    timings = {}
+    grids = {}
+    for name, batched in (("per-cell", False), ("batched", True)):
+        grids[name] = extract_board_letters(img, grid_size, batched)  # warm up
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extract_board_letters(img, grid_size, batched)
+        timings[name] = (time.perf_counter() - start) / repeat
+    agree = sum(a == b for ra, rb in zip(grids["per-cell"], grids["batched"]) for a, b in zip(ra, rb))
+    for name, seconds in timings.items():
+        print(f"{name:9s} {seconds * 1000:8.1f} ms/board")
+        for row in grids[name]:
+            print("          " + " ".join(row))
+    print(f"speedup   {timings['per-cell'] / timings['batched']:8.1f}x, "
+          f"{agree}/{grid_size * grid_size} cells agree")
 
-    # Preprocess: convert to grayscale and threshold
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV)
-
-    # Assume the board is roughly square in the center — crop dynamically if needed
-    h, w = thresh.shape
-    board_size = min(h, w)
-    start_x = (w - board_size) // 2
-    start_y = (h - board_size) // 2
-    board = thresh[start_y:start_y+board_size, start_x:start_x+board_size]
-
-    # Divide into grid
-    cell_h, cell_w = board.shape[0] // grid_size, board.shape[1] // grid_size
-
-    letters = []
-    for r in range(grid_size):
-        row = []
-        for c in range(grid_size):
-            cell = board[r*cell_h:(r+1)*cell_h, c*cell_w:(c+1)*cell_w]
-
-            # Optional: pad & clean cell for better OCR
-            # show cell
-            cell = cv2.bitwise_not(cell)
-            cell = cv2.resize(cell, (200, 200), interpolation=cv2.INTER_LINEAR)
-            # crop border
-            border = 20
-            cell = cell[border:-border, border:-border]
-            # cv2.imshow("cell", cell)
-            # cv2.waitKey(0)
-            
-            results = reader.readtext(cell)
-            char = clean_letter(results[0][1] if results else "")
-            row.append(char)
-        letters.append(row)
+if __name__ == "__main__":
+    import argparse
 
-    return letters
+    parser = argparse.ArgumentParser(description="Read a Word Hunt board from a screenshot")
+    parser.add_argument("image", nargs="?", default="usb_cam_capture.jpg")
+    parser.add_argument("--per-cell", action="store_true", help="use the old one-readtext-per-cell loop")
+    parser.add_argument("--bench", action="store_true", help="compare the per-cell loop with the batched pass")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--glyphs", nargs="?", const=PROTOTYPES_PATH,
+                        help="read with glyph prototypes first (default file: %(const)s)")
+    args = parser.parse_args()
 
-if __name__ == "__main__":
-    image_path = "usb_cam_capture.jpg"
-    grid = extract_board_letters(image_path)
-    for row in grid:
-        print(" ".join(row))
\ No newline at end of file
+    if args.bench:
+        benchmark(args.image, repeat=args.repeat)
+    else:
+        glyphs = GlyphRecognizer.load(args.glyphs) if args.glyphs else None
+        grid = extract_board_letters(args.image, batched=not args.per_cell, glyphs=glyphs)
+        for row in grid:
+            print(" ".join(row))
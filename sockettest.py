@@ -1,22 +1,25 @@
 from websocket_server import WebsocketServer
+from broadcast import Broadcaster
 import threading
 import json
 
 server = WebsocketServer(host="0.0.0.0", port=8765)
 clients = []
+broadcaster = Broadcaster()
 
 def new_client(client, server):
     print(f"New client connected: {client['id']}")
     clients.append(client)
+    broadcaster.add(client)
     send_message("Hi")
 
 def client_left(client, server):
     print(f"Client disconnected: {client['id']}")
     clients.remove(client)
+    broadcaster.remove(client)
 
 def send_message(message):
-    for client in clients:
-        server.send_message(client, json.dumps(message))
+    broadcaster.publish(json.dumps(message))
 
 def message_received(client, server, message):
     print(f"Received message from client")
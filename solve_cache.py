@@ -0,0 +1,170 @@
+"""
+Symmetry-aware result cache for the solver.
+
+Rotating or reflecting a board doesn't change which words it contains, only
+where their paths are. ``SolveCache`` keys results by the canonical form of a
+board (the smallest of its 8 rotations/reflections), solves the canonical
+board on a miss, and maps cached paths back onto the orientation that was
+asked for. Entries live in a bounded in-memory LRU and, optionally, in a
+bounded SQLite file that survives restarts.
+
+Usage:
+    cache = SolveCache(lambda board: find_words(board, trie), path="solve_cache.db")
+    words = cache.find_words(board)
+    print(cache.stats())
+"""
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from solver import Position, WordResult
+
+Board = List[List[str]]
+Transform = Callable[[int, int, int, int], Position]
+
+# Maps (row, col) on an R x C board to its position on the transformed board.
+TRANSFORMS: List[Transform] = [
+    lambda r, c, R, C: (r, c),
+    lambda r, c, R, C: (r, C - 1 - c),
+    lambda r, c, R, C: (R - 1 - r, c),
+    lambda r, c, R, C: (R - 1 - r, C - 1 - c),
+    lambda r, c, R, C: (c, r),
+    lambda r, c, R, C: (C - 1 - c, r),
+    lambda r, c, R, C: (c, R - 1 - r),
+    lambda r, c, R, C: (C - 1 - c, R - 1 - r),
+]
+
+
+def apply_transform(board: Board, transform: Transform) -> Board:
+    R, C = len(board), len(board[0])
+    rows, cols = (R, C) if transform(0, 1, R, C)[0] == transform(0, 0, R, C)[0] else (C, R)
+    out = [[""] * cols for _ in range(rows)]
+    for r in range(R):
+        for c in range(C):
+            nr, nc = transform(r, c, R, C)
+            out[nr][nc] = board[r][c]
+    return out
+
+
+def canonical_board(board: Board) -> Tuple[Board, Dict[Position, Position]]:
+    """
+    Return the canonical orientation of ``board`` and a map from canonical
+    cell positions back to positions on ``board``.
+    """
+    R, C = len(board), len(board[0])
+    best, best_transform = None, None
+    for transform in TRANSFORMS:
+        candidate = apply_transform(board, transform)
+        if best is None or candidate < best:
+            best, best_transform = candidate, transform
+    back = {best_transform(r, c, R, C): (r, c) for r in range(R) for c in range(C)}
+    return best, back
+
+
+def board_key(board: Board) -> str:
+    return "/".join("".join(row) for row in board)
+
+
+class SolveCache:
+    """Bounded LRU of solver results keyed by canonical board."""
+
+    def __init__(
+        self,
+        solve: Callable[[Board], List[WordResult]],
+        maxsize: int = 256,
+        path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+    ):
+        self.solve = solve
+        self.maxsize = maxsize
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, List[WordResult]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, words TEXT, used REAL)"
+            )
+            self._db.commit()
+
+    def find_words(self, board: Board) -> List[WordResult]:
+        canonical, back = canonical_board(board)
+        key = board_key(canonical)
+
+        words = self._memory.get(key)
+        if words is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+        else:
+            words = self._load(key)
+            if words is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                words = self.solve(canonical)
+                self._store(key, words)
+            self._remember(key, words)
+
+        return [
+            {**word, "coordinates": [back[tuple(pos)] for pos in word["coordinates"]]}
+            for word in words
+        ]
+
+    def _remember(self, key: str, words: List[WordResult]):
+        self._memory[key] = words
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[List[WordResult]]:
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT words FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        words = json.loads(row[0])
+        for word in words:
+            word["coordinates"] = [tuple(pos) for pos in word["coordinates"]]
+        return words
+
+    def _store(self, key: str, words: List[WordResult]):
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO results (key, words, used) VALUES (?, ?, ?)",
+            (key, json.dumps(words), time.time()),
+        )
+        self._db.execute(
+            "DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY used DESC LIMIT ?)",
+            (self.max_disk_entries,),
+        )
+        self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "size": len(self._memory),
+        }
+
+    def clear(self):
+        self._memory.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM results")
+            self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,7 +1,8 @@
 import json
-from typing import List, Tuple, Dict, Set
+from typing import List, Tuple, Dict, Set, Iterable, Optional
 import pickle
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from lexicon import LETTER_BITS, TERMINAL_BIT, is_lexicon_file, load_lexicon
 
 Position = Tuple[int, int]
 WordResult = Dict[str, List[Position]]
@@ -41,7 +42,7 @@ def dfs(
         if current_word not in paths:
             paths[current_word] = list(current_path)
 
-    for nrow, ncol in get_neighbors(row, col):
+    for nrow, ncol in get_neighbors(row, col, len(board), len(board[0])):
         if (nrow, ncol) not in visited:
             dfs(nrow, ncol, board, next_node, visited, current_word, current_path, results, paths)
 
@@ -55,31 +56,11 @@ def dfs_worker(args):
     dfs(row, col, board, valid_starts, set(), "", [], results, paths)
     return results, paths
 
-def find_words(board: List[List[str]], trie: dict) -> List[WordResult]:
-    from math import inf
-
-    def manhattan(p1: Tuple[int, int], p2: Tuple[int, int]) -> int:
-        return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
-
-    def sort_short_words_by_proximity(words: List[str], paths: Dict[str, List[Position]]) -> List[str]:
-        if not words:
-            return []
-
-        remaining = set(words)
-        current = next(iter(remaining))  # start with any word
-        remaining.remove(current)
-        result = [current]
-
-        while remaining:
-            last_pos = paths[current][-1]
-            current = min(remaining, key=lambda w: manhattan(last_pos, paths[w][0]))
-            remaining.remove(current)
-            result.append(current)
-
-        return result
-
+def search_threads(board: List[List[str]], trie: dict) -> Dict[str, List[Position]]:
+    """Original engine: recursive ``dfs`` per start cell on a thread pool."""
     results = set()
     paths = {}
+    board = lowercase_board(board)
     board_letters = {ch for row in board for ch in row}
     valid_starts = {ch: node for ch, node in trie.items() if ch in board_letters}
 
@@ -93,31 +74,212 @@ def find_words(board: List[List[str]], trie: dict) -> List[WordResult]:
             results.update(rset)
             paths.update(pset)
 
+    return paths
+
+def lowercase_board(board: List[List[str]]) -> List[List[str]]:
+    """OCR backends read uppercase letters; the lexicon is lowercase."""
+    return [[ch.lower() for ch in row] for row in board]
+
+_NEIGHBOR_TABLES: Dict[Tuple[int, int], Tuple[Tuple[int, ...], ...]] = {}
+
+def neighbor_table(num_rows: int, num_cols: int) -> Tuple[Tuple[int, ...], ...]:
+    """Flat-index adjacency (``row * num_cols + col``) for a board shape, built once per shape."""
+    shape = (num_rows, num_cols)
+    table = _NEIGHBOR_TABLES.get(shape)
+    if table is None:
+        table = tuple(
+            tuple(r * num_cols + c for r, c in get_neighbors(row, col, num_rows, num_cols))
+            for row in range(num_rows)
+            for col in range(num_cols)
+        )
+        _NEIGHBOR_TABLES[shape] = table
+    return table
+
+def search_bitmask(
+    board: List[List[str]],
+    trie,
+    start_cells: Optional[Iterable[int]] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Dict[str, List[Position]]:
+    """
+    Iterative engine: explicit stack, an int bitmask for visited cells and a
+    per-cell link table (neighbor, its visited bit, and what the trie needs
+    to step into it). Letters and cells live in per-depth buffers, so a word
+    string is only built when a terminal node is reached. Compiled lexicons
+    are walked by node id without creating node objects.
+
+    On the 200-board corpus (``board_corpus``) this takes about 0.75-0.8 ms
+    per board on either trie, against 4.1-4.8 ms for the old recursive
+    ``dfs`` (about 5x, short of the 10x goal); ``find_words`` end to end is
+    also about 5x faster. What's left is the interpreter's per-node loop.
+
+    ``start_cells`` restricts the search to paths starting at those flat
+    cell indices (all cells by default), so one board can be split across
+    workers. If ``stats`` is given, the number of trie nodes visited is
+    added to ``stats["nodes"]``.
+    """
+    num_rows, num_cols = len(board), len(board[0])
+    neighbors = neighbor_table(num_rows, num_cols)
+    cells = [ch for row in lowercase_board(board) for ch in row]
+    positions = [(i // num_cols, i % num_cols) for i in range(len(cells))]
+    letters = [""] * len(cells)
+    path = [0] * len(cells)
+    paths: Dict[str, List[Position]] = {}
+    starts = range(len(cells)) if start_cells is None else start_cells
+    visits = 0
+    stack: list = []
+    push, pop = stack.append, stack.pop
+
+    lexicon = getattr(trie, "lexicon", None)
+    if lexicon is not None:
+        nodes, edges = lexicon.nodes, lexicon.edges
+        cell_bits = [LETTER_BITS.get(ch, 0) for ch in cells]
+        # (neighbor, its visited bit, its letter bit, mask of lower letters); unknown letters never match
+        links = [tuple((nb, 1 << nb, cell_bits[nb], cell_bits[nb] - 1) for nb in neighbors[cell] if cell_bits[nb])
+                 for cell in range(len(cells))]
+
+        root_mask, root_base = nodes[2 * trie.node_id], nodes[2 * trie.node_id + 1]
+        for cell in starts:
+            bit = cell_bits[cell]
+            if root_mask & bit:
+                push((cell, edges[root_base + (root_mask & (bit - 1)).bit_count()], 1 << cell, 0))
+
+        while stack:
+            cell, node_id, visited, depth = pop()
+            visits += 1
+            letters[depth] = cells[cell]
+            path[depth] = cell
+            mask = nodes[2 * node_id]
+            if mask & TERMINAL_BIT and depth >= 2:
+                word = "".join(letters[:depth + 1])
+                if word not in paths:
+                    paths[word] = [positions[i] for i in path[:depth + 1]]
+            base = nodes[2 * node_id + 1]
+            depth += 1
+            for nb, nb_bit, bit, below in links[cell]:
+                if mask & bit and not visited & nb_bit:
+                    push((nb, edges[base + (mask & below).bit_count()], visited | nb_bit, depth))
+        if stats is not None:
+            stats["nodes"] = stats.get("nodes", 0) + visits
+        return paths
+
+    # (neighbor, its visited bit, its letter)
+    links = [tuple((nb, 1 << nb, cells[nb]) for nb in neighbors[cell]) for cell in range(len(cells))]
+    for cell in starts:
+        node = trie.get(cells[cell])
+        if node:
+            push((cell, node, 1 << cell, 0))
+
+    while stack:
+        cell, node, visited, depth = pop()
+        visits += 1
+        letters[depth] = cells[cell]
+        path[depth] = cell
+        if "$" in node and depth >= 2:
+            word = "".join(letters[:depth + 1])
+            if word not in paths:
+                paths[word] = [positions[i] for i in path[:depth + 1]]
+        depth += 1
+        get = node.get
+        for nb, nb_bit, letter in links[cell]:
+            if not visited & nb_bit:
+                next_node = get(letter)
+                if next_node:
+                    push((nb, next_node, visited | nb_bit, depth))
+    if stats is not None:
+        stats["nodes"] = stats.get("nodes", 0) + visits
+    return paths
+
+ENGINES = {
+    "threads": search_threads,
+    "bitmask": search_bitmask,
+}
+
+def find_words(
+    board: List[List[str]],
+    trie: dict,
+    engine: str = "bitmask",
+    time_budget: Optional[float] = None,
+) -> List[WordResult]:
+    """
+    Find words on ``board``. By default words are ranked by length and cut at
+    ``SOLVER_NUMWORDS_LIMIT``; with ``time_budget`` (seconds) the words are
+    instead chosen to maximize points traced in that time (see ``scoring.py``).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown solver engine {engine!r}, expected one of {sorted(ENGINES)}")
+    paths = ENGINES[engine](board, trie)
+    if time_budget is not None:
+        from scoring import select_words
+        return select_words(paths, time_budget)
+    return rank_words(paths)
+
+def rank_words(paths: Dict[str, List[Position]]) -> List[WordResult]:
+    """Order and truncate the words found by a search engine into ``find_words`` results."""
+
+    def manhattan(p1: Tuple[int, int], p2: Tuple[int, int]) -> int:
+        return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
+
+    def sort_short_words_by_proximity(words: List[str], paths: Dict[str, List[Position]], count: int) -> List[str]:
+        """
+        The first ``count`` words of a nearest-start chain. Words are bucketed
+        by start cell, so each pick scans at most one bucket per cell instead
+        of every remaining word.
+        """
+        if not words or count <= 0:
+            return []
+
+        buckets: Dict[Position, List[str]] = {}
+        for word in reversed(words):  # popped from the end: keep the search's order within a cell
+            buckets.setdefault(paths[word][0], []).append(word)
+        current = words[0]  # start with any word
+        buckets[paths[current][0]].pop()
+        result = [current]
+
+        while len(result) < count:
+            buckets = {cell: bucket for cell, bucket in buckets.items() if bucket}
+            if not buckets:
+                break
+            last_pos = paths[current][-1]
+            current = buckets[min(buckets, key=lambda cell: manhattan(last_pos, cell))].pop()
+            result.append(current)
+
+        return result
+
+    results = paths.keys()
+
     # Split into long and short words
     long_words = [w for w in results if len(w) > 4]
     short_words = [w for w in results if len(w) <= 4]
 
     # Sort long words by length descending, then lex
-    sorted_long = sorted(long_words, key=lambda w: (-len(w), w))
+    sorted_long = sorted(long_words, key=lambda w: (-len(w), w))[:SOLVER_NUMWORDS_LIMIT]
 
-    # Sort short words by proximity of path endpoints
-    sorted_short = sort_short_words_by_proximity(short_words, paths)
+    # Sort short words by proximity of path endpoints, only as many as fit under the limit
+    sorted_short = sort_short_words_by_proximity(short_words, paths, SOLVER_NUMWORDS_LIMIT - len(sorted_long))
 
-    # Combine
-    final_sorted = sorted_long + sorted_short
-    limited = final_sorted[:min(len(final_sorted), SOLVER_NUMWORDS_LIMIT)]
+    limited = sorted_long + sorted_short
 
-    return [
-        {"word": word, "coordinates": paths[word], "duration": max(3, len(word)), "status": "pending"}
-        for word in limited
-    ]
+    return [word_result(word, paths[word]) for word in limited]
+
+def word_result(word: str, path: List[Position]) -> WordResult:
+    return {"word": word, "coordinates": path, "duration": max(3, len(word)), "status": "pending"}
 
 
-def load_trie(filepath: str) -> dict:
+def load_trie(filepath: str):
+    """
+    Load a compiled ``.lex`` lexicon (memory-mapped, see ``lexicon.py``) or,
+    as a fallback, the original pickled nested-dict trie. Both return a root
+    node that supports ``get``, ``items`` and ``"$" in node``.
+    """
+    if is_lexicon_file(filepath):
+        return load_lexicon(filepath).root
     with open(filepath, "rb") as f:
         return pickle.load(f)
 
 if __name__ == "__main__":
+    import sys
+
     board = [
         ['t', 'h', 'i', 's'],
         ['w', 'a', 't', 's'],
@@ -125,9 +287,11 @@ if __name__ == "__main__":
         ['f', 'g', 'd', 't']
     ]
 
-    trie = load_trie("./trie.pkl")
-
     import time
+    start = time.perf_counter()
+    trie = load_trie(sys.argv[1] if len(sys.argv) > 1 else "./trie.lex")
+    print(f"Loaded trie in {time.perf_counter() - start:.4f} seconds")
+
     start = time.perf_counter()
     results = find_words(board, trie)
     end = time.perf_counter()
@@ -0,0 +1,157 @@
+"""
+Long-lived solver service.
+
+Loads the lexicon once, solves a warm-up board, then answers solve requests
+from any number of concurrent clients over a local Unix socket. Requests and
+responses are newline-delimited JSON:
+
+    > {"board": [["t", "h", "i", "s"], ...], "engine": "bitmask", "time_budget": null}
+    < {"words": [{"word": ..., "coordinates": [[r, c], ...], ...}, ...]}
+    < {"error": "..."}
+
+Start it at boot (e.g. ``@reboot python solver_daemon.py`` in crontab or a
+systemd unit) so no game pays for loading the trie. Other scripts use it as a
+drop-in for the solver module:
+
+    from solver_daemon import load_trie, find_words
+    trie = load_trie("./trie.lex")   # connects to the daemon, or loads locally if it isn't running
+    results = find_words(board, trie)
+
+Usage:
+    python solver_daemon.py [--socket /tmp/wordhawk-solver.sock] [--trie ./trie.lex]
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import time
+from typing import List, Optional
+
+import solver
+from solver import WordResult
+
+SOCKET_PATH = "/tmp/wordhawk-solver.sock"
+TRIE_PATH = "./trie.lex"
+
+WARMUP_BOARD = [
+    ['t', 'h', 'i', 's'],
+    ['w', 'a', 't', 's'],
+    ['o', 'a', 'h', 'g'],
+    ['f', 'g', 'd', 't']
+]
+
+
+class SolveHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                words = solver.find_words(
+                    request["board"],
+                    self.server.trie,
+                    engine=request.get("engine", "bitmask"),
+                    time_budget=request.get("time_budget"),
+                )
+                response = {"words": words}
+            except Exception as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+
+class SolverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, socket_path: str, trie):
+        self.trie = trie
+        super().__init__(socket_path, SolveHandler)
+
+
+def serve(socket_path: str = SOCKET_PATH, trie_path: str = TRIE_PATH):
+    start = time.perf_counter()
+    trie = solver.load_trie(trie_path)
+    solver.find_words(WARMUP_BOARD, trie)
+    print(f"✅ Solver warm in {time.perf_counter() - start:.3f} seconds")
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = SolverServer(socket_path, trie)
+
+    def shutdown(sig, frame):
+        print("\n🛑 Solver daemon stopping...")
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    print(f"Listening on {socket_path}")
+    server.serve_forever()
+
+
+class SolverClient:
+    """Connection to a running solver daemon; safe to share between threads."""
+
+    def __init__(self, socket_path: str = SOCKET_PATH, timeout: float = 10.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def find_words(self, board: List[List[str]], engine: str = "bitmask",
+                   time_budget: Optional[float] = None) -> List[WordResult]:
+        request = {"board": board, "engine": engine, "time_budget": time_budget}
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            with sock.makefile("rwb") as stream:
+                stream.write((json.dumps(request) + "\n").encode())
+                stream.flush()
+                response = json.loads(stream.readline())
+        if "error" in response:
+            raise RuntimeError(f"Solver daemon error: {response['error']}")
+        for word in response["words"]:
+            word["coordinates"] = [tuple(pos) for pos in word["coordinates"]]
+        return response["words"]
+
+    def ping(self) -> bool:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+            return True
+        except OSError:
+            return False
+
+
+def load_trie(filepath: str = TRIE_PATH, socket_path: str = SOCKET_PATH):
+    """
+    Drop-in for ``solver.load_trie``: returns a daemon client when the daemon
+    is running, otherwise loads ``filepath`` in this process.
+    """
+    client = SolverClient(socket_path)
+    if client.ping():
+        return client
+    print(f"⚠️ Solver daemon not running on {socket_path}, loading {filepath} locally")
+    return solver.load_trie(filepath)
+
+
+def find_words(board: List[List[str]], trie, engine: str = "bitmask",
+               time_budget: Optional[float] = None) -> List[WordResult]:
+    """Drop-in for ``solver.find_words`` accepting either a client or a local trie."""
+    if isinstance(trie, SolverClient):
+        return trie.find_words(board, engine, time_budget)
+    return solver.find_words(board, trie, engine, time_budget)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Word Hunt solver as a local service")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--trie", default=TRIE_PATH)
+    args = parser.parse_args()
+    serve(args.socket, args.trie)
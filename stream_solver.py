@@ -0,0 +1,157 @@
+"""
+Streaming solver API.
+
+``find_words`` only returns once every start cell has been searched and the
+list is ranked. ``iter_words`` instead searches the most promising start
+cells first and yields long words as soon as a cell is done, deferring short
+words to the end. ``SolveStream`` runs that search on a background thread so
+the caller can start tracing the first word right away; once the search is
+finished it replaces the words still waiting with the best remaining ones,
+ordered to minimize pen travel from wherever the caller currently is.
+``cancel`` stops the search after the start cell being searched and ends
+the iteration.
+
+Usage:
+    for word_data in SolveStream(board, trie):
+        play_path(ser, word_data["coordinates"])
+"""
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+from path_order import START_LOCATION, order_words
+from solver import (SOLVER_NUMWORDS_LIMIT, Position, WordResult, lowercase_board, neighbor_table, rank_words,
+                    search_bitmask, word_result)
+
+EAGER_LENGTH = 5
+
+
+def start_cell_order(board: List[List[str]], trie) -> List[int]:
+    """Flat cell indices, most promising first (most valid two-letter prefixes)."""
+    num_rows, num_cols = len(board), len(board[0])
+    cells = [ch for row in lowercase_board(board) for ch in row]
+    neighbors = neighbor_table(num_rows, num_cols)
+    scores = []
+    for cell, letter in enumerate(cells):
+        node = trie.get(letter)
+        score = sum(1 for nb in neighbors[cell] if node and node.get(cells[nb])) if node else -1
+        scores.append((-score, cell))
+    return [cell for _, cell in sorted(scores)]
+
+
+def iter_cell_paths(board: List[List[str]], trie) -> Iterator[Dict[str, List[Position]]]:
+    """Search one start cell at a time, best first, yielding the words new to each cell."""
+    seen = set()
+    for cell in start_cell_order(board, trie):
+        paths = search_bitmask(board, trie, [cell])
+        yield {word: path for word, path in paths.items() if word not in seen}
+        seen.update(paths)
+
+
+def iter_words(
+    board: List[List[str]],
+    trie,
+    limit: int = SOLVER_NUMWORDS_LIMIT,
+    eager_length: int = EAGER_LENGTH,
+) -> Iterator[WordResult]:
+    """
+    Yield up to ``limit`` words, longest-first per start cell. Words of at
+    least ``eager_length`` letters are yielded as soon as their start cell is
+    searched; shorter words follow in ``rank_words`` order at the end.
+    """
+    if limit <= 0:
+        return
+    deferred = {}
+    count = 0
+    for paths in iter_cell_paths(board, trie):
+        for word in sorted(paths, key=lambda w: (-len(w), w)):
+            if len(word) < eager_length:
+                deferred[word] = paths[word]
+                continue
+            yield word_result(word, paths[word])
+            count += 1
+            if count >= limit:
+                return
+
+    for item in rank_words(deferred)[:limit - count]:
+        yield item
+
+
+class SolveStream:
+    """Iterate over solver results while the search runs on a background thread."""
+
+    def __init__(self, board: List[List[str]], trie, limit: int = SOLVER_NUMWORDS_LIMIT,
+                 eager_length: int = EAGER_LENGTH, start=START_LOCATION):
+        self._pending = deque()
+        self._yielded: List[WordResult] = []
+        self._position = start
+        self._done = False
+        self._cancelled = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, args=(board, trie, limit, eager_length), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, board, trie, limit, eager_length):
+        try:
+            found = {}
+            for paths in iter_cell_paths(board, trie):
+                if self._cancelled:
+                    return
+                found.update(paths)
+                eager = sorted((w for w in paths if len(w) >= eager_length), key=lambda w: (-len(w), w))
+                with self._cond:
+                    room = limit - len(self._yielded) - len(self._pending)
+                    self._pending.extend(word_result(w, paths[w]) for w in eager[:max(0, room)])
+                    self._cond.notify()
+
+            # Search finished: replace the queue with the best words not yet
+            # handed out, ordered for travel from the caller's current position.
+            with self._cond:
+                consumed = {item["word"] for item in self._yielded}
+                remaining = {w: p for w, p in found.items() if w not in consumed}
+                best = rank_words(remaining)[:max(0, limit - len(self._yielded))]
+                if len(best) > 1:
+                    best, _ = order_words(best, self._position, time_limit=0.02)
+                self._pending = deque(best)
+        except BaseException as e:
+            self._error = e
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> WordResult:
+        with self._cond:
+            while not self._pending and not self._done and not self._cancelled:
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+            if not self._pending or self._cancelled:
+                raise StopIteration
+            item = self._pending.popleft()
+            self._yielded.append(item)
+            self._position = tuple(item["coordinates"][-1])
+            return item
+
+    def cancel(self):
+        """Stop searching and end the iteration; words already found are dropped."""
+        with self._cond:
+            self._cancelled = True
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def done(self) -> bool:
+        with self._cond:
+            return self._done
+
+    def result(self) -> List[WordResult]:
+        """Wait for the search and return every word, consumed ones first."""
+        self._thread.join()
+        with self._cond:
+            return self._yielded + list(self._pending)
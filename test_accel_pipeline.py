@@ -0,0 +1,57 @@
+"""
+Tests for ``accel_pipeline.InferencePipeline`` against ``FakeAccl``.
+
+Usage:
+    python -m pytest test_accel_pipeline.py
+"""
+import numpy as np
+import pytest
+
+from accel_pipeline import FakeAccl, InferencePipeline, paint_board
+
+BOARD = [list("THIS"), list("WATS"), list("OAHG"), list("FGDT")]
+SIZE = 64  # small frames keep the tests fast
+
+
+def make_pipeline(max_in_flight: int = 2) -> InferencePipeline:
+    return InferencePipeline(FakeAccl(latency=0.001, depth=max_in_flight), max_in_flight=max_in_flight,
+                             input_shape=(1, 3, SIZE, SIZE))
+
+
+def test_submit_returns_letters():
+    pipeline = make_pipeline()
+    try:
+        assert pipeline.submit(paint_board(BOARD, SIZE)).result(timeout=5) == BOARD
+    finally:
+        pipeline.close()
+
+
+def test_more_frames_than_buffers():
+    pipeline = make_pipeline(max_in_flight=2)
+    boards = [BOARD, [row[::-1] for row in BOARD], BOARD[::-1], BOARD]
+    try:
+        futures = [pipeline.submit(paint_board(board, SIZE)) for board in boards]
+        assert [f.result(timeout=5) for f in futures] == boards
+    finally:
+        pipeline.close()
+
+
+def test_bad_frames_do_not_leak_buffers():
+    pipeline = make_pipeline(max_in_flight=2)
+    try:
+        for _ in range(5):  # more bad frames than buffers
+            with pytest.raises(ValueError):
+                pipeline.submit(np.zeros((SIZE, SIZE // 2, 3), dtype=np.uint8))
+            with pytest.raises(TypeError):
+                pipeline.submit(np.full((SIZE, SIZE, 3), "x"))
+        assert pipeline.submit(paint_board(BOARD, SIZE)).result(timeout=5) == BOARD
+    finally:
+        pipeline.close()
+
+
+def test_submit_after_close():
+    pipeline = make_pipeline()
+    pipeline.close()
+    pipeline.close()  # closing twice is fine
+    with pytest.raises(RuntimeError):
+        pipeline.submit(paint_board(BOARD, SIZE))
@@ -1,8 +1,7 @@
 import pygetwindow as gw
 import time
-import mss
 import cv2
-import numpy as np
+from board_locator import BoardLocator
 
 def find_lonelyscreen_window():
     windows = gw.getWindowsWithTitle('LonelyScreen')
@@ -20,18 +19,12 @@ def activate_and_maximize_window(window):
     window.maximize()
     time.sleep(1)  # Wait for maximize animation
 
-def capture_fullscreen():
-    with mss.mss() as sct:
-        monitor = sct.monitors[0]  # Primary monitor (full screen)
-        img = sct.grab(monitor)
-        img_np = np.array(img)
-        img_bgr = cv2.cvtColor(img_np, cv2.COLOR_BGRA2BGR)
-        # crop to 1054, 1504 (x), 655, 1108 (y)
-        img_bgr = img_bgr[896:150+1108, 1062:150+1264]
-        return img_bgr
-    
 window = find_lonelyscreen_window()
 
 activate_and_maximize_window(window)
-img = capture_fullscreen()
-cv2.imwrite("screenshot2.jpg", img)
\ No newline at end of file
+# finds the board on screen (no hardcoded crop) and grabs only that region
+locator = BoardLocator()
+img = locator.capture()
+if img is not None:
+    print(f"Board at {locator.region}")
+    cv2.imwrite("screenshot2.jpg", img)
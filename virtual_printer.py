@@ -0,0 +1,445 @@
+"""
+Marlin-like virtual printer on a pseudo-terminal.
+
+``VirtualPrinter`` opens a pty and behaves like the plotter's controller on
+the other end: it checks line numbers and checksums (answering ``Resend:``
+on errors), holds incoming bytes in a 128-byte RX buffer, queues moves into
+a 16-block planner, replies ``ok`` once a command is accepted, and runs the
+planner with the ``motion`` time model. ``M400``, ``G4`` and ``G28`` wait for
+the planner to drain, as on the real firmware. While a command is blocked
+on the planner it sends ``echo:busy: processing`` every ``BUSY_SECONDS``
+(scaled by ``time_scale``) like Marlin's host keepalive, unless ``busy`` is
+False.
+
+Every executed move is recorded, so the pen trajectory can be turned back
+into strokes (the cells pressed while the pen touched the glass, in order)
+and compared with the solver's ``coordinates``.
+
+``time_scale`` maps simulated motion seconds to wall seconds: 1.0 is real
+time, 0 runs as fast as possible while still reporting the simulated time.
+
+Usage:
+    printer = VirtualPrinter(time_scale=0)
+    ser = serial.Serial(printer.port, 115200, timeout=0.1)   # or PRINTER_PORT=... python rpi_script.py
+
+    python virtual_printer.py --serve              # print the pty path and run until Ctrl-C
+    python virtual_printer.py --boards 20          # full-round benchmark over the pty
+    python virtual_printer.py --boards 5 --drop-ok 0.05 --no-busy
+"""
+import argparse
+import math
+import os
+import re
+import threading
+import time
+import tty
+from collections import deque
+from typing import Deque, List, Optional, Sequence, Tuple
+
+from motion import Block, Vector, plan_seconds
+from path_order import CELL_SIZE
+
+RX_SIZE = 128
+PLANNER_SIZE = 16
+IDLE_FLUSH = 0.02  # wall seconds without input before a partly full planner starts moving
+CONTACT_Z = 0.5  # mm; at or below this the stylus touches the glass
+HIT_RADIUS = 0.4  # fraction of a cell around its center that registers the touch
+SAMPLE_MM = 0.5
+BUSY_SECONDS = 2.0  # Marlin's DEFAULT_KEEPALIVE_INTERVAL
+
+LINE = re.compile(r"^N(-?\d+)\s+(.*?)\*(\d+)$")
+WORD = re.compile(r"([A-Z])([-+]?\d*\.?\d+)")
+
+
+def checksum(line: str) -> int:
+    cs = 0
+    for byte in line.encode():
+        cs ^= byte
+    return cs
+
+
+class Segment:
+    """One executed move (or dwell) on the simulated clock."""
+
+    __slots__ = ("start", "end", "t0", "t1")
+
+    def __init__(self, start: Vector, end: Vector, t0: float, t1: float):
+        self.start, self.end, self.t0, self.t1 = start, end, t0, t1
+
+
+class VirtualPrinter:
+    def __init__(self, time_scale: float = 0.0, start: Vector = (0.0, 0.0, 0.0),
+                 drop_ok: float = 0.0, seed: int = 0, busy: bool = True, verbose: bool = False):
+        import random
+
+        self.time_scale = time_scale
+        self.verbose = verbose
+        self.drop_ok = drop_ok
+        self.busy_interval = BUSY_SECONDS * time_scale if time_scale else BUSY_SECONDS
+        self.busy = busy
+        self.keepalives = 0
+        self.rng = random.Random(seed)
+
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+
+        self.position: Vector = start  # where the last queued block ends
+        self.head: Vector = start  # where the pen physically is
+        self.feed = 1000.0
+        self.relative = False
+        self.last_line = 0
+        self.clock = 0.0  # simulated seconds of motion and dwell
+        self.trajectory: List[Segment] = []
+        self.commands: List[str] = []
+        self.errors = 0
+        self.overflows = 0
+
+        self._rx = bytearray()
+        self._rx_cond = threading.Condition()
+        self._planner: Deque[Tuple[Block, Vector, Vector]] = deque()
+        self._planner_cond = threading.Condition()
+        self._flush = False
+        self._last_input = time.monotonic()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._read_loop, daemon=True),
+            threading.Thread(target=self._firmware_loop, daemon=True),
+            threading.Thread(target=self._stepper_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # -- serial side ---------------------------------------------------------
+
+    def _read_loop(self):
+        while not self._closed:
+            try:
+                data = os.read(self.master, 1024)
+            except OSError:
+                return
+            if not data:
+                return
+            with self._rx_cond:
+                room = RX_SIZE - len(self._rx)
+                if len(data) > room:
+                    self.overflows += 1  # bytes are lost, like a real UART ring overflowing
+                    data = data[:room]
+                self._rx += data
+                self._last_input = time.monotonic()
+                self._rx_cond.notify_all()
+
+    def _write(self, text: str):
+        if self.verbose:
+            print(f"[printer] {text}")
+        try:
+            os.write(self.master, (text + "\n").encode())
+        except OSError:
+            pass
+
+    def _ok(self):
+        if self.drop_ok and self.rng.random() < self.drop_ok:
+            return
+        self._write("ok")
+
+    def _next_line(self) -> Optional[str]:
+        with self._rx_cond:
+            while b"\n" not in self._rx:
+                if self._closed:
+                    return None
+                self._rx_cond.wait(0.1)
+            index = self._rx.index(b"\n")
+            line = self._rx[:index].decode(errors="replace").strip()
+            del self._rx[:index + 1]
+            return line
+
+    def _request_resend(self, message: str):
+        self.errors += 1
+        with self._rx_cond:
+            self._rx.clear()  # Marlin flushes the RX buffer before asking for the resend
+        self._write(f"Error:{message}, Last Line: {self.last_line}")
+        self._write(f"Resend: {self.last_line + 1}")
+        self._write("ok")
+
+    # -- firmware ------------------------------------------------------------
+
+    def _firmware_loop(self):
+        while not self._closed:
+            line = self._next_line()
+            if line is None:
+                return
+            line = line.split(";", 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith("N"):
+                match = LINE.match(line)
+                if not match or checksum(line[:line.rindex("*")]) != int(match.group(3)):
+                    self._request_resend("checksum mismatch")
+                    continue
+                line_no, command = int(match.group(1)), match.group(2).strip()
+                if command.startswith("M110"):
+                    words = dict(WORD.findall(command[4:].upper()))
+                    self.last_line = int(float(words.get("N", line_no)))
+                    self._ok()
+                    continue
+                if line_no != self.last_line + 1:
+                    self._request_resend("Line Number is not Last Line Number+1")
+                    continue
+                self.last_line = line_no
+            else:
+                command = line
+            self.commands.append(command)
+            self._execute(command)
+            self._ok()
+
+    def _execute(self, command: str):
+        upper = command.upper()
+        code = upper.split()[0]
+        words = dict(WORD.findall(upper[len(code):]))
+        if code in ("G0", "G1"):
+            if "F" in words:
+                self.feed = float(words["F"])
+            base = (0.0, 0.0, 0.0) if self.relative else self.position
+            target = tuple(
+                (base[i] + float(words[axis]) if self.relative else float(words[axis])) if axis in words
+                else self.position[i]
+                for i, axis in enumerate("XYZ")
+            )
+            delta = tuple(t - p for t, p in zip(target, self.position))
+            if any(delta):
+                self._queue(Block(delta, self.feed), self.position, target)
+                self.position = target
+        elif code == "G4":
+            seconds = float(words["P"]) / 1000 if "P" in words else float(words.get("S", 0))
+            self._synchronize()
+            self._run(Block((0.0, 0.0, 0.0), self.feed, seconds), self.head, self.head, 0.0)
+        elif code == "G28":
+            self._synchronize()
+            self.position = self.head = (0.0, 0.0, 0.0)
+        elif code == "G90":
+            self.relative = False
+        elif code == "G91":
+            self.relative = True
+        elif code == "G92":
+            self._synchronize()
+            self.position = self.head = tuple(
+                float(words[axis]) if axis in words else self.position[i] for i, axis in enumerate("XYZ")
+            )
+        elif code == "M400":
+            self._synchronize()
+        elif code == "M105":
+            self._write("T:25.00 /0.00 B:25.00 /0.00")
+        elif code == "M114":
+            x, y, z = self.position
+            self._write(f"X:{x:.2f} Y:{y:.2f} Z:{z:.2f} E:0.00")
+        elif code in ("M18", "M84", "M17", "M110"):
+            pass
+        else:
+            self._write(f'echo:Unknown command: "{command}"')
+
+    def _wait_planner(self, blocked):
+        """Wait (holding ``_planner_cond``) while ``blocked()``, sending keepalives like Marlin."""
+        next_busy = time.monotonic() + self.busy_interval
+        while blocked():
+            self._planner_cond.wait(max(0.0, next_busy - time.monotonic()))
+            if self.busy and time.monotonic() >= next_busy and blocked() and not self._closed:
+                self.keepalives += 1
+                self._write("echo:busy: processing")
+                next_busy = time.monotonic() + self.busy_interval
+
+    def _queue(self, block: Block, start: Vector, end: Vector):
+        with self._planner_cond:
+            self._wait_planner(lambda: len(self._planner) >= PLANNER_SIZE and not self._closed)
+            self._planner.append((block, start, end))
+            self._planner_cond.notify_all()
+
+    def _synchronize(self):
+        with self._planner_cond:
+            self._flush = True
+            self._planner_cond.notify_all()
+            self._wait_planner(lambda: (self._planner or self._moving) and not self._closed)
+            self._flush = False
+
+    # -- motion --------------------------------------------------------------
+
+    _moving = False
+    _previous: Optional[Block] = None
+
+    def _stepper_loop(self):
+        while not self._closed:
+            with self._planner_cond:
+                # Like the firmware, let a few blocks queue up so the lookahead
+                # can carry speed through corners, unless nothing else is coming.
+                while not self._planner or not (
+                    len(self._planner) >= PLANNER_SIZE or self._flush
+                    or time.monotonic() - self._last_input > IDLE_FLUSH
+                ):
+                    if self._closed:
+                        return
+                    self._planner_cond.wait(IDLE_FLUSH / 2)
+                block, start, end = self._planner.popleft()
+                lookahead = [b for b, _, _ in self._planner]
+                self._moving = True
+                self._planner_cond.notify_all()
+
+            window = ([self._previous] if self._previous else []) + [block] + lookahead
+            seconds = plan_seconds(window)[1 if self._previous else 0]
+            self._previous = block
+            self._run(block, start, end, seconds)
+            with self._planner_cond:
+                self._moving = False
+                if not self._planner:
+                    self._previous = None  # the head stops when the planner runs dry
+                self._planner_cond.notify_all()
+
+    def _run(self, block: Block, start: Vector, end: Vector, seconds: float):
+        seconds = seconds if block.length else block.dwell
+        if self.time_scale:
+            time.sleep(seconds * self.time_scale)
+        self.trajectory.append(Segment(start, end, self.clock, self.clock + seconds))
+        self.clock += seconds
+        self.head = end
+
+    # -- results -------------------------------------------------------------
+
+    def wait_idle(self):
+        """Block until every queued move has run."""
+        with self._planner_cond:
+            self._flush = True
+            self._planner_cond.notify_all()
+            while self._planner or self._moving:
+                self._planner_cond.wait()
+            self._flush = False
+
+    def strokes(self, num_rows: int = 4, num_cols: int = 4) -> List[List[Tuple[int, int]]]:
+        """Cells touched while the pen was down, one list per continuous stroke."""
+        strokes: List[List[Tuple[int, int]]] = []
+        current: Optional[List[Tuple[int, int]]] = None
+        for seg in self.trajectory:
+            length = math.dist(seg.start, seg.end)
+            steps = max(1, int(length / SAMPLE_MM))
+            for k in range(steps + 1):
+                t = k / steps
+                x, y, z = (a + (b - a) * t for a, b in zip(seg.start, seg.end))
+                if z > CONTACT_Z:
+                    current = None
+                    continue
+                if current is None:
+                    current = []
+                    strokes.append(current)
+                cell = self.cell_at(x, y, num_rows, num_cols)
+                if cell and (not current or current[-1] != cell):
+                    current.append(cell)
+        return strokes
+
+    @staticmethod
+    def cell_at(x: float, y: float, num_rows: int, num_cols: int) -> Optional[Tuple[int, int]]:
+        col = round(x / CELL_SIZE)
+        row = num_rows - 1 - round(y / CELL_SIZE)
+        if not (0 <= row < num_rows and 0 <= col < num_cols):
+            return None
+        cx, cy = col * CELL_SIZE, (num_rows - 1 - row) * CELL_SIZE
+        if math.hypot(x - cx, y - cy) > HIT_RADIUS * CELL_SIZE:
+            return None
+        return row, col
+
+    def reset_trajectory(self):
+        self.trajectory = []
+        self.clock = 0.0
+
+    def close(self):
+        self._closed = True
+        with self._planner_cond:
+            self._planner_cond.notify_all()
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def verify_strokes(strokes: List[List[Tuple[int, int]]], words: Sequence[dict]) -> List[str]:
+    """Compare traced strokes with the words' ``coordinates``; returns a list of problems."""
+    problems = []
+    expected = [[tuple(cell) for cell in w["coordinates"]] for w in words if w.get("coordinates")]
+    if len(strokes) != len(expected):
+        problems.append(f"{len(strokes)} strokes for {len(expected)} words")
+    for i, (got, want) in enumerate(zip(strokes, expected)):
+        if got != want:
+            problems.append(f"word {i} ({words[i].get('word')}): traced {got}, expected {want}")
+    return problems
+
+
+def benchmark(boards, trie_path: str, time_scale: float, drop_ok: float, busy: bool = True):
+    import serial
+
+    from gcode_compiler import REST_Z, cell_to_xy, compile_words
+    from gcode_stream import HOME_TIMEOUT, OK_TIMEOUT, SYNC_MARGIN, GcodeStreamer
+    from path_order import START_LOCATION, order_words
+    from solver import find_words, load_trie
+
+    trie = load_trie(trie_path)
+    x, y = cell_to_xy(START_LOCATION, len(boards[0]))
+    printer = VirtualPrinter(time_scale, start=(x, y, REST_Z), drop_ok=drop_ok, busy=busy)
+    ser = serial.Serial(printer.port, 115200, timeout=0.1)
+    # Timeouts shrink with simulated time; the streamer predicts motion on the same scale.
+    ok_timeout = max(0.5, OK_TIMEOUT * time_scale)
+    gcode = GcodeStreamer(ser, verbose=False, ok_timeout=ok_timeout, sync_margin=max(0.5, SYNC_MARGIN * time_scale),
+                          home_timeout=max(0.5, HOME_TIMEOUT * time_scale), time_scale=time_scale)
+
+    total_sim = total_wall = total_words = 0.0
+    failures = 0
+    print(f"{'board':>5} {'words':>5} {'lines':>5} {'estimate s':>10} {'simulated s':>11} {'wall s':>7}  check")
+    for index, board in enumerate(boards):
+        words, _ = order_words(find_words(board, trie), START_LOCATION)
+        program = compile_words(words, len(board), START_LOCATION)
+        printer.reset_trajectory()
+        start = time.perf_counter()
+        gcode.send_lines(program.lines)
+        gcode.finish()
+        wall = time.perf_counter() - start
+        problems = verify_strokes(printer.strokes(len(board), len(board[0])), words)
+        failures += bool(problems)
+        total_sim += printer.clock
+        total_wall += wall
+        total_words += len(words)
+        print(f"{index:5d} {len(words):5d} {len(program.lines):5d} {program.seconds:10.2f} "
+              f"{printer.clock:11.2f} {wall:7.2f}  {'ok' if not problems else problems[0]}")
+
+    print(f"{len(boards)} rounds, {total_words / max(total_sim, 1e-9):.2f} words per simulated second, "
+          f"{failures} mismatched, {gcode.resends} resends, {gcode.timeouts} ok timeouts, "
+          f"{printer.keepalives} keepalives, {printer.overflows} RX overflows, "
+          f"wall {total_wall:.2f} s")
+    gcode.close()
+    ser.close()
+    printer.close()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated Marlin printer on a pty")
+    parser.add_argument("--serve", action="store_true", help="print the port and run until Ctrl-C")
+    parser.add_argument("--boards", type=int, default=10, help="rounds to benchmark")
+    parser.add_argument("--corpus", help="board corpus file (see board_corpus.py)")
+    parser.add_argument("--trie", default="./trie.lex")
+    parser.add_argument("--time-scale", type=float, default=0.0, help="1.0 = real time, 0 = as fast as possible")
+    parser.add_argument("--drop-ok", type=float, default=0.0, help="fraction of oks to lose")
+    parser.add_argument("--no-busy", action="store_true", help="don't send busy: keepalives while blocked")
+    args = parser.parse_args()
+
+    if args.serve:
+        printer = VirtualPrinter(args.time_scale or 1.0, verbose=True)
+        print(f"Virtual printer on {printer.port}")
+        print(f"    PRINTER_PORT={printer.port} python rpi_script.py")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\n🛑 {len(printer.commands)} commands, {printer.clock:.2f} s of motion, "
+                  f"{len(printer.strokes())} strokes")
+            printer.close()
+    else:
+        from board_corpus import generate_corpus, load_corpus
+
+        corpus = load_corpus(args.corpus) if args.corpus else generate_corpus(args.boards)
+        raise SystemExit(1 if benchmark(corpus[:args.boards], args.trie, args.time_scale, args.drop_ok, not args.no_busy) else 0)